@@ -1,5 +1,5 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Any, Dict, Generator, Optional
+from fastapi import Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from app.database.connection import SessionLocal
 
@@ -11,6 +11,42 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+# Параметры списков товаров; остальные параметры запроса - фильтры по атрибутам
+LISTING_PARAMS = {
+    "skip", "limit", "category_id", "brand_id", "search", "min_price", "max_price",
+    "in_stock", "featured", "sort_by", "sort_order",
+}
+
+def get_listing_filters(
+    request: Request,
+    category_id: Optional[int] = Query(None, description="Фильтр по категории"),
+    brand_id: Optional[int] = Query(None, description="Фильтр по бренду"),
+    min_price: Optional[float] = Query(None, description="Минимальная цена"),
+    max_price: Optional[float] = Query(None, description="Максимальная цена"),
+    in_stock: Optional[bool] = Query(None, description="Только в наличии"),
+    sort_by: str = Query("created_at", description="Сортировка"),
+    sort_order: str = Query("desc", description="Порядок сортировки"),
+) -> Dict[str, Any]:
+    """Dependency для фильтров списка товаров (каталог и витрины магазинов)"""
+    filters: Dict[str, Any] = {'sort_by': sort_by, 'sort_order': sort_order}
+    # Нулевые значения (min_price=0, category_id=0) - тоже фильтры
+    if category_id is not None:
+        filters['category_id'] = category_id
+    if brand_id is not None:
+        filters['brand_id'] = brand_id
+    if min_price is not None:
+        filters['min_price'] = min_price
+    if max_price is not None:
+        filters['max_price'] = max_price
+    if in_stock is not None:
+        filters['in_stock'] = in_stock
+    attribute_values = {
+        key: request.query_params.getlist(key) for key in request.query_params if key not in LISTING_PARAMS
+    }
+    if attribute_values:
+        filters['attribute_values'] = attribute_values
+    return filters
+
 def get_current_user():
     """Dependency для получения текущего пользователя (заглушка)"""
     # TODO: Реализовать аутентификацию
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+from app.core.health import readiness
+from app.core.resources import resources
+
+router = APIRouter()
+
+
+@router.get("/health")
+async def health_check():
+    """Проверка состояния приложения (warming - идет прогрев, ready - готов к трафику)"""
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if resources.is_ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if resources.is_ready else resources.state,
+            "service": settings.app_name,
+            "version": settings.app_version
+        }
+    )
+
+
+@router.get("/health/live")
+async def liveness_check():
+    """Проверка живости: процесс запущен и event loop отвечает"""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Проверка готовности: пул, БД, прогрев и загрузка воркера"""
+    result = await readiness.check()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if result["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if result["ready"] else "not_ready",
+            "checks": result["checks"]
+        }
+    )
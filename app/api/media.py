@@ -0,0 +1,36 @@
+import os
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.media.storage import EXTENSION_TYPES, MEDIA_NAME, ORIGINAL, media_kinds, media_path
+from app.media.thumbnails import thumbnails
+
+router = APIRouter()
+
+# Пока превью не готово, вместо него ненадолго отдается оригинал
+_FALLBACK_MAX_AGE = 60
+
+
+@router.get("/{kind}/{shard}/{filename}")
+def get_media(kind: str, shard: str, filename: str):
+    """Загруженный файл: адрес содержит хэш содержимого, поэтому кэшируется навсегда; поддерживает Range"""
+    match = MEDIA_NAME.fullmatch(filename)
+    if not match or kind not in media_kinds() or shard != match["digest"][:2]:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Файл не найден")
+    digest, ext = match["digest"], match["ext"]
+
+    path = media_path(kind, digest, ext)
+    if os.path.exists(path):
+        return FileResponse(path, media_type=EXTENSION_TYPES[ext], headers={
+            "Cache-Control": f"public, max-age={settings.media_max_age}, immutable",
+        })
+
+    original = media_path(ORIGINAL, digest, ext)
+    if kind != ORIGINAL and os.path.exists(original):
+        thumbnails.submit(digest, ext)
+        return FileResponse(original, media_type=EXTENSION_TYPES[ext], headers={
+            "Cache-Control": f"public, max-age={_FALLBACK_MAX_AGE}",
+        })
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Файл не найден")
@@ -0,0 +1,31 @@
+import os
+import re
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.core.sitemaps import FEED, INDEX
+
+router = APIRouter()
+
+# Файлы обновляются заданием app.core.sitemaps, раздаются как есть
+_FILES = re.compile(rf"{re.escape(INDEX)}|{re.escape(FEED)}|products-\d+\.xml\.gz")
+_MAX_AGE = 3600
+
+
+@router.get("/{filename}")
+def get_sitemap_file(filename: str, request: Request):
+    """Индекс карты сайта, шард карты сайта или фид товаров"""
+    path = os.path.join(settings.sitemap_dir, filename)
+    if not _FILES.fullmatch(filename) or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Файл не найден")
+    media_type = "application/gzip" if filename.endswith(".gz") else "application/xml"
+    response = FileResponse(path, media_type=media_type, stat_result=os.stat(path),
+                            headers={"Cache-Control": f"public, max-age={_MAX_AGE}"})
+    # Поисковые роботы перепроверяют файлы с If-None-Match
+    if request.headers.get("if-none-match") == response.headers["etag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={
+            "ETag": response.headers["etag"], "Cache-Control": response.headers["cache-control"],
+        })
+    return response
@@ -1,3 +1,3 @@
-from .api import api_router
+from .api import ROUTERS, include_routers
 
-__all__ = ["api_router"]
\ No newline at end of file
+__all__ = ["ROUTERS", "include_routers"]
@@ -1,22 +1,25 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import categories, brands, products
+import importlib
 
-api_router = APIRouter()
+from fastapi import FastAPI
 
-api_router.include_router(
-    categories.router,
-    prefix="/categories",
-    tags=["categories"]
-)
+# Модуль эндпоинтов, префикс и тег; модули импортируются только при сборке приложения
+ROUTERS = [
+    ("app.api.v1.endpoints.categories", "/categories", "categories"),
+    ("app.api.v1.endpoints.brands", "/brands", "brands"),
+    ("app.api.v1.endpoints.products", "/products", "products"),
+    ("app.api.v1.endpoints.prices", "/prices", "prices"),
+    ("app.api.v1.endpoints.images", "/images", "images"),
+    ("app.api.v1.endpoints.storefront", "/storefront", "storefront"),
+    ("app.api.v1.endpoints.shops", "/shops", "shops"),
+]
 
-api_router.include_router(
-    brands.router,
-    prefix="/brands", 
-    tags=["brands"]
-)
 
-api_router.include_router(
-    products.router,
-    prefix="/products",
-    tags=["products"]
-)
\ No newline at end of file
+def include_routers(app: FastAPI, prefix: str = "/api/v1") -> None:
+    """Подключить роутеры v1 прямо к приложению.
+
+    Без промежуточного APIRouter: каждое подключение заново строит маршруты
+    (разбор зависимостей, поля ответа), и лишний уровень удваивает эту работу.
+    """
+    for module, router_prefix, tag in ROUTERS:
+        router = importlib.import_module(module).router
+        app.include_router(router, prefix=prefix + router_prefix, tags=[tag])
@@ -50,7 +50,7 @@ def get_brand(brand_id: int, db: Session = Depends(get_db)):
 def get_brand_by_slug(slug: str, db: Session = Depends(get_db)):
     """Получить бренд по slug"""
     brand_service = BrandService(db)
-    brand = brand_service.get_by_slug(slug)
+    brand = brand_service.get_response_by_slug(slug)
     if not brand:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
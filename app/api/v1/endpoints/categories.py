@@ -47,7 +47,7 @@ def get_category(category_id: int, db: Session = Depends(get_db)):
 def get_category_by_slug(slug: str, db: Session = Depends(get_db)):
     """Получить категорию по slug"""
     category_service = CategoryService(db)
-    category = category_service.get_by_slug(slug)
+    category = category_service.get_response_by_slug(slug)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,72 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.dependencies import get_db
+from app.config import settings
+from app.database.models import Image
+from app.media import UploadError, image_url, receive_upload
+from app.services.image_service import ImageService
+from app.schemas import UploadedImageResponse
+
+router = APIRouter()
+
+# Тело читается потоком из request.stream(), поэтому схема описана вручную
+_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "file": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                        "alt_text": {"type": "string"},
+                    },
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+def _with_variants(image: Image) -> UploadedImageResponse:
+    response = UploadedImageResponse.model_validate(image)
+    response.variants = {name: image_url(image, name) for name in settings.image_variants}
+    return response
+
+
+@router.post("/upload", response_model=List[UploadedImageResponse], status_code=status.HTTP_201_CREATED,
+             openapi_extra=_UPLOAD_BODY)
+async def upload_images(request: Request, db: Session = Depends(get_db)):
+    """Загрузить изображения (JPEG, PNG, GIF, WebP); одинаковые файлы хранятся один раз"""
+    try:
+        upload = await receive_upload(request)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    if not upload.files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Файлы не переданы"
+        )
+
+    image_service = ImageService(db)
+    try:
+        images = await run_in_threadpool(image_service.save_uploads, upload.files, upload.fields.get("alt_text"))
+    finally:
+        await upload.discard()
+    return [_with_variants(image) for image in images]
+
+@router.get("/{image_id}", response_model=UploadedImageResponse)
+def get_image(image_id: int, db: Session = Depends(get_db)):
+    """Получить изображение по ID"""
+    image_service = ImageService(db)
+    image = image_service.get_by_id(image_id)
+    if not image:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Изображение не найдено"
+        )
+    return _with_variants(image)
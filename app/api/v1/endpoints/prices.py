@@ -0,0 +1,65 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_db
+from app.services.pricing_service import PricingService
+from app.schemas import PriceScheduleCreate, PriceScheduleResponse
+
+router = APIRouter()
+
+@router.get("/schedules", response_model=List[PriceScheduleResponse])
+def get_price_schedules(
+    skip: int = 0,
+    limit: int = 10,
+    active_only: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Получить расписания цен (active_only - только запланированные и действующие)"""
+    pricing_service = PricingService(db)
+    return pricing_service.get_all(skip=skip, limit=limit, active_only=active_only)
+
+@router.get("/schedules/{schedule_id}", response_model=PriceScheduleResponse)
+def get_price_schedule(schedule_id: int, db: Session = Depends(get_db)):
+    """Получить расписание цен по ID"""
+    pricing_service = PricingService(db)
+    schedule = pricing_service.get_by_id(schedule_id)
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Расписание не найдено"
+        )
+    return schedule
+
+@router.post("/schedules", response_model=PriceScheduleResponse, status_code=status.HTTP_201_CREATED)
+def create_price_schedule(
+    schedule: PriceScheduleCreate,
+    db: Session = Depends(get_db)
+):
+    """Создать расписание цен (с наступившим временем начала применяется сразу)"""
+    pricing_service = PricingService(db)
+    try:
+        return pricing_service.create(schedule)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/schedules/{schedule_id}/cancel", response_model=PriceScheduleResponse)
+def cancel_price_schedule(schedule_id: int, db: Session = Depends(get_db)):
+    """Отменить расписание цен; активное откатывается к прежним ценам"""
+    pricing_service = PricingService(db)
+    try:
+        schedule = pricing_service.cancel(schedule_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Расписание не найдено"
+        )
+    return schedule
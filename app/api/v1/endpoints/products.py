@@ -1,10 +1,19 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import get_db
+from app.api.dependencies import get_db, get_listing_filters
+from app.config import settings
+from app.core.outbox import ChangeTokenExpired
 from app.services.product_service import ProductService
-from app.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from app.services.pricing_service import PricingService
+from app.services.variant_service import VariantService
+from app.services.serializers import transform_product_for_frontend
+from app.schemas import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, PriceHistoryResponse,
+    ProductBulkFilter, ProductBulkUpdate, ProductBulkResult,
+    VariantCombinationCreate, VariantMatrixCreate, VariantCombinationUpdate, VariantCombinationResponse
+)
 
 router = APIRouter()
 
@@ -12,109 +21,28 @@ router = APIRouter()
 def get_products(
     skip: int = 0,
     limit: int = 10,
-    category_id: Optional[int] = Query(None, description="Фильтр по категории"),
-    brand_id: Optional[int] = Query(None, description="Фильтр по бренду"),
     search: Optional[str] = Query(None, description="Поиск по названию"),
-    min_price: Optional[float] = Query(None, description="Минимальная цена"),
-    max_price: Optional[float] = Query(None, description="Максимальная цена"),
-    in_stock: Optional[bool] = Query(None, description="Только в наличии"),
     featured: Optional[bool] = Query(None, description="Только рекомендуемые"),
-    sort_by: str = Query("created_at", description="Сортировка"),
-    sort_order: str = Query("desc", description="Порядок сортировки"),
+    filters: Dict[str, Any] = Depends(get_listing_filters),
     db: Session = Depends(get_db)
 ):
-    """Получить список товаров в формате фронтенда"""
+    """Получить список товаров в формате фронтенда.
+
+    Фильтры по атрибутам - slug типа атрибута и значение: ?color=Midnight&storage=256GB;
+    несколько значений одного типа (?color=Midnight&color=Silver) - любое из них.
+    """
     product_service = ProductService(db)
     
     # Если указан поиск
     if search:
-        products = product_service.search(search, skip, limit)
+        return product_service.search_for_frontend(search, skip, limit)
     elif featured:
         # Если нужны только рекомендуемые
-        products = product_service.get_featured(limit)
-        products = products[skip:skip + limit]
-    else:
-        # Фильтрация
-        filters = {}
-        if category_id:
-            filters['category_id'] = category_id
-        if brand_id:
-            filters['brand_id'] = brand_id
-        if min_price:
-            filters['min_price'] = min_price
-        if max_price:
-            filters['max_price'] = max_price
-        if in_stock is not None:
-            filters['in_stock'] = in_stock
-        
-        filters['sort_by'] = sort_by
-        filters['sort_order'] = sort_order
-        
-        products = product_service.filter_products(filters, skip, limit)
-    
-    # Преобразуем каждый продукт в формат фронтенда
-    result = []
-    for product in products:
-        # Загружаем полную информацию
-        full_product = product_service.get_by_id_with_relations(product.id)
-        if not full_product:
-            continue
-            
-        # Получаем основное изображение
-        image = ""
-        spec_images = []
-        if full_product.images:
-            for img in full_product.images:
-                if img.is_primary:
-                    image = img.url
-                spec_images.append(img.url)
-            if not image and spec_images:
-                image = spec_images[0]
-        
-        # Получаем теги
-        tags = [tag.name for tag in full_product.tags] if full_product.tags else []
-        
-        # Получаем цвета (пока заглушка)
-        colors = ["Default"]
-        
-        # Вычисляем скидку
-        discount = ""
-        if full_product.old_price and full_product.old_price > full_product.base_price:
-            discount_percent = round(((full_product.old_price - full_product.base_price) / full_product.old_price) * 100)
-            discount = f"{discount_percent}%OFF"
-        
-        # Название магазина
-        shop_name = "L&M Zone"
-        if full_product.shop:
-            shop_name = full_product.shop.name
-        
-        # Формируем ответ в формате мока
-        product_data = {
-            "id": full_product.id,
-            "stock_state": full_product.stock_state,
-            "total_stock": full_product.total_stock,
-            "rating": "3.8",
-            "reviewCount": "0",
-            "title": full_product.title,
-            "shop_name": shop_name,
-            "price": full_product.base_price,
-            "old_price": f"{full_product.old_price}$" if full_product.old_price else "",
-            "new_price": f"{full_product.base_price}$",
-            "image": image,
-            "delivered_by": "Aug 02",
-            "discount": discount,
-            "sku": full_product.sku,
-            "description": full_product.description or "",
-            "specifications": {
-                "spec_images": spec_images
-            },
-            "colors": colors,
-            "tags": tags
-        }
-        
-        result.append(product_data)
+        products = product_service.get_featured_for_frontend(limit)
+        return products[skip:skip + limit]
     
-    return result
+    # Одинаковые запросы (например, страница категории) объединяются в один
+    return product_service.filter_products_for_frontend(filters, skip, limit)
 
 @router.get("/featured")
 def get_featured_products(
@@ -123,63 +51,7 @@ def get_featured_products(
 ):
     """Получить рекомендуемые товары в формате фронтенда"""
     product_service = ProductService(db)
-    products = product_service.get_featured(limit)
-    
-    result = []
-    for product in products:
-        full_product = product_service.get_by_id_with_relations(product.id)
-        if not full_product:
-            continue
-            
-        # Тот же код преобразования что и выше
-        image = ""
-        spec_images = []
-        if full_product.images:
-            for img in full_product.images:
-                if img.is_primary:
-                    image = img.url
-                spec_images.append(img.url)
-            if not image and spec_images:
-                image = spec_images[0]
-        
-        tags = [tag.name for tag in full_product.tags] if full_product.tags else []
-        colors = ["Default"]
-        
-        discount = ""
-        if full_product.old_price and full_product.old_price > full_product.base_price:
-            discount_percent = round(((full_product.old_price - full_product.base_price) / full_product.old_price) * 100)
-            discount = f"{discount_percent}%OFF"
-        
-        shop_name = "L&M Zone"
-        if full_product.shop:
-            shop_name = full_product.shop.name
-        
-        product_data = {
-            "id": full_product.id,
-            "stock_state": full_product.stock_state,
-            "total_stock": full_product.total_stock,
-            "rating": "3.8",
-            "reviewCount": "0",
-            "title": full_product.title,
-            "shop_name": shop_name,
-            "price": full_product.base_price,
-            "old_price": f"{full_product.old_price}$" if full_product.old_price else "",
-            "new_price": f"{full_product.base_price}$",
-            "image": image,
-            "delivered_by": "Aug 02",
-            "discount": discount,
-            "sku": full_product.sku,
-            "description": full_product.description or "",
-            "specifications": {
-                "spec_images": spec_images
-            },
-            "colors": colors,
-            "tags": tags
-        }
-        
-        result.append(product_data)
-    
-    return result
+    return product_service.get_featured_for_frontend(limit)
 
 @router.get("/search")
 def search_products(
@@ -190,22 +62,29 @@ def search_products(
 ):
     """Поиск товаров в формате фронтенда"""
     product_service = ProductService(db)
-    products = product_service.search(q, skip, limit)
-    
-    # Преобразуем в формат фронтенда
-    frontend_products = []
-    for product in products:
-        full_product = product_service.get_by_id_with_relations(product.id)
-        if full_product:
-            frontend_products.append(transform_product_for_frontend(full_product))
-    
-    return frontend_products
+    return product_service.search_for_frontend(q, skip, limit)
+
+@router.get("/changes")
+def get_product_changes(
+    since: Optional[int] = Query(None, ge=0, description="Токен из предыдущего ответа (next_token)"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Товары, созданные, измененные, снятые с продажи или удаленные после токена"""
+    product_service = ProductService(db)
+    try:
+        return product_service.get_changes(since, limit)
+    except ChangeTokenExpired as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e)
+        )
 
 @router.get("/{product_id}")
 def get_product(product_id: int, db: Session = Depends(get_db)):
     """Получить товар по ID в формате фронтенда"""
     product_service = ProductService(db)
-    product = product_service.get_by_id_with_relations(product_id)
+    product = product_service.get_response_with_relations(product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -214,6 +93,122 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
     
     return transform_product_for_frontend(product)
 
+@router.get("/{product_id}/related")
+def get_related_products(
+    product_id: int,
+    limit: int = Query(settings.related_products_k, ge=1, le=settings.related_products_k),
+    db: Session = Depends(get_db)
+):
+    """Похожие товары (предрасчитанные соседи по тегам, категории и бренду; хранится не больше related_products_k)"""
+    product_service = ProductService(db)
+    related = product_service.get_related_for_frontend(product_id, limit)
+    if related is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Товар не найден"
+        )
+    return related
+
+@router.get("/{product_id}/price-history", response_model=List[PriceHistoryResponse])
+def get_product_price_history(
+    product_id: int,
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """История цен товара: ручные изменения и расписания, новые первыми"""
+    pricing_service = PricingService(db)
+    return pricing_service.get_history(product_id, skip, limit)
+
+@router.get("/{product_id}/variants", response_model=List[VariantCombinationResponse])
+def get_product_variants(product_id: int, db: Session = Depends(get_db)):
+    """Варианты товара (сочетания атрибутов) с SKU, надбавкой к цене и остатком"""
+    variant_service = VariantService(db)
+    variants = variant_service.get_for_product(product_id)
+    if variants is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Товар не найден"
+        )
+    return variants
+
+@router.post("/{product_id}/variants", response_model=VariantCombinationResponse, status_code=status.HTTP_201_CREATED)
+def create_product_variant(
+    product_id: int,
+    variant: VariantCombinationCreate,
+    db: Session = Depends(get_db)
+):
+    """Создать вариант товара из значений атрибутов (по одному на тип)"""
+    variant_service = VariantService(db)
+    try:
+        created = variant_service.create(product_id, variant)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Товар не найден"
+        )
+    return created
+
+@router.post("/{product_id}/variants/matrix", response_model=List[VariantCombinationResponse], status_code=status.HTTP_201_CREATED)
+def create_product_variant_matrix(
+    product_id: int,
+    matrix: VariantMatrixCreate,
+    db: Session = Depends(get_db)
+):
+    """Создать недостающие варианты для всех сочетаний значений; вернуть все варианты товара"""
+    variant_service = VariantService(db)
+    try:
+        variants = variant_service.create_matrix(product_id, matrix)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if variants is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Товар не найден"
+        )
+    return variants
+
+@router.patch("/{product_id}/variants/{variant_id}", response_model=VariantCombinationResponse)
+def update_product_variant(
+    product_id: int,
+    variant_id: int,
+    variant_update: VariantCombinationUpdate,
+    db: Session = Depends(get_db)
+):
+    """Изменить SKU, надбавку к цене, остаток или активность варианта"""
+    variant_service = VariantService(db)
+    try:
+        updated = variant_service.update(product_id, variant_id, variant_update)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Вариант не найден"
+        )
+    return updated
+
+@router.delete("/{product_id}/variants/{variant_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_product_variant(product_id: int, variant_id: int, db: Session = Depends(get_db)):
+    """Удалить вариант товара"""
+    variant_service = VariantService(db)
+    if not variant_service.delete(product_id, variant_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Вариант не найден"
+        )
+
 @router.get("/slug/{slug}", response_model=ProductResponse)
 def get_product_by_slug(slug: str, db: Session = Depends(get_db)):
     """Получить товар по slug"""
@@ -249,7 +244,7 @@ def create_product(
         created_product = product_service.create(product)
         
         # Возвращаем в формате фронтенда
-        full_product = product_service.get_by_id_with_relations(created_product.id)
+        full_product = product_service.get_response_with_relations(created_product.id)
         if not full_product:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -257,58 +252,7 @@ def create_product(
             )
         
         # Преобразуем в формат мока
-        image = ""
-        spec_images = []
-        if full_product.images:
-            for img in full_product.images:
-                if img.is_primary:
-                    image = img.url
-                spec_images.append(img.url)
-            if not image and spec_images:
-                image = spec_images[0]
-        
-        tags = [tag.name for tag in full_product.tags] if full_product.tags else []
-        
-        colors = []
-        if full_product.variants:
-            for variant in full_product.variants:
-                if (variant.attribute and 
-                    variant.attribute.attribute_type.name.lower() == 'color'):
-                    colors.append(variant.attribute.value)
-        if not colors:
-            colors = ["Default"]
-        
-        discount = ""
-        if full_product.old_price and full_product.old_price > full_product.base_price:
-            discount_percent = round(((full_product.old_price - full_product.base_price) / full_product.old_price) * 100)
-            discount = f"{discount_percent}%OFF"
-        
-        shop_name = "L&M Zone"
-        if full_product.shop:
-            shop_name = full_product.shop.name
-        
-        return {
-            "id": full_product.id,
-            "stock_state": full_product.stock_state,
-            "total_stock": full_product.total_stock,
-            "rating": "3.8",
-            "reviewCount": "0",
-            "title": full_product.title,
-            "shop_name": shop_name,
-            "price": full_product.base_price,
-            "old_price": f"{full_product.old_price}$" if full_product.old_price else "",
-            "new_price": f"{full_product.base_price}$",
-            "image": image,
-            "delivered_by": "Aug 02",
-            "discount": discount,
-            "sku": full_product.sku,
-            "description": full_product.description or "",
-            "specifications": {
-                "spec_images": spec_images
-            },
-            "colors": colors,
-            "tags": tags
-        }
+        return transform_product_for_frontend(full_product)
         
     except ValueError as e:
         raise HTTPException(
@@ -316,6 +260,30 @@ def create_product(
             detail=str(e)
         )
 
+@router.post("/bulk-update", response_model=ProductBulkResult)
+def bulk_update_products(
+    bulk: ProductBulkUpdate,
+    db: Session = Depends(get_db)
+):
+    """Массово изменить товары (is_active, is_featured, stock_state, категория, бренд, магазин)"""
+    product_service = ProductService(db)
+    try:
+        return {"affected": product_service.bulk_update(bulk.filter, bulk.values)}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/bulk-deactivate", response_model=ProductBulkResult)
+def bulk_deactivate_products(
+    filter: ProductBulkFilter,
+    db: Session = Depends(get_db)
+):
+    """Массово снять товары с продажи (мягкое удаление)"""
+    product_service = ProductService(db)
+    return {"affected": product_service.bulk_soft_delete(filter)}
+
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
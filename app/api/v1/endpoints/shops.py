@@ -0,0 +1,55 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_db, get_listing_filters
+from app.services.shop_service import ShopService
+from app.schemas import ShopCreate, ShopUpdate, ShopResponse
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ShopResponse])
+def get_shops(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+    """Получить список активных магазинов"""
+    return ShopService(db).get_active(skip, limit)
+
+@router.post("/", response_model=ShopResponse, status_code=status.HTTP_201_CREATED)
+def create_shop(shop: ShopCreate, db: Session = Depends(get_db)):
+    """Создать магазин"""
+    try:
+        return ShopService(db).create(shop)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.put("/{shop_id}", response_model=ShopResponse)
+def update_shop(shop_id: int, shop: ShopUpdate, db: Session = Depends(get_db)):
+    """Обновить магазин"""
+    try:
+        updated = ShopService(db).update(shop_id, shop)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Магазин не найден")
+    return updated
+
+@router.get("/{slug}", response_model=ShopResponse)
+def get_shop(slug: str, db: Session = Depends(get_db)):
+    """Получить магазин по slug"""
+    shop = ShopService(db).get_response_by_slug(slug)
+    if not shop:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Магазин не найден")
+    return shop
+
+@router.get("/{slug}/products")
+def get_shop_products(
+    slug: str,
+    skip: int = 0,
+    limit: int = 10,
+    filters: Dict[str, Any] = Depends(get_listing_filters),
+    db: Session = Depends(get_db)
+):
+    """Товары магазина в формате фронтенда; фильтры - как у списка товаров, включая атрибуты"""
+    products = ShopService(db).get_products_for_frontend(slug, filters, skip, limit)
+    if products is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Магазин не найден")
+    return products
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Request, Response, status
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.storefront import storefront_home
+
+router = APIRouter()
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            quality = params.strip().replace(" ", "")
+            return quality not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+@router.get("/home")
+async def get_home(request: Request):
+    """Главная страница: рекомендуемые товары, популярные бренды, дерево и корни категорий.
+
+    Ответ собирается в фоне и отдается из памяти готовыми байтами (gzip - если клиент его принимает).
+    """
+    payload = storefront_home.cached()
+    if payload is None:
+        payload = await run_in_threadpool(storefront_home.current)
+
+    compressed = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    etag = payload.gzip_etag if compressed else payload.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.storefront_max_age}",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if compressed:
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.gzip_body, media_type="application/json", headers=headers)
+    return Response(payload.body, media_type="application/json", headers=headers)
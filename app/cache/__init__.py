@@ -0,0 +1,18 @@
+from .base import CacheBackend
+from .bus import InvalidationBus, bus, publish
+from .cache import Cache, CacheResource, cache, create_backend
+from .decorators import cached
+from .memory import MemoryBackend
+
+__all__ = [
+    "CacheBackend",
+    "MemoryBackend",
+    "Cache",
+    "CacheResource",
+    "cache",
+    "create_backend",
+    "cached",
+    "InvalidationBus",
+    "bus",
+    "publish",
+]
@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional
+
+
+class CacheBackend(ABC):
+    """Хранилище кэша: значения с TTL и счетчики версий тегов.
+
+    Версии тегов хранятся отдельно от значений и не вытесняются: если
+    версия пропадет и начнется заново, старые записи снова станут валидными.
+    """
+
+    # True - операции ходят по сети и их нужно выносить из event loop
+    blocking: bool = False
+    # True - хранилище общее для всех воркеров: сброс тега в одном виден всем
+    shared: bool = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Получить значение или None"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Сохранить значение на ttl секунд (None - без ограничения)"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Удалить значение"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Удалить все значения"""
+
+    @abstractmethod
+    def get_version(self, tag: str) -> int:
+        """Текущая версия тега (0, если тег ни разу не сбрасывался)"""
+
+    @abstractmethod
+    def bump_version(self, tag: str) -> int:
+        """Увеличить версию тега, сделав невалидными все записи с этим тегом"""
+
+    def get_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Версии нескольких тегов"""
+        return {tag: self.get_version(tag) for tag in tags}
+
+    def close(self) -> None:
+        """Освободить ресурсы хранилища"""
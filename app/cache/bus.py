@@ -0,0 +1,210 @@
+import json
+import logging
+import select
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, insert, text
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.cache.cache import cache
+from app.core.resources import Resource, resources
+from app.database.connection import database
+from app.database.models import CacheChange
+
+logger = logging.getLogger(__name__)
+
+# Ключ в session.info, где копятся теги до коммита
+_PENDING = "invalidation_tags"
+# Теги закоммиченной транзакции: пишущий воркер сбрасывает их сразу после коммита
+_COMMITTED = "invalidation_committed"
+# Лимит payload у NOTIFY - 8000 байт
+_MAX_PAYLOAD = 7000
+
+# None вместо списка тегов - "сбросить все": события могли быть потеряны
+Handler = Callable[[Optional[List[str]]], None]
+
+
+def publish(db: Session, *tags: str) -> None:
+    """Разослать теги всем воркерам при коммите текущей транзакции.
+
+    Единственный способ инвалидации при записи: пишущий воркер сбрасывает
+    теги сразу после коммита (читает свою запись), остальные - по шине.
+    """
+    db.info.setdefault(_PENDING, set()).update(tags)
+
+
+def _chunks(tags: List[str]) -> Iterable[str]:
+    chunk: List[str] = []
+    for tag in tags:
+        if chunk and len(json.dumps(chunk + [tag])) > _MAX_PAYLOAD:
+            yield json.dumps(chunk)
+            chunk = []
+        chunk.append(tag)
+    if chunk:
+        yield json.dumps(chunk)
+
+
+@event.listens_for(Session, "before_commit")
+def _emit_pending(session: Session) -> None:
+    tags = session.info.pop(_PENDING, None)
+    if not tags:
+        return
+    session.info[_COMMITTED] = tags
+    if not settings.invalidation_enabled:
+        return
+
+    # Событие пишется в той же транзакции: откат изменения отменяет и его
+    tags = sorted(tags)
+    if session.get_bind().dialect.name == "postgresql":
+        for payload in _chunks(tags):
+            session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": settings.invalidation_channel, "payload": payload},
+            )
+    else:
+        session.execute(insert(CacheChange).values(tags=json.dumps(tags)))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    tags = session.info.pop(_COMMITTED, None)
+    if tags:
+        cache.invalidate_tags(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+    session.info.pop(_COMMITTED, None)
+
+
+class InvalidationBus(Resource):
+    """Прием событий инвалидации в каждом воркере.
+
+    На Postgres фоновый поток держит отдельное соединение с LISTEN, иначе
+    опрашивает журнал cache_changes. Полученные теги передаются подписчикам.
+    """
+
+    name = "invalidation"
+
+    def __init__(self):
+        self._handlers: List[Handler] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_id = 0
+
+    def subscribe(self, handler: Handler) -> Handler:
+        """Подписаться на теги из других воркеров (и своего)"""
+        self._handlers.append(handler)
+        return handler
+
+    def dispatch(self, tags: Optional[List[str]]) -> None:
+        for handler in self._handlers:
+            try:
+                handler(tags)
+            except Exception:
+                logger.exception("Ошибка обработчика инвалидации")
+
+    def start(self) -> None:
+        if not settings.invalidation_enabled:
+            return
+
+        if database.engine.dialect.name == "postgresql":
+            target = self._listen
+        else:
+            # Позиция запоминается до приема трафика, чтобы не пропустить ранние записи
+            with database.engine.connect() as conn:
+                self._last_id = conn.execute(sql_select(func.max(CacheChange.id))).scalar() or 0
+            target = self._poll
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=target, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self) -> None:
+        delay = 0.5
+        reconnect = False
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = database.engine.raw_connection()
+                # Соединение живет весь срок воркера, в пул его не возвращаем
+                connection.detach()
+                dbapi_connection = connection.driver_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{settings.invalidation_channel}"')
+                delay = 0.5
+                if reconnect:
+                    # Пока соединения не было, события могли пройти мимо. Сбрасываем все только
+                    # после LISTEN: заполненное раньше могло устареть без уведомления
+                    self.dispatch(None)
+                    reconnect = False
+
+                while not self._stop.is_set():
+                    if not select.select([dbapi_connection], [], [], 1.0)[0]:
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        notify = dbapi_connection.notifies.pop(0)
+                        self.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Соединение шины инвалидации потеряно, переподключаемся")
+                reconnect = True
+                self._stop.wait(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _poll(self) -> None:
+        last_prune = datetime.now(timezone.utc)
+        while not self._stop.wait(settings.invalidation_poll_interval):
+            try:
+                with database.engine.connect() as conn:
+                    rows = conn.execute(
+                        sql_select(CacheChange.id, CacheChange.tags)
+                        .where(CacheChange.id > self._last_id)
+                        .order_by(CacheChange.id)
+                    ).all()
+
+                    now = datetime.now(timezone.utc)
+                    if (now - last_prune).total_seconds() > settings.invalidation_retention:
+                        cutoff = (now - timedelta(seconds=settings.invalidation_retention)).replace(tzinfo=None)
+                        conn.execute(delete(CacheChange).where(CacheChange.created_at < cutoff))
+                        conn.commit()
+                        last_prune = now
+            except Exception:
+                logger.exception("Ошибка опроса журнала изменений кэша")
+                continue
+
+            for row_id, tags in rows:
+                self._last_id = row_id
+                self.dispatch(json.loads(tags))
+
+
+bus = resources.register(InvalidationBus())
+
+
+@bus.subscribe
+def _invalidate_cache(tags: Optional[List[str]]) -> None:
+    # Общее хранилище (mmap, Redis) уже сбросил пишущий воркер - повторять это в каждом не нужно
+    if cache.is_shared:
+        return
+    if tags is None:
+        cache.clear()
+    else:
+        cache.invalidate_tags(*tags)
@@ -0,0 +1,232 @@
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.resources import Resource, resources
+from app.core.singleflight import SingleFlight
+from app.database.connection import allow_replica_reads
+
+from .base import CacheBackend
+from .memory import MemoryBackend
+
+logger = logging.getLogger(__name__)
+
+Tags = Union[Iterable[str], Callable[[Any], Iterable[str]]]
+
+
+def create_backend() -> CacheBackend:
+    """Создать хранилище кэша по настройкам"""
+    if settings.cache_backend == "memory":
+        return MemoryBackend(settings.cache_max_entries, settings.cache_eviction)
+
+    if settings.cache_backend == "shared":
+        from .shared import SharedMemoryBackend
+
+        path = settings.cache_shared_path
+        if not os.path.isdir(os.path.dirname(path)):
+            path = os.path.join(tempfile.gettempdir(), os.path.basename(path))
+        return SharedMemoryBackend(path, settings.cache_shared_slots, settings.cache_shared_slot_size)
+
+    if settings.cache_backend == "redis":
+        from .redis import RedisBackend
+
+        return RedisBackend.from_url(settings.cache_redis_url, prefix=settings.cache_key_prefix)
+
+    raise ValueError(f"Неизвестный cache_backend: {settings.cache_backend}")
+
+
+class Cache:
+    """Кэш с TTL, инвалидацией по тегам и защитой от одновременных промахов.
+
+    Вместе со значением хранятся версии его тегов на момент записи; при
+    чтении они сверяются с текущими, так что сброс тега делает невалидными
+    все связанные записи без их перебора. Хранилище создается лениво в
+    каждом процессе (после fork у воркера свое соединение/mmap).
+    """
+
+    def __init__(
+        self,
+        backend_factory: Callable[[], CacheBackend] = create_backend,
+        default_ttl: Optional[float] = None,
+        key_prefix: str = "",
+        enabled: bool = True,
+    ):
+        self._factory = backend_factory
+        self.default_ttl = default_ttl
+        self.key_prefix = key_prefix
+        self.enabled = enabled
+        self._backend: Optional[CacheBackend] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        pid = os.getpid()
+        if self._backend is None or self._pid != pid:
+            with self._lock:
+                if self._backend is None or self._pid != pid:
+                    self._backend = self._factory()
+                    self._pid = pid
+        return self._backend
+
+    @property
+    def is_shared(self) -> bool:
+        """Хранилище общее для воркеров (сбрасывать теги достаточно одному процессу)"""
+        return self.enabled and self.backend.shared
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}" if self.key_prefix else key
+
+    def get(self, key: str) -> Optional[Any]:
+        """Получить значение, если оно есть и его теги не сброшены"""
+        if not self.enabled:
+            return None
+
+        backend = self.backend
+        entry = backend.get(self._key(key))
+        if entry is not None:
+            value, versions = entry
+            if not versions or backend.get_versions(versions) == versions:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        """Сохранить значение с тегами"""
+        if not self.enabled:
+            return
+
+        backend = self.backend
+        versions = backend.get_versions(set(tags))
+        backend.set(self._key(key), (value, versions), ttl if ttl is not None else self.default_ttl)
+
+    def delete(self, key: str) -> None:
+        """Удалить значение"""
+        if self.enabled:
+            self.backend.delete(self._key(key))
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """Сбросить теги: все записи с ними станут невалидными"""
+        if not self.enabled:
+            return
+
+        backend = self.backend
+        for tag in set(tags):
+            backend.bump_version(tag)
+
+    def clear(self) -> None:
+        """Удалить все значения"""
+        if self.enabled:
+            self.backend.clear()
+
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Tags = (),
+    ) -> Any:
+        """Получить значение или загрузить его одним вызовом на все одновременные промахи.
+
+        tags может быть функцией от загруженного значения. None не кэшируется.
+        """
+        if not self.enabled:
+            return loader()
+
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        def load() -> Any:
+            # Пока ждали блокировку, значение мог положить другой процесс
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            # Промах мог быть вызван сбросом тега после записи: реплика может еще
+            # не догнать основную БД, поэтому кэш наполняется только из нее
+            with allow_replica_reads(False):
+                result = loader()
+            if result is not None:
+                self.set(key, result, ttl, tags(result) if callable(tags) else tags)
+            return result
+
+        return self._flight.do(key, load)
+
+    async def _run(self, fn: Callable, *args, **kwargs) -> Any:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await self._run(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        await self._run(self.set, key, value, ttl, tags)
+
+    async def adelete(self, key: str) -> None:
+        await self._run(self.delete, key)
+
+    async def ainvalidate_tags(self, *tags: str) -> None:
+        await self._run(self.invalidate_tags, *tags)
+
+    async def aget_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Tags = (),
+    ) -> Any:
+        """Асинхронный get_or_set; loader синхронный и выполняется в пуле потоков"""
+        value = await self.aget(key)
+        if value is not None:
+            return value
+        return await run_in_threadpool(self.get_or_set, key, loader, ttl, tags)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self._backend).__name__ if self._backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._backend is not None and self._pid == os.getpid():
+                self._backend.close()
+            self._backend = None
+            self._pid = None
+
+
+class CacheResource(Resource):
+    """Хранилище кэша текущего воркера"""
+
+    name = "cache"
+
+    def __init__(self, cache: Cache):
+        self.cache = cache
+
+    def start(self) -> None:
+        if self.cache.enabled:
+            self.cache.backend
+
+    def close(self) -> None:
+        self.cache.close()
+
+
+cache = Cache(
+    default_ttl=settings.cache_default_ttl,
+    key_prefix=settings.cache_key_prefix,
+    enabled=settings.cache_enabled,
+)
+resources.register(CacheResource(cache))
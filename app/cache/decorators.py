@@ -0,0 +1,55 @@
+import functools
+import inspect
+from typing import Any, Callable, Dict, Iterable, Optional, Type
+
+from pydantic import BaseModel
+
+from .cache import cache
+
+
+def _bind_params(signature: inspect.Signature, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+    params.pop("self", None)
+    return params
+
+
+def cached(
+    key: str,
+    ttl: Optional[float] = None,
+    tags: Iterable[str] = (),
+    schema: Optional[Type[BaseModel]] = None,
+) -> Callable:
+    """Кэшировать результат метода.
+
+    key и tags - шаблоны str.format по аргументам вызова, в tags доступен
+    также result. С schema результат (ORM-объект) сохраняется как
+    pydantic-модель, поэтому не зависит от сессии. None не кэшируется.
+    """
+    tags = tuple(tags)
+
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            params = _bind_params(signature, args, kwargs)
+
+            def load():
+                result = fn(*args, **kwargs)
+                if result is not None and schema is not None:
+                    result = schema.model_validate(result)
+                return result
+
+            return cache.get_or_set(
+                key.format(**params),
+                load,
+                ttl=ttl,
+                tags=lambda result: [tag.format(result=result, **params) for tag in tags],
+            )
+
+        return wrapper
+
+    return decorator
+
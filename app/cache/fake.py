@@ -0,0 +1,57 @@
+import fnmatch
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class FakeRedis:
+    """Локальная замена клиента Redis для тестов и разработки.
+
+    Реализует только команды, которые использует RedisBackend.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def _alive(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, name: str) -> Optional[Any]:
+        with self._lock:
+            return self._alive(name)
+
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        with self._lock:
+            return [self._alive(key) for key in keys]
+
+    def set(self, name: str, value: Any, px: Optional[int] = None) -> bool:
+        with self._lock:
+            expires_at = time.monotonic() + px / 1000 if px else None
+            self._data[name] = (value, expires_at)
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(1 for name in names if self._data.pop(name, None) is not None)
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            value = int(self._alive(name) or 0) + 1
+            self._data[name] = (value, None)
+            return value
+
+    def scan_iter(self, match: str = "*") -> Iterator[str]:
+        with self._lock:
+            keys = [key for key in self._data if fnmatch.fnmatchcase(key, match)]
+        return iter(keys)
+
+    def close(self) -> None:
+        pass
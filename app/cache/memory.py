@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from .base import CacheBackend
+
+
+class MemoryBackend(CacheBackend):
+    """Кэш в памяти воркера с ограничением размера и вытеснением LRU или LFU"""
+
+    def __init__(self, max_entries: int = 10000, eviction: str = "lru"):
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Неизвестная политика вытеснения: {eviction}")
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self._lock = threading.Lock()
+        # key -> (value, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        # LFU: частота обращений и ключи по частотам (в порядке добавления)
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = defaultdict(OrderedDict)
+        self._min_freq = 0
+        self._versions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._touch(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (value, expires_at)
+                self._touch(key)
+                return
+
+            while self.max_entries > 0 and len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (value, expires_at)
+            if self.eviction == "lfu":
+                self._freq[key] = 1
+                self._buckets[1][key] = None
+                self._min_freq = 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._freq.clear()
+            self._buckets.clear()
+            self._min_freq = 0
+
+    def get_version(self, tag: str) -> int:
+        return self._versions.get(tag, 0)
+
+    def bump_version(self, tag: str) -> int:
+        with self._lock:
+            version = self._versions.get(tag, 0) + 1
+            self._versions[tag] = version
+            return version
+
+    def _touch(self, key: str) -> None:
+        if self.eviction == "lru":
+            self._entries.move_to_end(key)
+            return
+
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets[freq + 1][key] = None
+
+    def _evict(self) -> None:
+        if self.eviction == "lru":
+            key = next(iter(self._entries))
+        else:
+            if self._min_freq not in self._buckets:
+                self._min_freq = min(self._buckets)
+            key = next(iter(self._buckets[self._min_freq]))
+        self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        del self._entries[key]
+        if self.eviction == "lfu":
+            freq = self._freq.pop(key)
+            bucket = self._buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[freq]
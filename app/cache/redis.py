@@ -0,0 +1,64 @@
+import pickle
+from typing import Any, Dict, Iterable, Optional
+
+from .base import CacheBackend
+
+
+class RedisBackend(CacheBackend):
+    """Сетевой кэш в Redis-совместимом хранилище, общий для всех инстансов.
+
+    Версии тегов хранятся без TTL; при политике вытеснения volatile-* Redis
+    не будет их удалять.
+    """
+
+    blocking = True
+    shared = True
+
+    def __init__(self, client, prefix: str = "lnm"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "lnm") -> "RedisBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Для cache_backend=redis установите пакет redis") from e
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    def _value_key(self, key: str) -> str:
+        return f"{self.prefix}:v:{key}"
+
+    def _version_key(self, tag: str) -> str:
+        return f"{self.prefix}:t:{tag}"
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self.client.get(self._value_key(key))
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(self._value_key(key), data, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._value_key(key))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self._value_key("*")):
+            self.client.delete(key)
+
+    def get_version(self, tag: str) -> int:
+        return int(self.client.get(self._version_key(tag)) or 0)
+
+    def get_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        tags = list(tags)
+        if not tags:
+            return {}
+        values = self.client.mget([self._version_key(tag) for tag in tags])
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    def bump_version(self, tag: str) -> int:
+        return int(self.client.incr(self._version_key(tag)))
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,125 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from typing import Any, Optional
+
+from .base import CacheBackend
+
+# Заголовок слота: хэш ключа, время истечения (0 - без TTL), длина данных
+_SLOT_HEADER = struct.Struct("<QdI")
+_VERSION = struct.Struct("<Q")
+
+
+def _hash(value: str) -> int:
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    # 0 зарезервирован под пустой слот
+    return int.from_bytes(digest, "little") | 1
+
+
+class SharedMemoryBackend(CacheBackend):
+    """Кэш в общем для воркеров mmap-файле (например, в /dev/shm).
+
+    Файл разбит на слоты фиксированного размера; ключ попадает в слот по
+    хэшу, и новая запись вытесняет старую при коллизии, поэтому размер кэша
+    ограничен заранее. Значения, не влезающие в слот, не кэшируются.
+    Доступ к слотам между процессами синхронизируется блокировками fcntl
+    на диапазон байт слота, внутри процесса - обычной блокировкой.
+    Теги в файле сбрасывает пишущий воркер; шина инвалидации их не повторяет,
+    поэтому файл рассчитан на воркеры одного хоста.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, slots: int = 8192, slot_size: int = 16384, version_slots: int = 4096):
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.version_slots = version_slots
+        self._data_offset = version_slots * _VERSION.size
+        size = self._data_offset + slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def _locked(self, offset: int, length: int, exclusive: bool):
+        backend = self
+
+        class _Guard:
+            def __enter__(self):
+                backend._lock.acquire()
+                fcntl.lockf(backend._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, length, offset)
+
+            def __exit__(self, *exc_info):
+                fcntl.lockf(backend._fd, fcntl.LOCK_UN, length, offset)
+                backend._lock.release()
+
+        return _Guard()
+
+    def _slot(self, key: str):
+        key_hash = _hash(key)
+        return key_hash, self._data_offset + (key_hash % self.slots) * self.slot_size
+
+    def get(self, key: str) -> Optional[Any]:
+        key_hash, offset = self._slot(key)
+        with self._locked(offset, self.slot_size, exclusive=False):
+            stored_hash, expires_at, length = _SLOT_HEADER.unpack_from(self._mm, offset)
+            if stored_hash != key_hash:
+                return None
+            if expires_at and expires_at <= time.time():
+                return None
+            start = offset + _SLOT_HEADER.size
+            data = self._mm[start:start + length]
+
+        stored_key, value = pickle.loads(data)
+        # Защита от коллизии 64-битных хэшей
+        return value if stored_key == key else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        data = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.slot_size - _SLOT_HEADER.size:
+            return
+
+        key_hash, offset = self._slot(key)
+        expires_at = time.time() + ttl if ttl else 0.0
+        with self._locked(offset, self.slot_size, exclusive=True):
+            _SLOT_HEADER.pack_into(self._mm, offset, key_hash, expires_at, len(data))
+            start = offset + _SLOT_HEADER.size
+            self._mm[start:start + len(data)] = data
+
+    def delete(self, key: str) -> None:
+        key_hash, offset = self._slot(key)
+        with self._locked(offset, self.slot_size, exclusive=True):
+            stored_hash, _, _ = _SLOT_HEADER.unpack_from(self._mm, offset)
+            if stored_hash == key_hash:
+                _SLOT_HEADER.pack_into(self._mm, offset, 0, 0.0, 0)
+
+    def clear(self) -> None:
+        length = self.slots * self.slot_size
+        with self._locked(self._data_offset, length, exclusive=True):
+            for index in range(self.slots):
+                _SLOT_HEADER.pack_into(self._mm, self._data_offset + index * self.slot_size, 0, 0.0, 0)
+
+    def get_version(self, tag: str) -> int:
+        offset = (_hash(tag) % self.version_slots) * _VERSION.size
+        with self._locked(offset, _VERSION.size, exclusive=False):
+            return _VERSION.unpack_from(self._mm, offset)[0]
+
+    def bump_version(self, tag: str) -> int:
+        # Разные теги могут делить счетчик - это дает лишние промахи, но не устаревшие данные
+        offset = (_hash(tag) % self.version_slots) * _VERSION.size
+        with self._locked(offset, _VERSION.size, exclusive=True):
+            version = _VERSION.unpack_from(self._mm, offset)[0] + 1
+            _VERSION.pack_into(self._mm, offset, version)
+            return version
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
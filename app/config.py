@@ -1,7 +1,11 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+
+LoopType = Literal["auto", "asyncio", "uvloop"]
+HttpType = Literal["auto", "h11", "httptools"]
+AccessLogMode = Literal["stdout", "buffered", "off"]
 
 
 class GunicornSettings(BaseModel):
@@ -9,8 +13,24 @@ class GunicornSettings(BaseModel):
 
     HOST: str = "0.0.0.0"  # noqa: S104
     PORT: int = 8000
-    WORKERS: int = 1
+    # 0 - derive the worker count from the CPUs available to the process
+    WORKERS: int = 0
+    WORKERS_PER_CORE: int = 1
+    MAX_WORKERS: int = 8
     TIMEOUT: int = 900
+    GRACEFUL_TIMEOUT: int = 30
+    KEEPALIVE: int = 5
+    BACKLOG: int = 2048
+    # Load the app in the master once and share it with workers (copy-on-write)
+    PRELOAD_APP: bool = True
+    # Recycle workers after N requests; jitter keeps them from restarting together
+    MAX_REQUESTS: int = 10000
+    MAX_REQUESTS_JITTER: int = 1000
+    LOOP: LoopType = "uvloop"
+    HTTP: HttpType = "httptools"
+    ACCESS_LOG: AccessLogMode = "buffered"
+    ACCESS_LOG_BUFFER: int = 256
+    LOG_LEVEL: str = "INFO"
 
 
 class UnicornSettings(BaseModel):
@@ -20,6 +40,8 @@ class UnicornSettings(BaseModel):
     PORT: int = 8000
     WORKERS: int = 1
     RELOAD: bool = True
+    LOOP: LoopType = "auto"
+    HTTP: HttpType = "auto"
 
 
 class ServersSettings(BaseModel):
@@ -38,6 +60,13 @@ class Settings(BaseSettings):
     # База данных
     database_url: str
 
+    # Реплики для чтения (пусто - все запросы идут в основную БД)
+    database_replica_urls: List[str] = []
+    replica_max_lag: float = 2.0  # секунды отставания, после которых реплика не используется
+    replica_check_interval: float = 5.0  # секунды между проверками здоровья и отставания реплик
+    replica_sticky_seconds: float = 5.0  # после записи клиент столько читает из основной БД
+    replica_sticky_cookie: str = "lnm_primary"
+
     # Безопасность
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
@@ -53,11 +82,119 @@ class Settings(BaseSettings):
     # Файлы
     upload_dir: str = "uploads"
     max_file_size: int = 5242880  # 5MB
+    upload_chunk_size: int = 65536  # байт на запись загружаемого файла на диск
+    media_url: str = "/media"  # префикс URL загруженных изображений
+    media_max_age: int = 31536000  # файлы адресуются хэшем содержимого и не меняются
+    image_variants: Dict[str, int] = {"thumb": 160, "card": 480, "large": 1200}  # имя -> длинная сторона, px
+    image_workers: int = 2  # процессов для генерации превью (нужен Pillow)
+    image_url_cache_size: int = 10000  # URL -> id изображения в памяти воркера
+
+    # Магазины: название в карточке товара без магазина
+    default_shop_name: str = "L&M Zone"
+
+    # Карта сайта и фид товаров (python -m app.core.sitemaps)
+    site_url: str = "http://localhost:3000"  # адрес витрины для ссылок на товары
+    site_product_path: str = "/product/{slug}"
+    public_api_url: str = "http://localhost:8000"  # адрес API для ссылок на файлы карты и изображения
+    sitemap_dir: str = "sitemaps"
+    sitemap_url: str = "/sitemaps"  # префикс URL файлов карты сайта и фида
+    sitemap_shard_size: int = 50000  # id товаров на файл (не больше 50 000 URL по протоколу)
+    feed_currency: str = "USD"
+
+    # Прогрев воркера при старте
+    warmup_enabled: bool = True
+    warmup_featured_limit: int = 10
+    warmup_popular_brands_limit: int = 10
+    warmup_popular_tags_limit: int = 20
+
+    # Главная витрины (/api/v1/storefront/home): готовый ответ в памяти воркера
+    storefront_refresh_enabled: bool = True  # фоновая пересборка по интервалу и событиям изменений
+    storefront_refresh_interval: float = 60.0  # секунды между плановыми пересборками
+    storefront_min_refresh_interval: float = 1.0  # пауза между пересборками при потоке изменений
+    storefront_featured_limit: int = 10
+    storefront_brands_limit: int = 10
+    storefront_max_age: int = 30  # Cache-Control ответа для браузеров и CDN
+
+    # Проверки готовности (/health/ready)
+    health_db_timeout: float = 1.0  # секунды на SELECT 1
+    health_cache_ttl: float = 1.0  # как долго переиспользовать результат проверки
+    health_max_in_flight: int = 200  # 0 - не ограничивать
+
+    # Контроль допуска запросов (load shedding)
+    admission_enabled: bool = True
+    admission_read_limit: int = 32
+    admission_read_queue: int = 64
+    admission_write_limit: int = 8
+    admission_write_queue: int = 16
+    admission_export_limit: int = 2
+    admission_export_queue: int = 2
+    # Готовые файлы карты сайта и фида: отдача дешевая, краулеры качают шарды параллельно
+    admission_static_limit: int = 16
+    admission_static_queue: int = 64
+    admission_queue_timeout: float = 2.0  # секунды ожидания в очереди
+    admission_retry_after: int = 2  # значение заголовка Retry-After
+    admission_adaptive: bool = True  # снижать лимиты при росте задержек
+    admission_target_latency_ms: float = 500.0
+    # Тяжелые выгрузки: лента изменений, массовые операции
+    admission_export_paths: List[str] = ["/api/v1/products/changes", "/api/v1/products/bulk-"]
+    admission_static_paths: Optional[List[str]] = None  # None - префикс sitemap_url
+    admission_exempt_paths: List[str] = ["/health", "/docs", "/redoc", "/api/v1/openapi.json"]
+
+    # Объединение одинаковых запросов каталога (single-flight + stale-while-revalidate)
+    catalog_coalescing_enabled: bool = True
+    catalog_read_fresh_ttl: float = 5.0  # секунды, пока результат считается свежим
+    catalog_read_stale_ttl: float = 60.0  # секунды, пока можно отдавать устаревший результат
+    catalog_snapshot_enabled: bool = False  # колоночный снимок каталога в памяти (нужен numpy)
+
+    # Кэш (memory - в памяти воркера, shared - общий mmap для воркеров хоста, redis - общий для инстансов)
+    cache_enabled: bool = True
+    cache_backend: str = "memory"
+    cache_default_ttl: float = 300.0
+    cache_key_prefix: str = "lnm"
+    cache_max_entries: int = 10000
+    cache_eviction: str = "lru"  # lru или lfu
+    cache_shared_path: str = "/dev/shm/lnm-cache"
+    cache_shared_slots: int = 8192
+    cache_shared_slot_size: int = 16384
+    cache_redis_url: str = "redis://localhost:6379/0"
+
+    # Шина инвалидации кэша между воркерами (Postgres - LISTEN/NOTIFY, иначе - опрос журнала изменений)
+    invalidation_enabled: bool = True
+    invalidation_channel: str = "lnm_invalidate"
+    invalidation_poll_interval: float = 0.05  # секунды между опросами журнала
+    invalidation_retention: float = 300.0  # секунды хранения записей журнала
+
+    # Outbox событий об изменениях товаров
+    outbox_enabled: bool = True
+    outbox_poll_interval: float = 0.5  # секунды между проверками новых событий
+    outbox_batch_size: int = 500
+    outbox_gap_timeout: float = 5.0  # секунды, после которых у "дыры" в id проверяются незавершенные транзакции
+    outbox_gap_max_age: float = 3600.0  # СУБД без статусов транзакций: столько ждать дыру, прежде чем пропустить
+    outbox_retention_days: int = 7
+
+    # Расписания цен
+    pricing_scheduler_enabled: bool = True
+    pricing_poll_interval: float = 15.0  # секунды между проверками начала/окончания расписаний
+
+    # Похожие товары (задание python -m app.core.related, нужен numpy)
+    related_products_k: int = 12  # сколько соседей хранить на товар
+    related_max_tag_df: int = 5000  # теги на большем числе товаров не порождают кандидатов
+    related_batch_size: int = 256  # товаров в одной векторной пачке
+    related_category_weight: float = 1.0
+    related_brand_weight: float = 0.5
 
     servers: ServersSettings = ServersSettings()
 
+    @model_validator(mode="after")
+    def derive_static_paths(self) -> "Settings":
+        # Класс файлов карты сайта следует за ее префиксом URL
+        if self.admission_static_paths is None:
+            self.admission_static_paths = [self.sitemap_url.rstrip("/") + "/"]
+        return self
+
     model_config = SettingsConfigDict(
         env_file=".env",
+        env_nested_delimiter="__",
         case_sensitive=False,
     )
 
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ConcurrencyLimiter:
+    """Ограничение числа одновременных запросов с ограниченной очередью ожидания.
+
+    В адаптивном режиме лимит снижается, когда сглаженная задержка
+    превышает целевую, и медленно растет обратно, пока задержка в норме.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        adaptive: bool = False,
+        target_latency: float = 0.5,
+        min_limit: int = 1,
+    ):
+        self.name = name
+        self.max_limit = limit
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.min_limit = min(min_limit, limit)
+        self.active = 0
+        self.rejected = 0
+        self.latency_ewma: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> bool:
+        """Занять слот; False - слот не получен и запрос нужно отклонить"""
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return True
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            # Клиент ушел, но слот уже мог быть передан нам - возвращаем его
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency: Optional[float] = None) -> None:
+        """Освободить слот и передать его первому ожидающему"""
+        if latency is not None and self.adaptive:
+            self._observe(latency)
+
+        while self._waiters and self.active <= self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Слот переходит ожидающему, active не меняется
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _observe(self, latency: float) -> None:
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+
+        if self.latency_ewma > self.target_latency:
+            # Мультипликативное снижение при деградации
+            self.limit = max(self.min_limit, int(self.limit * 0.9))
+        elif self.latency_ewma < self.target_latency * 0.8 and self.limit < self.max_limit:
+            # Аддитивный рост, только если лимит реально упирается в нагрузку
+            if self.active >= self.limit:
+                self.limit += 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 2) if self.latency_ewma is not None else None,
+        }
+
+
+def create_limiters() -> Dict[str, ConcurrencyLimiter]:
+    """Создать лимитеры для классов запросов из настроек"""
+    common = {
+        "queue_timeout": settings.admission_queue_timeout,
+        "adaptive": settings.admission_adaptive,
+        "target_latency": settings.admission_target_latency_ms / 1000,
+    }
+    return {
+        "read": ConcurrencyLimiter("read", settings.admission_read_limit, settings.admission_read_queue, **common),
+        "write": ConcurrencyLimiter("write", settings.admission_write_limit, settings.admission_write_queue, **common),
+        "export": ConcurrencyLimiter("export", settings.admission_export_limit, settings.admission_export_queue, **common),
+        "static": ConcurrencyLimiter("static", settings.admission_static_limit, settings.admission_static_queue, **common),
+    }
+
+
+limiters = create_limiters()
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    """Определить класс запроса; None - запрос не ограничивается"""
+    if any(path.startswith(prefix) for prefix in settings.admission_exempt_paths):
+        return None
+    if any(path.startswith(prefix) for prefix in settings.admission_export_paths):
+        return "export"
+    if any(path.startswith(prefix) for prefix in settings.admission_static_paths or ()):
+        return "static"
+    if method in READ_METHODS:
+        return "read"
+    return "write"
+
+
+class AdmissionControlMiddleware:
+    """Отклоняет запросы с 503, когда лимит класса и очередь заняты"""
+
+    def __init__(self, app: ASGIApp, limiters: Dict[str, ConcurrencyLimiter]):
+        self.app = app
+        self.limiters = limiters
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(scope["method"], scope["path"])
+        limiter = self.limiters.get(route_class) if route_class else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Сервер перегружен, повторите запрос позже"},
+                headers={"Retry-After": str(settings.admission_retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
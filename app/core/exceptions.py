@@ -1,4 +1,5 @@
 from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -9,7 +10,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         status_code=422,
         content={
             "detail": "Ошибка валидации данных",
-            "errors": exc.errors()
+            # ctx ошибок валидаторов содержит объекты исключений
+            "errors": jsonable_encoder(exc.errors())
         }
     )
 
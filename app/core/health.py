@@ -0,0 +1,136 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.resources import resources
+from app.database.connection import database, replicas
+
+
+class InFlightCounter:
+    """Счетчик запросов, которые сейчас обрабатывает воркер"""
+
+    def __init__(self):
+        self.value = 0
+
+    def __enter__(self):
+        self.value += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.value -= 1
+
+
+in_flight = InFlightCounter()
+
+
+def check_pool() -> Dict[str, Any]:
+    """Проверить, что в пуле соединений есть свободные слоты"""
+    if not database.is_initialized:
+        return {"ok": False, "detail": "engine not initialized"}
+
+    pool = database.engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"ok": True, "detail": type(pool).__name__}
+
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    if max_overflow < 0:
+        return {"ok": True, "checked_out": checked_out, "capacity": None}
+
+    capacity = pool.size() + max_overflow
+    return {
+        "ok": checked_out < capacity,
+        "checked_out": checked_out,
+        "capacity": capacity,
+    }
+
+
+def _select_one(timeout: float) -> None:
+    with database.engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+        conn.execute(text("SELECT 1"))
+
+
+async def check_database(timeout: float) -> Dict[str, Any]:
+    """Выполнить SELECT 1 с жестким таймаутом"""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(run_in_threadpool(_select_one, timeout), timeout=timeout)
+    except asyncio.TimeoutError:
+        return {"ok": False, "detail": f"timeout after {timeout}s"}
+    except Exception as e:
+        return {"ok": False, "detail": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def check_resources() -> Dict[str, Any]:
+    """Проверить, что ресурсы воркера (кэши, индексы) созданы и прогреты"""
+    return {"ok": resources.is_ready, "state": resources.state}
+
+
+def check_in_flight() -> Dict[str, Any]:
+    """Проверить, что воркер не перегружен запросами"""
+    limit = settings.health_max_in_flight
+    return {
+        "ok": limit <= 0 or in_flight.value < limit,
+        "in_flight": in_flight.value,
+        "limit": limit or None,
+    }
+
+
+def check_replicas() -> Dict[str, Any]:
+    """Состояние реплик; недоступные реплики не мешают готовности - чтения уходят в основную БД"""
+    return {"ok": True, "replicas": replicas.status()}
+
+
+class ReadinessProbe:
+    """Проверка готовности с кэшированием результата.
+
+    Пробы приходят от Docker и балансировщика часто, поэтому результат
+    переиспользуется в течение health_cache_ttl, а параллельные пробы
+    ждут одну общую проверку вместо того, чтобы нагружать БД.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def check(self) -> Dict[str, Any]:
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+                return self._result
+
+            checks = {
+                "resources": check_resources(),
+                "pool": check_pool(),
+                "in_flight": check_in_flight(),
+            }
+            if replicas:
+                checks["replicas"] = check_replicas()
+            # Если пул исчерпан, SELECT 1 просто повиснет в ожидании соединения
+            if checks["pool"]["ok"]:
+                checks["database"] = await check_database(settings.health_db_timeout)
+            else:
+                checks["database"] = {"ok": False, "detail": "skipped: pool exhausted"}
+
+            self._result = {
+                "ready": all(check["ok"] for check in checks.values()),
+                "checks": checks,
+            }
+            self._checked_at = time.monotonic()
+            return self._result
+
+
+readiness = ReadinessProbe(ttl=settings.health_cache_ttl)
@@ -0,0 +1,111 @@
+"""Бюджет времени импорта точек входа.
+
+Каждая точка входа запускается в отдельном процессе с `python -X importtime`:
+печатаются самые дорогие модули, проверяются бюджет времени и модули,
+которых на этом пути быть не должно (веб-слой в CLI, модели в доступе к БД).
+
+    python -m app.core.import_time
+    python -m app.core.import_time --target db --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+_MARKER = "import-time-ms:"
+
+
+@dataclass(frozen=True)
+class Budget:
+    statement: str
+    max_ms: float
+    forbidden: Tuple[str, ...] = field(default=())
+
+
+# Бюджеты с запасом для холодного старта на CI; --scale подстраивает их под машину
+TARGETS: Dict[str, Budget] = {
+    # Сессия и engine: тесты БД, миграции, CLI
+    "db": Budget("import app.database.connection", 600,
+                 ("fastapi", "app.database.models", "app.schemas", "app.services", "app.cache")),
+    # Импорт модуля приложения ничего не собирает, приложение строит create_app()
+    "main": Budget("import app.main", 400,
+                   ("fastapi", "app.api", "app.services", "app.schemas", "app.repositories", "app.database")),
+    "cli": Budget("import app.core.sitemaps", 900, ("fastapi", "app.services", "app.api")),
+    "app": Budget("from app.main import create_app; create_app()", 2000),
+}
+
+
+@dataclass
+class Report:
+    name: str
+    elapsed_ms: float
+    modules: Dict[str, Tuple[float, float]]  # модуль -> (собственное, с зависимостями), мс
+    forbidden: List[str]
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[float, float]]:
+    """Строки `import time: self [us] | cumulative | package` -> {модуль: (self, cumulative) в мс}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # заголовок
+        modules[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return modules
+
+
+def measure(name: str, budget: Budget, runs: int = 3) -> Report:
+    """Лучшее из нескольких запусков: меньше всего шума от диска и соседей"""
+    code = (
+        "import time; started = time.perf_counter()\n"
+        f"{budget.statement}\n"
+        f"print('{_MARKER}', (time.perf_counter() - started) * 1000)"
+    )
+    best: Optional[Report] = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, check=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        elapsed = float(next(line for line in result.stdout.splitlines() if line.startswith(_MARKER)).split()[1])
+        modules = parse_importtime(result.stderr)
+        forbidden = sorted(
+            module for module in modules
+            if any(module == prefix or module.startswith(prefix + ".") for prefix in budget.forbidden)
+        )
+        if best is None or elapsed < best.elapsed_ms:
+            best = Report(name, elapsed, modules, forbidden)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Время импорта точек входа (-X importtime)")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="проверить только эти точки входа")
+    parser.add_argument("--top", type=int, default=10, help="сколько самых дорогих модулей показать")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель бюджетов времени")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for name in args.target or TARGETS:
+        budget = TARGETS[name]
+        report = measure(name, budget, args.runs)
+        limit = budget.max_ms * args.scale
+        ok = report.elapsed_ms <= limit and not report.forbidden
+        failed += not ok
+        print(f"{'✅' if ok else '❌'} {name}: {report.elapsed_ms:.0f} мс (бюджет {limit:.0f}), "
+              f"модулей {len(report.modules)} - {budget.statement}")
+        if report.forbidden:
+            print(f"    лишние импорты: {', '.join(report.forbidden[:10])}")
+        for module, (own, cumulative) in sorted(report.modules.items(), key=lambda item: -item[1][0])[:args.top]:
+            print(f"    {own:7.1f} мс  {cumulative:7.1f} мс  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
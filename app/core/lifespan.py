@@ -0,0 +1,30 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from app.core import warmup  # noqa: F401 - регистрирует прогрев каталога
+from app.core import price_scheduler  # noqa: F401 - регистрирует планировщик цен
+from app.core import storefront  # noqa: F401 - регистрирует сборку главной страницы
+from app.core.resources import resources
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Жизненный цикл воркера: ресурсы создаются после fork и закрываются при остановке"""
+    app.state.resources = resources
+
+    # Старт синхронный (работа с БД), поэтому выполняем его вне event loop
+    await run_in_threadpool(resources.start)
+    # Прогрев идет в фоне: пока он не закончится, /health отвечает "warming"
+    warm_task = asyncio.create_task(run_in_threadpool(resources.warm))
+    try:
+        yield
+    finally:
+        if not warm_task.done():
+            warm_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await warm_task
+        await run_in_threadpool(resources.shutdown)
@@ -1,10 +1,90 @@
+import time
+from http.cookies import SimpleCookie
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from app.config import settings
+from app.core.admission import READ_METHODS, AdmissionControlMiddleware, limiters
+from app.core.health import in_flight
+from app.database.connection import allow_replica_reads, replicas
+
+
+class InFlightMiddleware:
+    """Подсчет запросов, которые воркер обрабатывает в данный момент"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with in_flight:
+            await self.app(scope, receive, send)
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает чтение с реплик для GET-запросов.
+
+    После успешного изменяющего запроса клиент получает cookie, и пока
+    она действует (replica_sticky_seconds), его чтения идут в основную БД -
+    он сразу видит свои изменения, даже если реплика отстает.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.cookie = settings.replica_sticky_cookie
+
+    def _is_sticky(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                cookie = SimpleCookie()
+                cookie.load(value.decode("latin-1"))
+                if self.cookie in cookie:
+                    try:
+                        return float(cookie[self.cookie].value) > time.time()
+                    except ValueError:
+                        return False
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in READ_METHODS:
+            with allow_replica_reads(not self._is_sticky(scope)):
+                await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                sticky = settings.replica_sticky_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{self.cookie}={time.time() + sticky:.3f}; Max-Age={int(sticky) or 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
 
 def setup_middleware(app: FastAPI):
     """Настройка middleware"""
-    
+
+    # Маршрутизация чтений на реплики
+    if replicas:
+        app.add_middleware(ReplicaRoutingMiddleware)
+
+    # Контроль допуска (внутри CORS, чтобы ответы 503 тоже получали CORS-заголовки)
+    if settings.admission_enabled:
+        app.add_middleware(AdmissionControlMiddleware, limiters=limiters)
+
     # CORS
     app.add_middleware(
         CORSMiddleware,
@@ -12,4 +92,7 @@ def setup_middleware(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-    )
\ No newline at end of file
+    )
+
+    # Учет нагрузки для /health/ready
+    app.add_middleware(InFlightMiddleware)
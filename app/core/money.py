@@ -0,0 +1,70 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Annotated, Iterable, Optional, Union
+
+from pydantic import AfterValidator, PlainSerializer
+
+# Деньги хранятся в минимальных единицах (центах); вся арифметика - целочисленная
+MINOR_UNITS = 100
+_CENT = Decimal("0.01")
+
+Number = Union[Decimal, float, int, str]
+
+
+def quantize(value: Number) -> Decimal:
+    """Привести сумму к Decimal с двумя знаками (float берется по его строковому виду)"""
+    if isinstance(value, float):
+        value = str(value)
+    return Decimal(value).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+
+def to_minor(value: Optional[Number]) -> Optional[int]:
+    """Сумма -> целое число минимальных единиц"""
+    if value is None:
+        return None
+    return int(quantize(value) * MINOR_UNITS)
+
+
+def from_minor(minor: Optional[int]) -> Optional[Decimal]:
+    """Целое число минимальных единиц -> сумма"""
+    if minor is None:
+        return None
+    return Decimal(int(minor)).scaleb(-2)
+
+
+def format_money(value: Number) -> str:
+    """Сумма в виде строки с двумя знаками: 1099.9 -> "1099.90" """
+    return f"{quantize(value):.2f}"
+
+
+def discount_percent(old_price: Optional[Number], new_price: Optional[Number]) -> int:
+    """Скидка в целых процентах (округление половины вверх), 0 - если скидки нет"""
+    old, new = to_minor(old_price), to_minor(new_price)
+    if not old or new is None or old <= new:
+        return 0
+    return (200 * (old - new) + old) // (2 * old)
+
+
+def discount_percentage(old_price: Optional[Number], new_price: Optional[Number]) -> float:
+    """Скидка в процентах с одним знаком после запятой, как в ProductResponse (0.0 - скидки нет)"""
+    old, new = to_minor(old_price), to_minor(new_price)
+    if not old or new is None or old <= new:
+        return 0.0
+    return float((Decimal(100 * (old - new)) / old).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP))
+
+
+def line_total(unit_price: Number, quantity: int) -> Decimal:
+    """Стоимость позиции: цена * количество без накопления ошибки"""
+    return from_minor(to_minor(unit_price) * quantity)
+
+
+def total(amounts: Iterable[Number]) -> Decimal:
+    """Сумма сумм"""
+    return from_minor(sum(to_minor(amount) for amount in amounts))
+
+
+# Тип денежных полей схем: Decimal внутри, число в JSON (как раньше)
+Money = Annotated[
+    Decimal,
+    AfterValidator(quantize),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
@@ -0,0 +1,351 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, delete, func, insert, literal, select, text
+from sqlalchemy.sql import Select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.resources import Resource, resources
+from app.database.connection import SessionLocal
+from app.database.models import OutboxEvent, OutboxOffset
+
+logger = logging.getLogger(__name__)
+
+# Служебная запись в outbox_offsets: до какого id история уже удалена
+PRUNED_MARKER = "__pruned__"
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """Событие outbox, отвязанное от сессии"""
+
+    id: int
+    aggregate: str
+    aggregate_id: int
+    event_type: str
+    payload: Dict[str, Any]
+    created_at: Optional[datetime]
+
+
+Handler = Callable[[List[OutboxMessage]], None]
+
+
+class ChangeTokenExpired(ValueError):
+    """Позиция старше хранимой истории outbox - нужна полная синхронизация"""
+
+
+def record_event(db: Session, aggregate: str, aggregate_id: int, event_type: str, payload: Optional[Dict[str, Any]] = None) -> None:
+    """Записать событие в outbox в текущей транзакции (фиксируется вместе с изменением)"""
+    if not settings.outbox_enabled:
+        return
+    db.add(OutboxEvent(
+        aggregate=aggregate,
+        aggregate_id=aggregate_id,
+        event_type=event_type,
+        payload=payload or {},
+    ))
+
+
+def record_events_for(db: Session, aggregate: str, ids_query: Select, event_type: str) -> None:
+    """Записать события для множества объектов одним INSERT ... SELECT в текущей транзакции.
+
+    Payload не заполняется: потребители перечитывают такие объекты по id.
+    """
+    if not settings.outbox_enabled:
+        return
+    ids = ids_query.subquery()
+    id_column = list(ids.c)[0]
+    db.execute(insert(OutboxEvent).from_select(
+        ["aggregate", "aggregate_id", "event_type", "created_at"],
+        select(
+            literal(aggregate, String),
+            id_column,
+            literal(event_type, String),
+            func.now(),
+        ).order_by(id_column),
+    ))
+
+
+def _db_now(db: Session) -> datetime:
+    # created_at хранится без часового пояса во времени сессии БД
+    return db.execute(select(func.now())).scalar().replace(tzinfo=None)
+
+
+def running_transactions(db: Session) -> Optional[List[int]]:
+    """Пишущие транзакции, которые сейчас выполняются (None - СУБД этого не сообщает)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return [int(xid) for xid in db.execute(
+            text("SELECT pg_snapshot_xip(pg_current_snapshot())::text")
+        ).scalars()]
+    if dialect == "sqlite":
+        # Писатель в SQLite один и берет id больше всех закоммиченных: дыра между ними - уже откат
+        return []
+    return None
+
+
+def in_progress(db: Session, xids: List[int]) -> bool:
+    """Выполняется ли еще хотя бы одна из транзакций"""
+    if not xids:
+        return False
+    return bool(db.execute(
+        text(
+            "SELECT bool_or(pg_xact_status(CAST(CAST(x AS text) AS xid8)) = 'in progress') "
+            "FROM unnest(CAST(:xids AS bigint[])) AS x"
+        ),
+        {"xids": xids},
+    ).scalar())
+
+
+class GapTracker:
+    """Дыры в id outbox, которые ждут завершения транзакций.
+
+    id выдаются до коммита, поэтому событие с меньшим id может стать видимым
+    позже большего. Дыра закрывается, только когда доказано, что заполнить
+    ее уже некому: через outbox_gap_timeout после того, как ее заметили,
+    запоминаются выполняющиеся пишущие транзакции (владелец дыры к этому
+    времени точно получил xid), и дыра закрывается, когда все они завершились,
+    а событий в ней так и не появилось. СУБД без статусов транзакций ждут
+    outbox_gap_max_age - это допущение, а не доказательство.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (позиция перед дырой, id за ней) -> (когда заметили, транзакции, которые нужно дождаться)
+        self._gaps: Dict[Tuple[int, int], Tuple[float, Optional[List[int]]]] = {}
+
+    def is_closed(self, db: Session, after_id: int, next_id: int) -> bool:
+        """Можно ли читать дальше дыры между after_id и next_id"""
+        key = (after_id, next_id)
+        now = time.monotonic()
+        with self._lock:
+            seen_at, xids = self._gaps.setdefault(key, (now, None))
+        if now - seen_at < settings.outbox_gap_timeout:
+            return False
+
+        if xids is None:
+            xids = running_transactions(db)
+            if xids is None:
+                if now - seen_at < settings.outbox_gap_max_age:
+                    return False
+                logger.warning(
+                    "Дыра в outbox после id %s не заполнилась за %s с, пропускаем", after_id, settings.outbox_gap_max_age
+                )
+            else:
+                with self._lock:
+                    self._gaps[key] = (seen_at, xids)
+        if xids and in_progress(db, xids):
+            return False
+
+        # Транзакция могла закоммититься уже после нашего чтения - тогда событие надо прочитать
+        filled = db.execute(
+            select(func.count(OutboxEvent.id)).where(OutboxEvent.id > after_id, OutboxEvent.id < next_id)
+        ).scalar()
+        if filled:
+            return False
+        with self._lock:
+            self._gaps.pop(key, None)
+        return True
+
+    def forget(self, position: int) -> None:
+        """Забыть дыры до позиции: читатели уже прошли их (повторный вопрос начнет ожидание заново)"""
+        with self._lock:
+            for key in [key for key in self._gaps if key[1] <= position]:
+                del self._gaps[key]
+
+
+gaps = GapTracker()
+
+
+def read_events(
+    db: Session,
+    after_id: int,
+    limit: int,
+    aggregate: Optional[str] = None,
+) -> Tuple[List[OutboxMessage], int]:
+    """Прочитать события после after_id строго по порядку; вернуть их и новую позицию.
+
+    Чтение останавливается на первой дыре в id, пока GapTracker не докажет,
+    что событие в ней уже не появится. Позиция сдвигается и по событиям
+    других агрегатов.
+    """
+    rows = db.execute(
+        select(OutboxEvent).where(OutboxEvent.id > after_id).order_by(OutboxEvent.id).limit(limit)
+    ).scalars().all()
+
+    messages = []
+    position = after_id
+    for row in rows:
+        # С нуля (пустая позиция) дыра перед первым событием - это очищенная история
+        if position and row.id != position + 1 and not gaps.is_closed(db, position, row.id):
+            break
+        position = row.id
+        if aggregate is None or row.aggregate == aggregate:
+            messages.append(OutboxMessage(
+                row.id, row.aggregate, row.aggregate_id, row.event_type, row.payload or {}, row.created_at
+            ))
+    if position != after_id:
+        gaps.forget(position)
+    return messages, position
+
+
+def current_position(db: Session) -> int:
+    """Последний id в outbox"""
+    return db.execute(select(func.max(OutboxEvent.id))).scalar() or 0
+
+
+def pruned_position(db: Session) -> int:
+    """Последний удаленный при очистке id: события до него уже недоступны"""
+    return db.execute(
+        select(OutboxOffset.last_id).where(OutboxOffset.consumer == PRUNED_MARKER)
+    ).scalar() or 0
+
+
+class OutboxConsumer:
+    """Потребитель outbox.
+
+    Без имени позиция хранится в памяти воркера и начинается с текущего
+    конца outbox (локальные подписчики: кэши, снимки). С именем позиция
+    хранится в outbox_offsets и читается под блокировкой строки, так что
+    из всех воркеров пачку доставляет один (внешние получатели).
+    Доставка "хотя бы один раз": позиция сдвигается только после успешной
+    обработки пачки, обработчики должны быть идемпотентными.
+    """
+
+    def __init__(self, handler: Handler, name: Optional[str] = None):
+        self.handler = handler
+        self.name = name
+        self.last_id = 0
+
+    @property
+    def durable(self) -> bool:
+        return self.name is not None
+
+    def drain(self, limit: int) -> int:
+        """Доставить одну пачку событий; вернуть количество прочитанных"""
+        with SessionLocal() as db:
+            if self.durable:
+                return self._drain_durable(db, limit)
+
+            messages, last_id = read_events(db, self.last_id, limit)
+            if messages:
+                self.handler(messages)
+            self.last_id = last_id
+            return len(messages)
+
+    def _drain_durable(self, db: Session, limit: int) -> int:
+        offset = db.execute(
+            select(OutboxOffset).where(OutboxOffset.consumer == self.name).with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if offset is None:
+            if db.get(OutboxOffset, self.name) is not None:
+                # Пачку сейчас доставляет другой воркер
+                return 0
+            try:
+                db.add(OutboxOffset(consumer=self.name, last_id=0))
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+            return 0
+
+        messages, last_id = read_events(db, offset.last_id, limit)
+        if messages:
+            self.handler(messages)
+        if last_id != offset.last_id:
+            offset.last_id = last_id
+            db.commit()
+        return len(messages)
+
+
+class OutboxDispatcher(Resource):
+    """Фоновая доставка событий outbox подписчикам воркера"""
+
+    name = "outbox"
+
+    def __init__(self):
+        self._consumers: List[OutboxConsumer] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_prune = 0.0
+
+    def subscribe(self, handler: Handler, name: Optional[str] = None) -> Handler:
+        """Подписаться на пачки событий (name - постоянный потребитель)"""
+        self._consumers.append(OutboxConsumer(handler, name))
+        return handler
+
+    def start(self) -> None:
+        if not settings.outbox_enabled or not self._consumers:
+            return
+
+        with SessionLocal() as db:
+            position = current_position(db)
+        for consumer in self._consumers:
+            if not consumer.durable:
+                consumer.last_id = position
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def dispatch_once(self) -> int:
+        """Доставить всем потребителям по пачке; вернуть число событий"""
+        delivered = 0
+        for consumer in self._consumers:
+            try:
+                delivered += consumer.drain(settings.outbox_batch_size)
+            except Exception:
+                logger.exception("Ошибка доставки событий outbox потребителю %s", consumer.name or "local")
+        return delivered
+
+    def prune(self) -> None:
+        """Удалить события старше срока хранения, уже доставленные постоянным потребителям"""
+        with SessionLocal() as db:
+            cutoff = _db_now(db) - timedelta(days=settings.outbox_retention_days)
+            conditions = [OutboxEvent.created_at < cutoff]
+            min_offset = db.execute(
+                select(func.min(OutboxOffset.last_id)).where(OutboxOffset.consumer != PRUNED_MARKER)
+            ).scalar()
+            if min_offset is not None:
+                conditions.append(OutboxEvent.id <= min_offset)
+
+            last_pruned = db.execute(select(func.max(OutboxEvent.id)).where(*conditions)).scalar()
+            if last_pruned is None:
+                return
+
+            db.execute(delete(OutboxEvent).where(OutboxEvent.id <= last_pruned))
+            marker = db.get(OutboxOffset, PRUNED_MARKER)
+            if marker is None:
+                db.add(OutboxOffset(consumer=PRUNED_MARKER, last_id=last_pruned))
+            else:
+                marker.last_id = max(marker.last_id, last_pruned)
+            db.commit()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            delivered = self.dispatch_once()
+
+            if time.monotonic() - self._last_prune > 3600:
+                self._last_prune = time.monotonic()
+                try:
+                    self.prune()
+                except Exception:
+                    logger.exception("Ошибка очистки outbox")
+
+            # Пока есть отставание, читаем без паузы
+            if delivered < settings.outbox_batch_size:
+                self._stop.wait(settings.outbox_poll_interval)
+
+
+outbox = resources.register(OutboxDispatcher())
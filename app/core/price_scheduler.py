@@ -0,0 +1,56 @@
+import logging
+import threading
+from typing import Optional
+
+from app.config import settings
+from app.core.resources import Resource, resources
+from app.database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PriceScheduler(Resource):
+    """Фоновый запуск и завершение расписаний цен.
+
+    Поток есть в каждом воркере; переход статуса - условный UPDATE,
+    поэтому каждое расписание применяет ровно один из них.
+    """
+
+    name = "price_scheduler"
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if not settings.pricing_scheduler_enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="price-scheduler", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self) -> int:
+        """Обработать наступившие расписания; вернуть число переходов"""
+        from app.services.pricing_service import PricingService
+
+        with SessionLocal() as db:
+            return PricingService(db).run_due()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+                if processed:
+                    logger.info("Расписания цен: обработано %s", processed)
+            except Exception:
+                logger.exception("Ошибка обработки расписаний цен")
+            self._stop.wait(settings.pricing_poll_interval)
+
+
+price_scheduler = resources.register(PriceScheduler())
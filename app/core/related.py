@@ -0,0 +1,205 @@
+"""Расчет похожих товаров.
+
+Товар описывается разреженным вектором: теги с весом idf, категория и
+бренд. Сходство - косинус; для каждого товара в related_products
+хранится top-k соседей, так что /products/{id}/related читает один
+диапазон первичного ключа. Кандидаты берутся из общих тегов, все
+операции выполняются пачками в NumPy.
+
+    python -m app.core.related                 # пересчитать по DATABASE_URL
+    python -m app.core.related --k 20
+
+Запускается по расписанию (cron, k8s CronJob); нужен numpy.
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.database.models import Product, RelatedProduct, product_tags
+
+try:
+    import numpy as np
+except ImportError:  # numpy - необязательная зависимость, без нее задание не запускается
+    np = None
+
+_NULL_ID = -1
+
+
+def _group_ranks(groups):
+    """Номер элемента внутри своей группы (группы идут подряд)"""
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(groups)) + 1))
+    return np.arange(len(groups)) - np.repeat(starts, np.diff(np.append(starts, len(groups))))
+
+
+def _ranges(starts, lengths):
+    """Склеенные диапазоны [start, start + length) без цикла Python"""
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + np.arange(total) - offsets
+
+
+class FeatureMatrix:
+    """Разреженная матрица товар x тег (CSR по товарам и по тегам) плюс категория и бренд"""
+
+    def __init__(self, product_ids, categories, brands, tag_rows, tag_cols, category_weight: float, brand_weight: float):
+        self.product_ids = np.asarray(product_ids, dtype=np.int64)
+        self.categories = np.asarray(categories, dtype=np.int64)
+        self.brands = np.asarray(brands, dtype=np.int64)
+        self.size = len(self.product_ids)
+        self.category_weight = category_weight
+        self.brand_weight = brand_weight
+
+        tag_rows = np.asarray(tag_rows, dtype=np.int64)
+        tag_cols = np.asarray(tag_cols, dtype=np.int64)
+        tags_count = int(tag_cols.max()) + 1 if len(tag_cols) else 0
+
+        # Теги товара: product_indptr[i]:product_indptr[i + 1] в product_tags
+        order = np.argsort(tag_rows, kind="stable")
+        self.product_tags = tag_cols[order]
+        self.product_indptr = np.concatenate(([0], np.cumsum(np.bincount(tag_rows, minlength=self.size))))
+
+        # Товары тега: tag_indptr[t]:tag_indptr[t + 1] в tag_products
+        order = np.argsort(tag_cols, kind="stable")
+        self.tag_products = tag_rows[order]
+        self.df = np.bincount(tag_cols, minlength=tags_count)
+        self.tag_indptr = np.concatenate(([0], np.cumsum(self.df)))
+
+        # Редкий тег говорит о сходстве больше частого
+        self.idf = np.log((self.size + 1) / (self.df + 1)) + 1.0
+        squares = np.bincount(tag_rows, weights=self.idf[tag_cols] ** 2, minlength=self.size)
+        squares += (self.categories != _NULL_ID) * category_weight ** 2
+        squares += (self.brands != _NULL_ID) * brand_weight ** 2
+        self.norms = np.sqrt(squares)
+        self.norms[self.norms == 0] = 1.0
+
+    def neighbors(self, rows, k: int, max_tag_df: int) -> Tuple[Any, Any, Any, Any]:
+        """Top-k соседей для пачки товаров: (строка, ранг, сосед, сходство), по убыванию сходства"""
+        rows = np.asarray(rows, dtype=np.int64)
+        lengths = self.product_indptr[rows + 1] - self.product_indptr[rows]
+        batch_row = np.repeat(np.arange(len(rows)), lengths)
+        tags = self.product_tags[_ranges(self.product_indptr[rows], lengths)]
+
+        # Частые теги дают слишком много кандидатов и почти ничего не значат
+        common = self.df[tags] <= max_tag_df
+        batch_row, tags = batch_row[common], tags[common]
+
+        lengths = self.df[tags]
+        pair_row = np.repeat(batch_row, lengths)
+        candidates = self.tag_products[_ranges(self.tag_indptr[tags], lengths)]
+        weights = np.repeat(self.idf[tags] ** 2, lengths)
+
+        not_self = candidates != rows[pair_row]
+        pair_row, candidates, weights = pair_row[not_self], candidates[not_self], weights[not_self]
+        if not len(candidates):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, np.empty(0)
+
+        # Скалярное произведение по тегам: сумма весов по уникальным парам (товар, кандидат)
+        keys, inverse = np.unique(pair_row * self.size + candidates, return_inverse=True)
+        dot = np.bincount(inverse, weights=weights)
+        pair_row, candidates = keys // self.size, keys % self.size
+
+        sources = rows[pair_row]
+        same_category = (self.categories[sources] == self.categories[candidates]) & (self.categories[sources] != _NULL_ID)
+        same_brand = (self.brands[sources] == self.brands[candidates]) & (self.brands[sources] != _NULL_ID)
+        dot += same_category * self.category_weight ** 2 + same_brand * self.brand_weight ** 2
+        scores = dot / (self.norms[sources] * self.norms[candidates])
+
+        # Сортировка по строке, затем по убыванию сходства; при равенстве - по id
+        order = np.lexsort((self.product_ids[candidates], -scores, pair_row))
+        pair_row, candidates, scores = pair_row[order], candidates[order], scores[order]
+        ranks = _group_ranks(pair_row)
+        top = ranks < k
+        return pair_row[top], ranks[top], candidates[top], scores[top]
+
+
+def load_features(db: Session) -> FeatureMatrix:
+    """Загрузить признаки активных товаров"""
+    rows = db.execute(
+        select(Product.id, Product.category_id, Product.brand_id)
+        .where(Product.is_active == True)
+        .order_by(Product.id)
+    ).all()
+    product_ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+    categories = np.fromiter((_NULL_ID if row.category_id is None else row.category_id for row in rows), dtype=np.int64, count=len(rows))
+    brands = np.fromiter((_NULL_ID if row.brand_id is None else row.brand_id for row in rows), dtype=np.int64, count=len(rows))
+
+    pairs = db.execute(select(product_tags.c.product_id, product_tags.c.tag_id)).all()
+    pair_products = np.fromiter((pair[0] for pair in pairs), dtype=np.int64, count=len(pairs))
+    pair_tags = np.fromiter((pair[1] for pair in pairs), dtype=np.int64, count=len(pairs))
+
+    # Индексы строк вместо id; связи неактивных товаров отбрасываются
+    positions = np.searchsorted(product_ids, pair_products)
+    known = positions < len(product_ids)
+    known[known] = product_ids[positions[known]] == pair_products[known]
+    _, tag_cols = np.unique(pair_tags[known], return_inverse=True)
+
+    return FeatureMatrix(
+        product_ids, categories, brands, positions[known], tag_cols,
+        settings.related_category_weight, settings.related_brand_weight,
+    )
+
+
+def rebuild(db: Session, k: Optional[int] = None, batch_size: Optional[int] = None) -> int:
+    """Пересчитать related_products; вернуть число сохраненных связей.
+
+    Соседи заменяются пачками по batch_size товаров, каждая пачка - своя
+    короткая транзакция: читатели видят для товара либо старый, либо новый
+    список, а таблица не блокируется на весь пересчет.
+    """
+    if np is None:
+        raise RuntimeError("Для расчета похожих товаров установите пакет numpy (extra perf)")
+    k = k or settings.related_products_k
+    batch_size = batch_size or settings.related_batch_size
+
+    features = load_features(db)
+    db.commit()
+    stored = 0
+    for start in range(0, features.size, batch_size):
+        rows = np.arange(start, min(start + batch_size, features.size))
+        pair_row, ranks, candidates, scores = features.neighbors(rows, k, settings.related_max_tag_df)
+        db.execute(delete(RelatedProduct).where(
+            RelatedProduct.product_id.in_(features.product_ids[rows].tolist())
+        ))
+        if len(pair_row):
+            db.execute(insert(RelatedProduct), [
+                {"product_id": int(product_id), "rank": int(rank), "related_id": int(related_id), "score": float(score)}
+                for product_id, rank, related_id, score in zip(
+                    features.product_ids[rows[pair_row]], ranks, features.product_ids[candidates], scores
+                )
+            ])
+        db.commit()
+        stored += len(pair_row)
+
+    # Соседи товаров, ставших неактивными или удаленных с прошлого пересчета
+    db.execute(delete(RelatedProduct).where(
+        ~RelatedProduct.product_id.in_(select(Product.id).where(Product.is_active == True))
+    ))
+    db.commit()
+    return stored
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пересчет похожих товаров")
+    parser.add_argument("--k", type=int, default=None, help="соседей на товар")
+    parser.add_argument("--batch-size", type=int, default=None, help="товаров в пачке")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        stored = rebuild(db, args.k, args.batch_size)
+    print(f"✅ Похожие товары: {stored} связей за {time.perf_counter() - started:.1f} с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
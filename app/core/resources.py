@@ -0,0 +1,107 @@
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.database.connection import database, replicas
+
+logger = logging.getLogger(__name__)
+
+
+class Resource:
+    """Ресурс воркера: создается при старте, прогревается и закрывается при остановке"""
+
+    name: str = "resource"
+
+    def start(self) -> None:
+        """Создать ресурс в текущем процессе"""
+
+    def warm(self) -> None:
+        """Прогреть ресурс до приема трафика"""
+
+    def close(self) -> None:
+        """Освободить ресурс"""
+
+
+class DatabaseResource(Resource):
+    """Пул соединений с БД текущего воркера"""
+
+    name = "database"
+
+    def start(self) -> None:
+        database.engine
+        # Здоровье реплик проверяет фоновый поток, запросы читают готовый результат
+        replicas.start()
+
+    def warm(self) -> None:
+        # Открываем первое соединение заранее, чтобы первый запрос не платил за connect
+        with database.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    def close(self) -> None:
+        replicas.stop()
+        database.dispose()
+        replicas.dispose()
+
+
+class ResourceContainer:
+    """Контейнер ресурсов воркера с управлением жизненным циклом"""
+
+    def __init__(self):
+        self._resources: Dict[str, Resource] = {}
+        self.state = "stopped"
+
+    def register(self, resource: Resource) -> Resource:
+        """Зарегистрировать ресурс (порядок регистрации = порядок запуска)"""
+        self._resources[resource.name] = resource
+        return resource
+
+    def get(self, name: str) -> Optional[Resource]:
+        """Получить ресурс по имени"""
+        return self._resources.get(name)
+
+    @property
+    def resources(self) -> List[Resource]:
+        return list(self._resources.values())
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self) -> None:
+        """Создать все ресурсы"""
+        self.state = "starting"
+        for resource in self.resources:
+            resource.start()
+        self.state = "warming"
+
+    def warm(self) -> None:
+        """Прогреть все ресурсы; после этого воркер готов принимать трафик"""
+        for resource in self.resources:
+            try:
+                resource.warm()
+            except Exception:
+                # Неудачный прогрев не должен ронять воркер - ресурс догреется на запросах
+                logger.exception("Не удалось прогреть ресурс %s", resource.name)
+        if self.state == "warming":
+            self.state = "ready"
+
+    def startup(self) -> None:
+        """Создать и прогреть все ресурсы"""
+        self.start()
+        self.warm()
+
+    def shutdown(self) -> None:
+        """Закрыть ресурсы в обратном порядке"""
+        self.state = "stopping"
+        for resource in reversed(self.resources):
+            try:
+                resource.close()
+            except Exception:
+                logger.exception("Ошибка при закрытии ресурса %s", resource.name)
+        self.state = "stopped"
+
+
+# Ресурсы текущего воркера
+resources = ResourceContainer()
+resources.register(DatabaseResource())
@@ -1,5 +1,51 @@
 """Gunicorn Application Options Configuration."""
 
+import copy
+import logging
+import os
+
+from gunicorn.glogging import CONFIG_DEFAULTS
+
+from app.core.servers.gunicorn import hooks
+
+
+def get_workers_count(workers: int, per_core: int = 1, max_workers: int = 0) -> int:
+    """Return the number of workers, deriving it from the available CPUs when not set."""
+    if workers > 0:
+        return workers
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS / Windows
+        cpus = os.cpu_count() or 1
+
+    count = max(cpus * per_core, 1)
+    if max_workers > 0:
+        count = min(count, max_workers)
+    return count
+
+
+def get_access_log_config(mode: str, buffer_size: int) -> dict | None:
+    """Return a logging dict config that batches access log writes to stdout."""
+    if mode != "buffered":
+        return None
+
+    config = copy.deepcopy(CONFIG_DEFAULTS)
+    config["handlers"]["access_buffer"] = {
+        "class": "logging.handlers.MemoryHandler",
+        "capacity": buffer_size,
+        "flushLevel": logging.ERROR,
+        "target": "console",
+    }
+    config["loggers"]["gunicorn.error"]["propagate"] = False
+    config["loggers"]["gunicorn.access"] = {
+        "level": "INFO",
+        "handlers": ["access_buffer"],
+        "propagate": False,
+        "qualname": "gunicorn.access",
+    }
+    return config
+
 
 def get_app_options(
     host: str,
@@ -7,14 +53,32 @@ def get_app_options(
     timeout: int,
     workers: int,
     log_level: str,
+    worker_class: str | type = "uvicorn.workers.UvicornWorker",
+    graceful_timeout: int | None = None,
+    keepalive: int | None = None,
+    backlog: int | None = None,
+    preload_app: bool = False,
+    max_requests: int = 0,
+    max_requests_jitter: int = 0,
+    access_log: str = "stdout",
+    access_log_buffer: int = 256,
 ) -> dict:
     """Return Gunicorn application options."""
     return {
-        "accesslog": "-",
+        "accesslog": "-" if access_log == "stdout" else None,
+        "logconfig_dict": get_access_log_config(access_log, access_log_buffer),
         "errorlog": "-",
         "bind": f"{host}:{port}",
         "loglevel": log_level,
         "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "keepalive": keepalive,
+        "backlog": backlog,
         "workers": workers,
-        "worker_class": "uvicorn.workers.UvicornWorker",
+        "worker_class": worker_class,
+        "preload_app": preload_app,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests_jitter,
+        "post_fork": hooks.post_fork,
+        "worker_exit": hooks.worker_exit,
     }
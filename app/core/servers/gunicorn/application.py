@@ -1,5 +1,7 @@
 """Gunicorn Application Configuration."""
 
+from typing import Callable
+
 from fastapi import FastAPI
 from gunicorn.app.base import BaseApplication
 
@@ -9,17 +11,21 @@ class Application(BaseApplication):
 
     def __init__(
         self,
-        application: FastAPI,
+        application: Callable[[], FastAPI],
         options: dict | None = None,
     ) -> None:
-        """Initialize the Gunicorn application with FastAPI app and configuration options."""
+        """Initialize the Gunicorn application with a FastAPI app factory and configuration options.
+
+        The factory runs in the master with ``preload_app`` (workers inherit the
+        imported app through fork) and in each worker otherwise.
+        """
         self.options = options or {}
         self.application = application
         super().__init__()
 
     def load(self) -> FastAPI:
-        """Load the FastAPI application."""
-        return self.application
+        """Build the FastAPI application."""
+        return self.application()
 
     @property
     def config_options(self) -> dict:
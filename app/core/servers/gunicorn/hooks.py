@@ -0,0 +1,25 @@
+"""Gunicorn Server Hooks."""
+
+from gunicorn.arbiter import Arbiter
+from gunicorn.workers.base import Worker
+
+
+def post_fork(server: Arbiter, worker: Worker) -> None:
+    """Drop pooled DB connections inherited from the master process.
+
+    With ``preload_app`` the engine may have been used in the master before
+    forking; the child must not reuse those sockets, so the pool is dropped
+    without closing the parent's connections and recreated on first use.
+    """
+    from app.database.connection import database
+
+    database.dispose(close=False)
+
+
+def worker_exit(server: Arbiter, worker: Worker) -> None:
+    """Flush buffered access logs and close pooled DB connections on exit."""
+    from app.database.connection import database
+
+    for handler in worker.log.access_log.handlers:
+        handler.flush()
+    database.dispose()
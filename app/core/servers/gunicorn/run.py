@@ -3,21 +3,36 @@
 __all__ = ("main",)
 
 from app.config import settings
-from app.core.servers.gunicorn.app_options import get_app_options
+from app.core.servers.gunicorn.app_options import get_app_options, get_workers_count
 from app.core.servers.gunicorn.application import Application
-from app.main import app as fastapi_app
+from app.core.servers.gunicorn.worker import TunedUvicornWorker
+from app.main import create_app
 
 
 def main() -> None:
     """Run the Gunicorn application with FastAPI app and configuration options."""
+    gunicorn_settings = settings.servers.GUNICORN
     Application(
-        application=fastapi_app,
+        application=create_app,
         options=get_app_options(
-            host=settings.servers.GUNICORN.HOST,
-            port=settings.servers.GUNICORN.PORT,
-            timeout=settings.servers.GUNICORN.TIMEOUT,
-            workers=settings.servers.GUNICORN.WORKERS,
-            log_level="INFO",
+            host=gunicorn_settings.HOST,
+            port=gunicorn_settings.PORT,
+            timeout=gunicorn_settings.TIMEOUT,
+            workers=get_workers_count(
+                gunicorn_settings.WORKERS,
+                per_core=gunicorn_settings.WORKERS_PER_CORE,
+                max_workers=gunicorn_settings.MAX_WORKERS,
+            ),
+            log_level=gunicorn_settings.LOG_LEVEL,
+            worker_class=TunedUvicornWorker,
+            graceful_timeout=gunicorn_settings.GRACEFUL_TIMEOUT,
+            keepalive=gunicorn_settings.KEEPALIVE,
+            backlog=gunicorn_settings.BACKLOG,
+            preload_app=gunicorn_settings.PRELOAD_APP,
+            max_requests=gunicorn_settings.MAX_REQUESTS,
+            max_requests_jitter=gunicorn_settings.MAX_REQUESTS_JITTER,
+            access_log=gunicorn_settings.ACCESS_LOG,
+            access_log_buffer=gunicorn_settings.ACCESS_LOG_BUFFER,
         ),
     ).run()
 
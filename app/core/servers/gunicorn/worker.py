@@ -0,0 +1,42 @@
+"""Gunicorn Uvicorn Worker Configuration."""
+
+import importlib.util
+import logging
+from typing import Any
+
+from uvicorn.workers import UvicornWorker
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Event loop / HTTP protocol implementation -> module that provides it
+_OPTIONAL_IMPLEMENTATIONS = {
+    "uvloop": "uvloop",
+    "httptools": "httptools",
+}
+
+
+def resolve_implementation(name: str) -> str:
+    """Return the requested implementation or ``auto`` if it is not installed."""
+    module = _OPTIONAL_IMPLEMENTATIONS.get(name)
+    if module and importlib.util.find_spec(module) is None:
+        logger.warning("%s is not installed, falling back to 'auto'", module)
+        return "auto"
+    return name
+
+
+def get_worker_config_kwargs() -> dict[str, Any]:
+    """Return the Uvicorn config overrides for Gunicorn workers."""
+    gunicorn_settings = settings.servers.GUNICORN
+    return {
+        "loop": resolve_implementation(gunicorn_settings.LOOP),
+        "http": resolve_implementation(gunicorn_settings.HTTP),
+        "access_log": gunicorn_settings.ACCESS_LOG != "off",
+    }
+
+
+class TunedUvicornWorker(UvicornWorker):
+    """Uvicorn worker using the event loop and HTTP parser from settings."""
+
+    CONFIG_KWARGS = get_worker_config_kwargs()
@@ -10,11 +10,14 @@ from app.config import settings
 def main() -> None:
     """Run the Uvicorn application with FastAPI app and configuration options."""
     uvicorn.run(
-        "app.main:app",
+        "app.main:create_app",
+        factory=True,
         host=settings.servers.UVICORN.HOST,
         port=settings.servers.UVICORN.PORT,
         reload=settings.servers.UVICORN.RELOAD,
         workers=settings.servers.UVICORN.WORKERS,
+        loop=settings.servers.UVICORN.LOOP,
+        http=settings.servers.UVICORN.HTTP,
     )
 
 
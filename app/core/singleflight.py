@@ -0,0 +1,175 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def make_key(name: str, **params: Any) -> str:
+    """Нормализованный ключ запроса: имя + параметры в стабильном порядке"""
+    normalized = {k: v for k, v in params.items() if v is not None}
+    return f"{name}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Объединение одинаковых одновременных вызовов в один.
+
+    Первый поток с данным ключом выполняет функцию, остальные ждут и
+    получают тот же результат (или то же исключение).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+class StaleWhileRevalidate:
+    """Кэш результатов чтения с объединением запросов и отдачей устаревших данных.
+
+    Пока запись свежая - она отдается из памяти. После fresh_ttl запись
+    считается устаревшей: ее по-прежнему отдают, а обновление идет одним
+    фоновым потоком. После stale_ttl запрос ждет загрузку, но одинаковые
+    запросы ждут одну общую загрузку. Значения должны быть неизменяемыми
+    и не привязанными к сессии (dict/list, а не ORM-объекты).
+    """
+
+    def __init__(self, fresh_ttl: float, stale_ttl: float, max_entries: int = 1024):
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = max(stale_ttl, fresh_ttl)
+        self.max_entries = max_entries
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._generation = 0
+
+    def get(self, key: str, loader: Callable[[Session], T], db: Session) -> T:
+        """Получить значение; loader получает сессию БД"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                return value
+            if now < stale_until:
+                self._refresh_in_background(key, loader)
+                return value
+
+        return self._flight.do(key, lambda: self._load(key, loader, db))
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Сбросить одну запись или весь кэш"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _load(self, key: str, loader: Callable[[Session], T], db: Session) -> T:
+        generation = self._generation
+        value = loader(db)
+        now = time.monotonic()
+        with self._lock:
+            # Если во время загрузки была инвалидация, результат мог устареть
+            if generation == self._generation:
+                self._entries[key] = (value, now + self.fresh_ttl, now + self.stale_ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def _refresh_in_background(self, key: str, loader: Callable[[Session], T]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            db = SessionLocal()
+            try:
+                self._flight.do(key, lambda: self._load(key, loader, db))
+            except Exception:
+                logger.exception("Не удалось обновить %s в фоне", key)
+            finally:
+                db.close()
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"swr-refresh:{key}", daemon=True).start()
+
+
+class PartitionedReads:
+    """StaleWhileRevalidate на каждый раздел (например, магазин).
+
+    Сброс раздела не трогает записи остальных: изменения товаров одного
+    магазина не вымывают кэш витрин других.
+    """
+
+    def __init__(self, fresh_ttl: float, stale_ttl: float, max_entries: int = 256):
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._partitions: Dict[Hashable, StaleWhileRevalidate] = {}
+
+    def partition(self, name: Hashable) -> StaleWhileRevalidate:
+        with self._lock:
+            reads = self._partitions.get(name)
+            if reads is None:
+                reads = self._partitions[name] = StaleWhileRevalidate(self.fresh_ttl, self.stale_ttl, self.max_entries)
+            return reads
+
+    def invalidate(self, names: Optional[Iterable[Hashable]] = None) -> None:
+        """Сбросить перечисленные разделы или все"""
+        with self._lock:
+            partitions = list(self._partitions.values()) if names is None else [
+                self._partitions[name] for name in names if name in self._partitions
+            ]
+        for reads in partitions:
+            reads.invalidate()
@@ -0,0 +1,316 @@
+"""Карта сайта и фид товаров (Google Shopping).
+
+Активные товары читаются из БД потоком (серверный курсор) прямо в
+gzip-файлы. Шард N - товары с id в [N * size + 1, (N + 1) * size], так что
+в файле не больше 50 000 URL и состав шарда не зависит от соседних.
+Повторный запуск перестраивает только шарды, в которых по outbox были
+изменения товаров, их брендов или изображений после прошлого запуска. Фид собирается из частей шардов склейкой
+gzip-потоков, без повторного сжатия.
+
+    python -m app.core.sitemaps            # обновить измененные шарды
+    python -m app.core.sitemaps --full     # перестроить все
+
+Файлы раздаются статически по settings.sitemap_url (sitemap.xml - индекс).
+"""
+
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.money import format_money
+from app.core.outbox import current_position, pruned_position, read_events
+from app.database.connection import SessionLocal
+from app.database.models import Brand, Image, Product, product_images
+from app.media.storage import image_url
+
+# Предел протокола sitemaps на один файл
+MAX_URLS = 50000
+MANIFEST = "manifest.json"
+INDEX = "sitemap.xml"
+FEED = "feed.xml.gz"
+_PARTS = "parts"
+_EVENTS_BATCH = 5000
+
+_SITEMAP_HEAD = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_SITEMAP_TAIL = "</urlset>\n"
+_FEED_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n<channel>\n'
+    "<title>{title}</title>\n<link>{link}</link>\n<description>{title}</description>\n"
+)
+_FEED_TAIL = "</channel>\n</rss>\n"
+
+
+def shard_size() -> int:
+    return min(settings.sitemap_shard_size, MAX_URLS)
+
+
+def shard_name(shard: int) -> str:
+    return f"products-{shard}.xml.gz"
+
+
+def product_link(slug: str) -> str:
+    return settings.site_url.rstrip("/") + settings.site_product_path.format(slug=slug)
+
+
+def absolute_url(url: str) -> str:
+    """Ссылки на загруженные файлы - относительно адреса API"""
+    if url and url.startswith("/"):
+        return settings.public_api_url.rstrip("/") + url
+    return url
+
+
+def _select_products(first_id: int, last_id: int):
+    # Основное изображение как в карточке: is_primary, иначе первое по id
+    primary_image_id = (
+        select(product_images.c.image_id)
+        .join(Image, Image.id == product_images.c.image_id)
+        .where(product_images.c.product_id == Product.id)
+        .order_by(Image.is_primary.desc(), Image.id)
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Product.id, Product.slug, Product.sku, Product.title, Product.meta_title, Product.description,
+            Product.base_price, Product.old_price, Product.total_stock, Product.stock_state,
+            func.coalesce(Product.updated_at, Product.created_at).label("updated_at"),
+            Brand.name.label("brand"),
+            Image.url, Image.content_hash, Image.content_type,
+        )
+        .outerjoin(Brand, Brand.id == Product.brand_id)
+        .outerjoin(Image, Image.id == primary_image_id)
+        .where(Product.is_active == True, Product.id.between(first_id, last_id))
+        .order_by(Product.id)
+    )
+
+
+def stream_products(db: Session, shard: int) -> Iterator[Any]:
+    """Строки товаров шарда; на Postgres - серверный курсор пачками"""
+    size = shard_size()
+    statement = _select_products(shard * size + 1, (shard + 1) * size)
+    yield from db.execute(statement.execution_options(yield_per=2000))
+
+
+def sitemap_entry(row) -> str:
+    return f"<url><loc>{escape(product_link(row.slug))}</loc><lastmod>{row.updated_at:%Y-%m-%d}</lastmod></url>\n"
+
+
+def feed_entry(row) -> str:
+    fields = [
+        ("g:id", row.sku or str(row.id)),
+        ("g:title", row.meta_title or row.title),
+        ("g:description", row.description or row.title),
+        ("g:link", product_link(row.slug)),
+        ("g:condition", "new"),
+        ("g:availability", "in_stock" if (row.total_stock or 0) > 0 and row.stock_state == "Available" else "out_of_stock"),
+    ]
+    price = f"{format_money(row.base_price or 0)} {settings.feed_currency}"
+    if row.old_price and row.old_price > (row.base_price or 0):
+        fields += [("g:price", f"{format_money(row.old_price)} {settings.feed_currency}"), ("g:sale_price", price)]
+    else:
+        fields.append(("g:price", price))
+    if row.url:
+        fields.append(("g:image_link", absolute_url(image_url(row, "large"))))
+    if row.brand:
+        fields.append(("g:brand", row.brand))
+    return "<item>" + "".join(f"<{tag}>{escape(value)}</{tag}>" for tag, value in fields) + "</item>\n"
+
+
+@contextlib.contextmanager
+def _atomic_gzip(path: str) -> Iterator[Any]:
+    """gzip-файл, который появляется под своим именем только целиком"""
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as raw:
+        # mtime=0: одинаковое содержимое - одинаковые байты (и ETag)
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+            yield compressed
+    os.replace(temp, path)
+
+
+def write_shard(db: Session, directory: str, shard: int) -> Optional[Dict[str, Any]]:
+    """Записать карту сайта и часть фида шарда; None - в шарде нет активных товаров"""
+    sitemap_path = os.path.join(directory, shard_name(shard))
+    part_path = os.path.join(directory, _PARTS, shard_name(shard))
+    urls = 0
+    lastmod = None
+    with _atomic_gzip(sitemap_path) as sitemap, _atomic_gzip(part_path) as part:
+        sitemap.write(_SITEMAP_HEAD.encode())
+        for row in stream_products(db, shard):
+            sitemap.write(sitemap_entry(row).encode())
+            part.write(feed_entry(row).encode())
+            urls += 1
+            if lastmod is None or row.updated_at > lastmod:
+                lastmod = row.updated_at
+        sitemap.write(_SITEMAP_TAIL.encode())
+    if not urls:
+        os.remove(sitemap_path)
+        os.remove(part_path)
+        return None
+    return {"urls": urls, "lastmod": lastmod.isoformat(timespec="seconds")}
+
+
+def write_index(directory: str, shards: Dict[str, Dict[str, Any]]) -> None:
+    base = settings.public_api_url.rstrip("/") + settings.sitemap_url
+    temp = os.path.join(directory, f"{INDEX}.tmp")
+    with open(temp, "w", encoding="utf-8") as index:
+        index.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for shard in sorted(shards, key=int):
+            index.write(f"<sitemap><loc>{escape(base)}/{shard_name(int(shard))}</loc>"
+                        f"<lastmod>{shards[shard]['lastmod']}</lastmod></sitemap>\n")
+        index.write("</sitemapindex>\n")
+    os.replace(temp, os.path.join(directory, INDEX))
+
+
+def assemble_feed(directory: str, shards: Dict[str, Dict[str, Any]]) -> None:
+    """Фид - склейка gzip-потоков: заголовок, части шардов, окончание"""
+    head = _FEED_HEAD.format(title=escape(settings.app_name), link=escape(settings.site_url))
+    path = os.path.join(directory, FEED)
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as feed:
+        feed.write(gzip.compress(head.encode(), mtime=0))
+        for shard in sorted(shards, key=int):
+            with open(os.path.join(directory, _PARTS, shard_name(int(shard))), "rb") as part:
+                shutil.copyfileobj(part, feed)
+        feed.write(gzip.compress(_FEED_TAIL.encode(), mtime=0))
+    os.replace(temp, path)
+
+
+def load_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _settings_fingerprint() -> Dict[str, Any]:
+    # При смене этих настроек меняются все файлы
+    return {"shard_size": shard_size(), "site_url": settings.site_url, "product_path": settings.site_product_path,
+            "public_api_url": settings.public_api_url, "currency": settings.feed_currency}
+
+
+def _shards_of(db: Session, condition) -> Set[int]:
+    """Шарды товаров, подходящих под условие"""
+    size = shard_size()
+    return set(db.execute(select(((Product.id - 1) // size).distinct()).where(condition)).scalars())
+
+
+def changed_shards(db: Session, manifest: Optional[Dict[str, Any]]) -> Tuple[Optional[Set[int]], int]:
+    """Шарды с изменениями после прошлого запуска и новая позиция outbox; None - перестроить все.
+
+    В фиде есть название бренда и основное изображение, поэтому изменения
+    брендов и изображений перестраивают шарды их товаров. Удаленный бренд
+    или изображение уже не связаны с товарами - тогда перестраивается все.
+    """
+    pruned = pruned_position(db)
+    # После очистки outbox может быть пустым: позиция не меньше очищенной
+    start = max(current_position(db), pruned)
+    if not manifest or manifest.get("settings") != _settings_fingerprint():
+        return None, start
+    position = manifest["position"]
+    if position < pruned:
+        # История изменений с прошлого запуска уже очищена
+        return None, start
+
+    size = shard_size()
+    shards = set()
+    changed: Dict[str, Set[int]] = {"brand": set(), "image": set()}
+    while True:
+        messages, new_position = read_events(db, position, _EVENTS_BATCH)
+        for message in messages:
+            if message.aggregate == "product":
+                shards.add((message.aggregate_id - 1) // size)
+            elif message.aggregate in changed:
+                if message.event_type == "deleted":
+                    return None, start
+                changed[message.aggregate].add(message.aggregate_id)
+        if new_position == position:
+            break
+        position = new_position
+
+    brand_ids, image_ids = sorted(changed["brand"]), sorted(changed["image"])
+    for offset in range(0, len(brand_ids), _EVENTS_BATCH):
+        shards |= _shards_of(db, Product.brand_id.in_(brand_ids[offset:offset + _EVENTS_BATCH]))
+    for offset in range(0, len(image_ids), _EVENTS_BATCH):
+        linked = select(product_images.c.product_id).where(
+            product_images.c.image_id.in_(image_ids[offset:offset + _EVENTS_BATCH])
+        )
+        shards |= _shards_of(db, Product.id.in_(linked))
+    return shards, position
+
+
+def generate(db: Session, directory: Optional[str] = None, full: bool = False) -> Dict[str, Any]:
+    """Обновить карту сайта и фид; вернуть манифест с числом перестроенных шардов"""
+    directory = directory or settings.sitemap_dir
+    os.makedirs(os.path.join(directory, _PARTS), exist_ok=True)
+    manifest = None if full else load_manifest(directory)
+    shards_to_write, position = changed_shards(db, manifest)
+
+    shards: Dict[str, Dict[str, Any]] = dict(manifest["shards"]) if shards_to_write is not None else {}
+    if shards_to_write is None:
+        max_id = db.execute(select(func.max(Product.id))).scalar() or 0
+        shards_to_write = set(range((max_id - 1) // shard_size() + 1)) if max_id else set()
+
+    for shard in sorted(shards_to_write):
+        entry = write_shard(db, directory, shard)
+        if entry is None:
+            shards.pop(str(shard), None)
+        else:
+            shards[str(shard)] = entry
+
+    # Файлы шардов, которых больше нет (после полной перестройки или смены размера шарда)
+    current = {shard_name(int(shard)) for shard in shards}
+    for folder in (directory, os.path.join(directory, _PARTS)):
+        for name in os.listdir(folder):
+            if name.startswith("products-") and name.endswith(".xml.gz") and name not in current:
+                os.remove(os.path.join(folder, name))
+
+    if shards_to_write or not os.path.exists(os.path.join(directory, FEED)):
+        write_index(directory, shards)
+        assemble_feed(directory, shards)
+
+    manifest = {
+        "position": position,
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "settings": _settings_fingerprint(),
+        "shards": shards,
+    }
+    temp = os.path.join(directory, f"{MANIFEST}.tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp, os.path.join(directory, MANIFEST))
+    return {**manifest, "regenerated": sorted(shards_to_write)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Карта сайта и фид товаров")
+    parser.add_argument("--full", action="store_true", help="перестроить все шарды")
+    parser.add_argument("--dir", default=None, help="каталог файлов (по умолчанию settings.sitemap_dir)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        result = generate(db, args.dir, args.full)
+    urls = sum(shard["urls"] for shard in result["shards"].values())
+    print(f"✅ Карта сайта: {urls} URL в {len(result['shards'])} файлах, "
+          f"перестроено шардов: {len(result['regenerated'])} за {time.perf_counter() - started:.1f} с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
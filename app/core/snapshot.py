@@ -0,0 +1,323 @@
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import BigInteger, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import type_coerce
+
+from app.config import settings
+from app.core.money import to_minor
+from app.core.outbox import OutboxMessage, outbox
+from app.core.resources import Resource, resources
+from app.database.connection import SessionLocal
+from app.database.models import Product, attribute_products
+
+try:
+    import numpy as np
+except ImportError:  # numpy - необязательная зависимость, без нее списки строятся в SQL
+    np = None
+
+logger = logging.getLogger(__name__)
+
+STOCK_STATES = {"Available": 0, "OutOfStock": 1, "Discontinued": 2}
+_UNKNOWN_STATE = 3
+# Пустой внешний ключ в целочисленной колонке
+_NULL_ID = -1
+
+# Сортировки, которые снимок умеет выполнять сам; остальные уходят в SQL
+SORT_COLUMNS = {"created_at": "created_at", "base_price": "price", "total_stock": "stock", "id": "id"}
+FILTERS = {"category_id", "brand_id", "shop_id", "min_price", "max_price", "in_stock", "stock_state",
+           "is_featured", "attributes", "sort_by", "sort_order"}
+
+_COLUMNS = {
+    "id": "int64",
+    "price": "int64",
+    "stock": "int32",
+    "category_id": "int32",
+    "brand_id": "int32",
+    "shop_id": "int32",
+    "created_at": "int64",
+    "is_featured": "bool",
+    "stock_state": "int8",
+}
+
+
+def _row_values(row) -> Dict[str, Any]:
+    created_at = row.created_at or datetime(1970, 1, 1)
+    return {
+        "id": row.id,
+        "price": row.price or 0,
+        "stock": row.total_stock or 0,
+        "category_id": _NULL_ID if row.category_id is None else row.category_id,
+        "brand_id": _NULL_ID if row.brand_id is None else row.brand_id,
+        "shop_id": _NULL_ID if row.shop_id is None else row.shop_id,
+        # Микросекунды от эпохи: сравнение и сортировка как у datetime
+        "created_at": int((created_at - datetime(1970, 1, 1)).total_seconds() * 1_000_000),
+        "is_featured": bool(row.is_featured),
+        "stock_state": STOCK_STATES.get(row.stock_state, _UNKNOWN_STATE),
+    }
+
+
+def _select_rows():
+    return select(
+        Product.id,
+        type_coerce(Product.base_price, BigInteger).label("price"),
+        Product.total_stock,
+        Product.category_id,
+        Product.brand_id,
+        Product.shop_id,
+        Product.created_at,
+        Product.is_featured,
+        Product.stock_state,
+    ).where(Product.is_active == True)
+
+
+def _select_attribute_rows():
+    return select(attribute_products.c.attribute_id, attribute_products.c.product_id)
+
+
+def _group_attribute_rows(rows) -> Dict[int, Any]:
+    """Строки (attribute_id, product_id) -> attribute_id: отсортированный массив ID товаров"""
+    pairs = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+    if not len(pairs):
+        return {}
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    bounds = np.flatnonzero(np.diff(pairs[:, 0])) + 1
+    return {int(group[0, 0]): group[:, 1].copy() for group in np.split(pairs, bounds)}
+
+
+class CatalogSnapshot(Resource):
+    """Колоночный снимок активных товаров в памяти воркера.
+
+    Фильтры и сортировки списков считаются векторно по массивам NumPy,
+    из БД (или кэша строк) загружается только итоговая страница.
+    Фильтры по атрибутам идут по инвертированному индексу: значение
+    атрибута -> отсортированный массив ID товаров (копия attribute_products).
+    Снимок загружается при прогреве и обновляется по событиям outbox;
+    до загрузки, без outbox и для неподдерживаемых запросов query возвращает None.
+    """
+
+    name = "snapshot"
+
+    def __init__(self):
+        self._columns: Dict[str, Any] = {}
+        self._index: Dict[int, int] = {}
+        self._attributes: Dict[int, Any] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._handlers: List[Callable[[Set[int]], None]] = []
+        self.ready = False
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.catalog_snapshot_enabled and np is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def subscribe(self, handler: Callable[[Set[int]], None]) -> Callable[[Set[int]], None]:
+        """Подписаться на применение событий: handler получает магазины измененных товаров"""
+        self._handlers.append(handler)
+        return handler
+
+    def start(self) -> None:
+        if settings.catalog_snapshot_enabled and np is None:
+            logger.warning("catalog_snapshot_enabled без numpy: списки товаров строятся в SQL")
+
+    def warm(self) -> None:
+        if self.enabled:
+            with SessionLocal() as db:
+                self.load(db)
+
+    def close(self) -> None:
+        with self._lock:
+            self._columns, self._index, self._attributes, self._size = {}, {}, {}, 0
+            self.ready = False
+
+    def load(self, db: Session) -> None:
+        """Полная загрузка снимка"""
+        started = time.perf_counter()
+        rows = [_row_values(row) for row in db.execute(_select_rows().execution_options(yield_per=10000))]
+        columns = {
+            name: np.fromiter((row[name] for row in rows), dtype=dtype, count=len(rows))
+            for name, dtype in _COLUMNS.items()
+        }
+        index = {row["id"]: position for position, row in enumerate(rows)}
+        attributes = _group_attribute_rows(db.execute(_select_attribute_rows().execution_options(yield_per=10000)))
+        with self._lock:
+            self._columns, self._index, self._attributes, self._size = columns, index, attributes, len(rows)
+            self.ready = True
+            self.loaded_at = time.time()
+        logger.info("Снимок каталога: %s товаров за %.1f мс", len(rows), (time.perf_counter() - started) * 1000)
+
+    def apply_events(self, messages: List[OutboxMessage]) -> None:
+        """Обновить снимок по событиям товаров (обработчик outbox)"""
+        ids = {message.aggregate_id for message in messages if message.aggregate == "product"}
+        if not ids or not self.ready:
+            return
+        with SessionLocal() as db:
+            shop_ids = self.refresh(db, ids)
+        # Списки, построенные по старому снимку, сбрасываются только после его обновления
+        for handler in self._handlers:
+            try:
+                handler(shop_ids)
+            except Exception:
+                logger.exception("Ошибка обработчика обновления снимка")
+
+    def refresh(self, db: Session, ids) -> Set[int]:
+        """Перечитать товары по id: активные обновить или добавить, остальные убрать.
+
+        Возвращает магазины товаров до и после изменения.
+        """
+        ids = list(ids)
+        rows = {}
+        attribute_rows = []
+        for start in range(0, len(ids), 1000):
+            chunk = ids[start:start + 1000]
+            for row in db.execute(_select_rows().where(Product.id.in_(chunk))):
+                rows[row.id] = _row_values(row)
+            attribute_rows += db.execute(_select_attribute_rows().where(attribute_products.c.product_id.in_(chunk))).all()
+        added = _group_attribute_rows(attribute_rows)
+
+        shop_ids = set()
+        with self._lock:
+            for product_id in ids:
+                position = self._index.get(product_id)
+                if position is not None:
+                    shop_ids.add(int(self._columns["shop_id"][position]))
+                values = rows.get(product_id)
+                if values is None:
+                    self._remove(product_id)
+                else:
+                    self._upsert(values)
+                    shop_ids.add(values["shop_id"])
+            self._update_attributes(np.array(sorted(set(ids)), dtype=np.int64), added)
+        shop_ids.discard(_NULL_ID)
+        return shop_ids
+
+    def _update_attributes(self, changed, added: Dict[int, Any]) -> None:
+        # Старые значения товаров неизвестны - товары ищутся во всех массивах (бинарным поиском)
+        for attribute_id, product_ids in list(self._attributes.items()):
+            positions = np.searchsorted(product_ids, changed)
+            found = positions < len(product_ids)
+            found[found] = product_ids[positions[found]] == changed[found]
+            if found.any():
+                self._attributes[attribute_id] = np.delete(product_ids, positions[found])
+        for attribute_id, product_ids in added.items():
+            current = self._attributes.get(attribute_id)
+            if current is None:
+                self._attributes[attribute_id] = product_ids
+            else:
+                # Товары уже убраны выше - вставка с сохранением порядка без повторов
+                self._attributes[attribute_id] = np.insert(current, np.searchsorted(current, product_ids), product_ids)
+
+    def _attribute_mask(self, ids, groups: List[List[int]]):
+        """Строки с товарами, у которых есть значение из каждой группы атрибутов"""
+        # Таблица попаданий по ID товара: ID выдает последовательность БД, таблица не больше каталога
+        bound = int(ids.max()) + 1 if len(ids) else 0
+        mask = np.ones(len(ids), dtype=bool)
+        for attribute_ids in groups:
+            hits = np.zeros(bound, dtype=bool)
+            for attribute_id in attribute_ids:
+                product_ids = self._attributes.get(attribute_id)
+                if product_ids is not None:
+                    hits[product_ids[:np.searchsorted(product_ids, bound)]] = True
+            mask &= hits[ids]
+        return mask
+
+    def _upsert(self, values: Dict[str, Any]) -> None:
+        position = self._index.get(values["id"])
+        if position is None:
+            position = self._size
+            if position == len(self._columns["id"]):
+                # Запас по емкости: вставки не копируют массивы каждый раз
+                capacity = max(16, position * 2)
+                for name, column in self._columns.items():
+                    grown = np.empty(capacity, dtype=column.dtype)
+                    grown[:position] = column
+                    self._columns[name] = grown
+            self._index[values["id"]] = position
+            self._size += 1
+        for name, value in values.items():
+            self._columns[name][position] = value
+
+    def _remove(self, product_id: int) -> None:
+        position = self._index.pop(product_id, None)
+        if position is None:
+            return
+        # Последняя строка переезжает на место удаленной: порядок строк не важен
+        last = self._size - 1
+        if position != last:
+            for column in self._columns.values():
+                column[position] = column[last]
+            self._index[int(self._columns["id"][position])] = position
+        self._size -= 1
+
+    def supports(self, filters: Dict[str, Any]) -> bool:
+        # Без outbox снимок не узнает об изменениях и отдавал бы устаревшие списки
+        return (
+            self.enabled
+            and settings.outbox_enabled
+            and self.ready
+            and set(filters) <= FILTERS
+            and filters.get("sort_by", "created_at") in SORT_COLUMNS
+        )
+
+    def query(self, filters: Dict[str, Any], skip: int = 0, limit: int = 10) -> Optional[List[int]]:
+        """ID товаров страницы в порядке сортировки; None - запрос нужно выполнить в SQL"""
+        if not self.supports(filters):
+            return None
+
+        with self._lock:
+            size = self._size
+            columns = {name: column[:size] for name, column in self._columns.items()}
+            mask = np.ones(size, dtype=bool)
+            for field in ("category_id", "brand_id", "shop_id"):
+                if filters.get(field) is not None:
+                    mask &= columns[field] == filters[field]
+            if filters.get("min_price") is not None:
+                mask &= columns["price"] >= to_minor(filters["min_price"])
+            if filters.get("max_price") is not None:
+                mask &= columns["price"] <= to_minor(filters["max_price"])
+            if filters.get("in_stock"):
+                mask &= columns["stock"] > 0
+            if filters.get("stock_state") is not None:
+                mask &= columns["stock_state"] == STOCK_STATES.get(filters["stock_state"], _UNKNOWN_STATE)
+            if filters.get("is_featured") is not None:
+                mask &= columns["is_featured"] == bool(filters["is_featured"])
+            if filters.get("attributes") is not None:
+                mask &= self._attribute_mask(columns["id"], filters["attributes"])
+
+            matched = np.flatnonzero(mask)
+            keys = columns[SORT_COLUMNS[filters.get("sort_by", "created_at")]][matched]
+            ids = columns["id"][matched]
+
+        if filters.get("sort_order", "desc") == "desc":
+            keys = -keys
+            ids = -ids
+
+        count = skip + limit
+        if count < len(keys):
+            # Частичная сортировка: берем все строки не хуже k-й, включая равные ей,
+            # чтобы страницы не теряли и не повторяли товары с одинаковым ключом
+            threshold = np.partition(keys, count - 1)[count - 1]
+            candidates = np.flatnonzero(keys <= threshold)
+            keys, ids = keys[candidates], ids[candidates]
+
+        order = np.lexsort((ids, keys))[skip:count]
+        page = ids[order]
+        return [int(abs(product_id)) for product_id in page]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "ready": self.ready, "size": self._size,
+                "attributes": len(self._attributes), "loaded_at": self.loaded_at}
+
+
+catalog_snapshot = resources.register(CatalogSnapshot())
+if settings.catalog_snapshot_enabled:
+    outbox.subscribe(catalog_snapshot.apply_events)
@@ -0,0 +1,170 @@
+"""Главная страница витрины: один готовый ответ вместо четырех запросов.
+
+Рекомендуемые товары, популярные бренды, дерево и корни категорий
+собираются фоновым потоком воркера - по интервалу и по событиям шины
+инвалидации (изменения товаров, брендов, категорий). Ответ хранится
+закодированным в JSON и сжатым gzip, запрос только отдает байты из памяти.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.cache import bus
+from app.config import settings
+from app.core.resources import Resource, resources
+from app.database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HomePayload:
+    """Закодированный ответ; ETag у сжатого варианта свой"""
+
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    gzip_etag: str
+    built_at: float  # начало сборки (time.monotonic)
+
+
+def build_home(db: Session) -> Dict[str, Any]:
+    """Данные главной страницы в формате ответов отдельных эндпоинтов"""
+    from app.repositories.brand import BrandRepository
+    from app.repositories.category import CategoryRepository
+    from app.repositories.product import ProductRepository
+    from app.schemas import BrandResponse, CategoryResponse
+    from app.services.serializers import transform_product_for_frontend
+
+    products = ProductRepository(db)
+    ids = [product.id for product in products.get_featured(settings.storefront_featured_limit)]
+    # Связи всех товаров - пачкой, порядок - как у get_featured
+    loaded = {product.id: product for product in products.get_many_with_relations(ids)}
+    featured = [transform_product_for_frontend(loaded[i], include_colors=False) for i in ids if i in loaded]
+
+    categories = CategoryRepository(db)
+    return {
+        "featured_products": featured,
+        "popular_brands": [
+            BrandResponse.model_validate(brand)
+            for brand in BrandRepository(db).get_popular_brands(settings.storefront_brands_limit)
+        ],
+        "category_tree": [CategoryResponse.model_validate(category) for category in categories.get_category_tree()],
+        "root_categories": [CategoryResponse.model_validate(category) for category in categories.get_root_categories()],
+    }
+
+
+def encode(data: Dict[str, Any], built_at: float) -> HomePayload:
+    """JSON как у обычных ответов FastAPI (Decimal - числом), плюс gzip-копия"""
+    body = json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")).encode()
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return HomePayload(
+        body=body,
+        # mtime=0: одинаковое содержимое - одинаковые байты
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        etag=f'"{digest}"',
+        gzip_etag=f'"{digest}-gzip"',
+        built_at=built_at,
+    )
+
+
+def _affects_home(tags: Optional[List[str]]) -> bool:
+    return tags is None or any(
+        tag.startswith(("product", "brand")) or tag in ("category", "catalog") for tag in tags
+    )
+
+
+class StorefrontHome(Resource):
+    """Готовый ответ главной страницы в памяти воркера"""
+
+    name = "storefront"
+
+    def __init__(self):
+        self._payload: Optional[HomePayload] = None
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if not settings.storefront_refresh_enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="storefront-home", daemon=True)
+        self._thread.start()
+
+    def warm(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Ошибка сборки главной страницы")
+
+    def close(self) -> None:
+        self._stop.set()
+        self._dirty.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def mark_dirty(self) -> None:
+        """Пересобрать ответ при ближайшей возможности"""
+        self._dirty.set()
+
+    def refresh(self) -> HomePayload:
+        """Собрать ответ заново; одновременные вызовы ждут одну сборку"""
+        requested = time.monotonic()
+        with self._lock:
+            payload = self._payload
+            if payload is not None and payload.built_at >= requested:
+                return payload
+            self._dirty.clear()
+            started = time.monotonic()
+            with SessionLocal() as db:
+                # ETag - хэш содержимого: без изменений клиенты продолжают получать 304
+                self._payload = encode(build_home(db), started)
+            return self._payload
+
+    def cached(self) -> Optional[HomePayload]:
+        """Ответ из памяти или None, если его нужно собрать"""
+        payload = self._payload
+        if payload is None:
+            return None
+        if self._thread is None:
+            # Без фонового потока ответ обновляется при запросе
+            expired = time.monotonic() - payload.built_at > settings.storefront_refresh_interval
+            if expired or self._dirty.is_set():
+                return None
+        return payload
+
+    def current(self) -> HomePayload:
+        return self.cached() or self.refresh()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._dirty.wait(settings.storefront_refresh_interval)
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Ошибка сборки главной страницы")
+            # Поток изменений (импорт, массовое обновление) - не чаще раза в интервал
+            self._stop.wait(settings.storefront_min_refresh_interval)
+
+
+storefront_home = resources.register(StorefrontHome())
+
+
+@bus.subscribe
+def _invalidate_storefront_home(tags: Optional[List[str]]) -> None:
+    if _affects_home(tags):
+        storefront_home.mark_dirty()
@@ -0,0 +1,89 @@
+"""Сочетания атрибутов вариантов и сводки вариантов товаров.
+
+Вариант товара - набор значений атрибутов (по одному на тип), ключ
+варианта в пределах товара - хэш отсортированных id атрибутов. Для списков
+у каждого товара хранится сводка: цвета, значения атрибутов, диапазон
+надбавок к цене и общий остаток.
+
+    python -m app.core.variants          # пересчитать сводки всех товаров
+
+Сводки обновляются вместе с вариантами; пересчет нужен после импорта
+данных в обход API.
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from app.database.connection import SessionLocal
+from app.database.models import Product
+
+
+def attribute_set_hash(attribute_ids: Iterable[int]) -> str:
+    """Ключ сочетания: не зависит от порядка атрибутов"""
+    key = ",".join(str(attribute_id) for attribute_id in sorted(attribute_ids))
+    return hashlib.sha256(key.encode("ascii")).hexdigest()
+
+
+def is_color(attribute_type) -> bool:
+    return attribute_type.name.lower() == "color"
+
+
+def build_summary(combinations: List[Any], legacy_colors: Iterable[str] = ()) -> Dict[str, Any]:
+    """Значения колонок сводки по вариантам товара (атрибуты должны быть загружены)"""
+    active = [combination for combination in combinations if combination.is_active]
+
+    # Значения по типам: порядок - sort_order атрибута, затем порядок появления
+    options: Dict[str, Dict[str, tuple]] = {}
+    colors_slug = None
+    for combination in active:
+        for item in combination.attributes:
+            attribute = item.attribute
+            if is_color(attribute.attribute_type):
+                colors_slug = attribute.attribute_type.slug
+            values = options.setdefault(attribute.attribute_type.slug, {})
+            values.setdefault(attribute.value, (attribute.sort_order or 0, len(values)))
+    ordered = {slug: sorted(values, key=values.get) for slug, values in options.items()}
+
+    modifiers = [combination.price_modifier or 0 for combination in active]
+    return {
+        # Цвета из одноатрибутных вариантов - пока у товара нет сочетаний с цветом
+        "colors": ordered.get(colors_slug) or list(dict.fromkeys(legacy_colors)),
+        "options": ordered,
+        "variants_count": len(active),
+        "min_price_modifier": min(modifiers) if modifiers else None,
+        "max_price_modifier": max(modifiers) if modifiers else None,
+        "total_stock": sum(combination.stock_quantity or 0 for combination in active),
+    }
+
+
+def rebuild_summaries(db, batch_size: int = 500) -> int:
+    """Пересчитать сводки всех товаров пачками; вернуть число товаров"""
+    from app.repositories.variant import VariantRepository
+
+    repository = VariantRepository(db)
+    ids = db.execute(select(Product.id).order_by(Product.id)).scalars().all()
+    for start in range(0, len(ids), batch_size):
+        repository.refresh_summaries(ids[start:start + batch_size])
+        db.commit()
+    return len(ids)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пересчет сводок вариантов товаров")
+    parser.add_argument("--batch-size", type=int, default=500, help="товаров в пачке")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        count = rebuild_summaries(db, args.batch_size)
+    print(f"✅ Сводки вариантов: {count} товаров за {time.perf_counter() - started:.1f} с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
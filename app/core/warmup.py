@@ -0,0 +1,82 @@
+import logging
+import time
+from typing import Any, Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.resources import Resource, resources
+from app.database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+WarmupTask = Callable[[Session], Any]
+
+
+class WarmupResource(Resource):
+    """Прогрев горячих данных каталога до того, как воркер объявит готовность"""
+
+    name = "warmup"
+
+    def __init__(self):
+        self.tasks: Dict[str, WarmupTask] = {}
+
+    def add_task(self, name: str, task: WarmupTask) -> None:
+        """Добавить задачу прогрева (получает отдельную сессию БД)"""
+        self.tasks[name] = task
+
+    def warm(self) -> None:
+        if not settings.warmup_enabled:
+            return
+
+        for name, task in self.tasks.items():
+            started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                task(db)
+                logger.info("Прогрев %s: %.1f мс", name, (time.perf_counter() - started) * 1000)
+            except Exception:
+                logger.exception("Ошибка прогрева %s", name)
+            finally:
+                db.close()
+
+
+def warm_category_tree(db: Session) -> None:
+    from app.repositories.category import CategoryRepository
+    from app.schemas import CategoryResponse
+
+    repository = CategoryRepository(db)
+    for category in repository.get_category_tree():
+        CategoryResponse.model_validate(category)
+    repository.get_root_categories()
+
+
+def warm_popular_brands(db: Session) -> None:
+    from app.repositories.brand import BrandRepository
+    from app.schemas import BrandResponse
+
+    for brand in BrandRepository(db).get_popular_brands(settings.warmup_popular_brands_limit):
+        BrandResponse.model_validate(brand)
+
+
+def warm_popular_tags(db: Session) -> None:
+    from app.repositories.tag import TagRepository
+
+    TagRepository(db).get_popular_tags(settings.warmup_popular_tags_limit)
+
+
+def warm_featured_products(db: Session) -> None:
+    from app.repositories.product import ProductRepository
+
+    repository = ProductRepository(db)
+    for product in repository.get_featured(settings.warmup_featured_limit):
+        repository.get_by_id_with_relations(product.id)
+
+
+warmup = WarmupResource()
+warmup.add_task("category_tree", warm_category_tree)
+warmup.add_task("popular_brands", warm_popular_brands)
+warmup.add_task("popular_tags", warm_popular_tags)
+warmup.add_task("featured_products", warm_featured_products)
+
+resources.register(warmup)
@@ -1,4 +1,13 @@
-from .connection import get_db, engine, SessionLocal
-from .models import Base
+from .connection import get_db, database, replicas, read_only, allow_replica_reads, SessionLocal
 
-__all__ = ["get_db", "engine", "SessionLocal", "Base"]
\ No newline at end of file
+__all__ = ["get_db", "database", "replicas", "read_only", "allow_replica_reads", "engine", "SessionLocal", "Base"]
+
+
+def __getattr__(name: str):
+    if name == "engine":
+        return database.engine
+    if name == "Base":
+        # Модели импортируются по требованию: доступ к сессии и engine их не загружает
+        from .models import Base
+        return Base
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,27 +1,238 @@
-from sqlalchemy import create_engine
+import contextlib
+import functools
+import itertools
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import Select, create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
 
-# Создание движка БД
-# SQLite specific configuration
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(
-        settings.database_url,
-        connect_args={"check_same_thread": False},  # Allow SQLite to be used with multiple threads
-        echo=settings.debug  # Логирование SQL запросов в режиме отладки
-    )
-else:
+logger = logging.getLogger(__name__)
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """Создать движок БД с настройками под конкретную СУБД"""
+    # SQLite specific configuration
+    if database_url.startswith("sqlite"):
+        return create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},  # Allow SQLite to be used with multiple threads
+            echo=settings.debug  # Логирование SQL запросов в режиме отладки
+        )
     # PostgreSQL configuration (fallback)
-    engine = create_engine(
-        settings.database_url,
+    return create_engine(
+        database_url,
         pool_pre_ping=True,
         pool_recycle=300,
         echo=settings.debug  # Логирование SQL запросов в режиме отладки
     )
 
+
+class Database:
+    """Движок БД, создаваемый лениво и отдельно в каждом процессе-воркере.
+
+    Пул соединений нельзя делить между процессами: после fork дочерний
+    процесс получает копии сокетов родителя. Поэтому движок создается при
+    первом обращении и пересоздается, если сменился PID процесса.
+    """
+
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self._engine: Optional[Engine] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None or self._pid != os.getpid():
+            with self._lock:
+                if self._engine is None or self._pid != os.getpid():
+                    if self._engine is not None:
+                        # Соединения родителя не закрываем - они принадлежат другому процессу
+                        self._engine.dispose(close=False)
+                    self._engine = create_db_engine(self.database_url)
+                    self._pid = os.getpid()
+        return self._engine
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._engine is not None and self._pid == os.getpid()
+
+    def dispose(self, close: bool = True) -> None:
+        """Закрыть пул соединений текущего процесса"""
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose(close=close)
+            self._engine = None
+            self._pid = None
+
+
+database = Database(settings.database_url)
+
+
+class ReplicaSet:
+    """Реплики для чтения с проверкой здоровья и отставания.
+
+    Состояние раз в replica_check_interval проверяет фоновый поток воркера,
+    запросы только читают последний результат и никогда не ждут проверки.
+    Реплика с ошибкой соединения или отставанием больше replica_max_lag
+    пропускается до следующей успешной проверки; до первой проверки
+    чтения идут в основную БД.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Database(url) for url in urls]
+        self._usable: Dict[int, bool] = {}
+        self._lag: Dict[int, Optional[float]] = {}
+        self._counter = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def engine(self, index: int) -> Engine:
+        replica = self.replicas[index]
+        if not replica.is_initialized:
+            engine = replica.engine
+            event.listen(engine, "handle_error", functools.partial(self._on_error, index))
+        return replica.engine
+
+    def _on_error(self, index: int, context) -> None:
+        if context.is_disconnect:
+            self._usable[index] = False
+
+    def _measure_lag(self, index: int) -> float:
+        with self.engine(index).connect() as conn:
+            if conn.dialect.name != "postgresql":
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            # Реплика, которая применила весь полученный WAL, не отстает, даже если записей давно не было
+            return conn.execute(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )).scalar() or 0.0
+
+    def check(self) -> None:
+        """Проверить доступность и отставание всех реплик"""
+        for index in range(len(self.replicas)):
+            try:
+                lag = float(self._measure_lag(index))
+            except Exception as exc:
+                if self._usable.get(index, True):
+                    logger.warning("Реплика %s недоступна: %s", index, exc)
+                self._usable[index], self._lag[index] = False, None
+                continue
+            self._usable[index] = lag <= settings.replica_max_lag
+            self._lag[index] = lag
+
+    def start(self) -> None:
+        """Запустить фоновую проверку реплик в текущем процессе"""
+        if not self.replicas or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Остановить фоновую проверку"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Ошибка проверки реплик")
+            self._stop.wait(settings.replica_check_interval)
+
+    def choose(self) -> Optional[Engine]:
+        """Движок здоровой реплики по кругу или None, если таких нет (без обращения к БД)"""
+        usable = [index for index in range(len(self.replicas)) if self._usable.get(index)]
+        if not usable:
+            return None
+        return self.engine(usable[next(self._counter) % len(usable)])
+
+    def status(self) -> List[Dict[str, object]]:
+        """Последнее известное состояние реплик (для health)"""
+        return [
+            {"usable": self._usable.get(index, False), "lag": self._lag.get(index)}
+            for index in range(len(self.replicas))
+        ]
+
+    def dispose(self, close: bool = True) -> None:
+        for replica in self.replicas:
+            replica.dispose(close=close)
+        self._usable.clear()
+
+
+replicas = ReplicaSet(settings.database_replica_urls)
+
+# Чтения текущего запроса можно отправлять на реплики (GET без "липкости" после записи)
+replica_reads_allowed: ContextVar[bool] = ContextVar("replica_reads_allowed", default=False)
+# Выполняется метод репозитория, помеченный как только читающий
+_read_only: ContextVar[bool] = ContextVar("read_only", default=False)
+# Ключ в session.info: сессия уже писала, дальше читает только из основной БД
+_WROTE = "wrote_to_primary"
+
+
+@contextlib.contextmanager
+def allow_replica_reads(allowed: bool = True) -> Iterator[None]:
+    """Разрешить чтение с реплик в текущем контексте"""
+    token = replica_reads_allowed.set(allowed)
+    try:
+        yield
+    finally:
+        replica_reads_allowed.reset(token)
+
+
+def read_only(fn: Callable) -> Callable:
+    """Пометить метод репозитория как только читающий: его SELECT могут уйти на реплику"""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return wrapper
+
+
+class WorkerSession(Session):
+    """Сессия, которая берет движок текущего процесса в момент запроса.
+
+    SELECT из методов, помеченных read_only, идут на реплику, если запрос
+    это разрешает и сессия еще ничего не писала; все остальное - в основную БД.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.info[_WROTE] = True
+            return database.engine
+        if (
+            not replicas
+            or not _read_only.get()
+            or not replica_reads_allowed.get()
+            or self.info.get(_WROTE)
+            or (clause is not None and clause._for_update_arg is not None)
+        ):
+            return database.engine
+        return replicas.choose() or database.engine
+
+
 # Создание сессии
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=WorkerSession, autocommit=False, autoflush=False)
 
 # Базовый класс для моделей
 Base = declarative_base()
@@ -32,4 +243,11 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def __getattr__(name: str):
+    # engine отдается лениво, чтобы импорт модуля не создавал пул соединений
+    if name == "engine":
+        return database.engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
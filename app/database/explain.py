@@ -0,0 +1,334 @@
+"""Проверка планов запросов репозиториев.
+
+Выполняет методы репозиториев на заполненной БД, перехватывает их SQL,
+прогоняет через EXPLAIN и отмечает полные просмотры больших таблиц.
+
+    python -m app.database.explain                      # временная SQLite
+    python -m app.database.explain --database-url postgresql://...  # пустая БД для проверки
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.variants import attribute_set_hash
+from app.database.models import (
+    Attribute,
+    AttributeType,
+    Base,
+    Brand,
+    Category,
+    OutboxEvent,
+    Product,
+    ProductVariant,
+    ProductVariantSummary,
+    RelatedProduct,
+    Review,
+    Shop,
+    Tag,
+    VariantCombination,
+    VariantCombinationAttribute,
+    attribute_products,
+    product_tags,
+)
+
+# Полный просмотр этих таблиц растет вместе с каталогом
+LARGE_TABLES = {
+    "products",
+    "product_variants",
+    "product_tags",
+    "product_images",
+    "reviews",
+    "order_items",
+    "outbox_events",
+    "related_products",
+    "variant_combinations",
+    "variant_combination_attributes",
+    "product_variant_summaries",
+    "attribute_products",
+}
+
+# Запросы, которым полный просмотр нужен по смыслу
+EXPECTED_SCANS = {
+    "ProductRepository.search": "ILIKE '%...%' не использует B-tree (нужен pg_trgm)",
+    "BrandRepository.get_popular_brands": "агрегат по всем активным товарам",
+    "TagRepository.get_popular_tags": "агрегат по всем связям товаров с тегами",
+}
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+@contextlib.contextmanager
+def capture_statements(engine: Engine) -> Iterator[List[Tuple[str, Any]]]:
+    """Собрать SELECT-запросы, выполненные через engine"""
+    statements: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(conn: Connection, statement: str, parameters: Any) -> List[str]:
+    """План запроса построчно"""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [row[3] for row in rows]
+    rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+    return [row[0] for row in rows]
+
+
+def find_seq_scans(plan: List[str], dialect: str) -> List[str]:
+    """Большие таблицы, которые план читает целиком"""
+    tables = []
+    for line in plan:
+        if dialect == "sqlite":
+            match = _SQLITE_SCAN.match(line.strip())
+        else:
+            match = _POSTGRES_SCAN.search(line)
+        if match:
+            # Псевдонимы SQLAlchemy: products_1 -> products
+            table = re.sub(r"_\d+$", "", match.group(1))
+            if table in LARGE_TABLES:
+                tables.append(table)
+    return tables
+
+
+def seed(session: Session, products: int = 20000, seed_value: int = 42) -> Dict[str, Any]:
+    """Заполнить пустую БД правдоподобным каталогом; вернуть примеры значений для запросов"""
+    rnd = random.Random(seed_value)
+    now = datetime.utcnow()
+
+    roots = [{"id": i, "name": f"Root {i}", "slug": f"root-{i}", "is_active": True} for i in range(1, 11)]
+    children = [
+        {"id": 10 + i, "name": f"Category {i}", "slug": f"category-{i}", "parent_id": (i % 10) + 1, "is_active": True}
+        for i in range(1, 91)
+    ]
+    session.execute(insert(Category), roots + children)
+    session.execute(insert(Brand), [
+        {"id": i, "name": f"Brand {i}", "slug": f"brand-{i}", "is_active": True} for i in range(1, 201)
+    ])
+    session.execute(insert(Shop), [
+        {"id": i, "name": f"Shop {i}", "slug": f"shop-{i}", "is_active": True} for i in range(1, 21)
+    ])
+    session.execute(insert(Tag), [
+        {"id": i, "name": f"tag-{i}", "slug": f"tag-{i}", "is_active": True} for i in range(1, 301)
+    ])
+    session.execute(insert(AttributeType), [
+        {"id": 1, "name": "Color", "slug": "color", "input_type": "select"},
+        {"id": 2, "name": "Storage", "slug": "storage", "input_type": "select"},
+    ])
+    session.execute(insert(Attribute), [
+        {"id": i, "attribute_type_id": 1, "value": f"Color {i}", "slug": f"color-{i}"} for i in range(1, 21)
+    ] + [
+        {"id": 21 + i, "attribute_type_id": 2, "value": f"{64 << i}GB", "slug": f"{64 << i}gb"} for i in range(4)
+    ])
+
+    product_rows, tag_rows, variant_rows, review_rows = [], [], [], []
+    combination_rows, combination_attribute_rows, summary_rows, index_rows = [], [], [], []
+    for i in range(1, products + 1):
+        price = round(rnd.uniform(5, 2000), 2)
+        stock = rnd.choice([0, 0, 3, 10, 50, 200])
+        product_rows.append({
+            "id": i,
+            "title": f"Product {i}",
+            "slug": f"product-{i}",
+            "sku": f"SKU-{i}",
+            "base_price": price,
+            "old_price": round(price * 1.2, 2) if i % 3 == 0 else None,
+            "total_stock": stock,
+            "stock_state": "Available" if stock else "OutOfStock",
+            "category_id": rnd.randint(11, 100),
+            "brand_id": rnd.randint(1, 200),
+            "shop_id": i % 20 + 1,
+            "is_active": rnd.random() > 0.1,
+            "is_featured": rnd.random() < 0.02,
+            "created_at": now - timedelta(minutes=i),
+        })
+        for tag_id in rnd.sample(range(1, 301), 3):
+            tag_rows.append({"product_id": i, "tag_id": tag_id})
+        attribute_ids = set(rnd.sample(range(1, 21), 2))
+        for attribute_id in attribute_ids:
+            variant_rows.append({"product_id": i, "attribute_id": attribute_id, "stock_quantity": stock})
+        if i % 4 == 0:
+            # Цвет x память: 2 x 2 сочетания
+            colors = rnd.sample(range(1, 21), 2)
+            for color_id in colors:
+                for storage_id in (21, 22):
+                    combination_id = len(combination_rows) + 1
+                    combination_rows.append({
+                        "id": combination_id, "product_id": i, "sku": f"SKU-{i}-{combination_id}",
+                        "attribute_set_hash": attribute_set_hash((color_id, storage_id)), "price_modifier": (storage_id - 21) * 5000,
+                        "stock_quantity": stock,
+                    })
+                    combination_attribute_rows += [
+                        {"combination_id": combination_id, "attribute_type_id": 1, "attribute_id": color_id, "product_id": i},
+                        {"combination_id": combination_id, "attribute_type_id": 2, "attribute_id": storage_id, "product_id": i},
+                    ]
+            attribute_ids.update(colors + [21, 22])
+            summary_rows.append({
+                "product_id": i, "colors": [f"Color {c}" for c in colors], "options": {}, "variants_count": 4,
+                "min_price_modifier": 0, "max_price_modifier": 5000, "total_stock": stock * 4,
+            })
+        index_rows += [{"attribute_id": attribute_id, "product_id": i} for attribute_id in attribute_ids]
+        if i % 2 == 0:
+            review_rows.append({"product_id": i, "customer_name": "Customer", "rating": rnd.randint(1, 5)})
+
+    session.execute(insert(Product), product_rows)
+    session.execute(insert(product_tags), tag_rows)
+    session.execute(insert(ProductVariant), variant_rows)
+    session.execute(insert(VariantCombination), combination_rows)
+    session.execute(insert(VariantCombinationAttribute), combination_attribute_rows)
+    session.execute(insert(ProductVariantSummary), summary_rows)
+    session.execute(insert(attribute_products), index_rows)
+    session.execute(insert(Review), review_rows)
+    session.execute(insert(RelatedProduct), [
+        {"product_id": i, "rank": rank, "related_id": (i + rank) % products + 1, "score": 1.0 / (rank + 1)}
+        for i in range(1, products + 1) for rank in range(5)
+    ])
+    session.execute(insert(OutboxEvent), [
+        {"aggregate": "product", "aggregate_id": i, "event_type": "updated", "payload": {}, "created_at": now}
+        for i in range(1, products + 1)
+    ])
+    session.commit()
+    session.execute(text("ANALYZE"))
+    session.commit()
+
+    return {
+        "product_id": products // 2,
+        "product_ids": list(range(1, min(products, 50) + 1)),
+        "category_id": 42,
+        "brand_id": 7,
+        "shop_id": 5,
+        "root_id": 3,
+        "outbox_position": max(products - 500, 0),
+    }
+
+
+def get_checks() -> Dict[str, Callable[[Session, Dict[str, Any]], Any]]:
+    """Запросы для проверки: имя -> вызов метода репозитория"""
+    from app.core.outbox import read_events
+    from app.repositories import (
+        BrandRepository, CategoryRepository, ProductRepository, ShopRepository, TagRepository, VariantRepository
+    )
+
+    listing = {"sort_by": "created_at", "sort_order": "desc"}
+    return {
+        "ProductRepository.get_by_id_with_relations": lambda db, s: ProductRepository(db).get_by_id_with_relations(s["product_id"]),
+        "ProductRepository.get_many_with_relations": lambda db, s: ProductRepository(db).get_many_with_relations(s["product_ids"]),
+        "ProductRepository.get_related_ids": lambda db, s: ProductRepository(db).get_related_ids(s["product_id"]),
+        "ProductRepository.get_by_slug": lambda db, s: ProductRepository(db).get_by_slug(f"product-{s['product_id']}"),
+        "ProductRepository.get_by_sku": lambda db, s: ProductRepository(db).get_by_sku(f"SKU-{s['product_id']}"),
+        "ProductRepository.get_by_category": lambda db, s: ProductRepository(db).get_by_category(s["category_id"]),
+        "ProductRepository.get_by_brand": lambda db, s: ProductRepository(db).get_by_brand(s["brand_id"]),
+        "ProductRepository.get_featured": lambda db, s: ProductRepository(db).get_featured(10),
+        "ProductRepository.search": lambda db, s: ProductRepository(db).search("Product 1"),
+        "ProductRepository.filter_products[listing]": lambda db, s: ProductRepository(db).filter_products(dict(listing)),
+        "ProductRepository.filter_products[category]": lambda db, s: ProductRepository(db).filter_products(
+            {"category_id": s["category_id"], **listing}),
+        "ProductRepository.filter_products[brand]": lambda db, s: ProductRepository(db).filter_products(
+            {"brand_id": s["brand_id"], **listing}),
+        "ProductRepository.filter_products[shop]": lambda db, s: ProductRepository(db).filter_products(
+            {"shop_id": s["shop_id"], **listing}),
+        "ProductRepository.filter_products[shop+price]": lambda db, s: ProductRepository(db).filter_products(
+            {"shop_id": s["shop_id"], "sort_by": "base_price", "sort_order": "asc"}),
+        "ProductRepository.filter_products[price]": lambda db, s: ProductRepository(db).filter_products(
+            {"min_price": 100, "max_price": 120, "sort_by": "base_price", "sort_order": "asc"}),
+        "ProductRepository.filter_products[attributes]": lambda db, s: ProductRepository(db).filter_products(
+            {"attributes": [[3, 5], [22]], **listing}),
+        "ProductRepository.filter_products[category+attributes]": lambda db, s: ProductRepository(db).filter_products(
+            {"category_id": s["category_id"], "attributes": [[3]], **listing}),
+        "VariantRepository.resolve_attribute_filters": lambda db, s: VariantRepository(db).resolve_attribute_filters(
+            {"color": ["Color 3"], "storage": ["256GB"]}),
+        "ProductRepository.filter_products[in_stock]": lambda db, s: ProductRepository(db).filter_products(
+            {"in_stock": True, "stock_state": "Available", **listing}),
+        "VariantRepository.load_for_products": lambda db, s: VariantRepository(db).load_for_products(s["product_ids"]),
+        "ShopRepository.get_by_slug": lambda db, s: ShopRepository(db).get_by_slug(f"shop-{s['shop_id']}"),
+        "CategoryRepository.get_children": lambda db, s: CategoryRepository(db).get_children(s["root_id"]),
+        "BrandRepository.get_popular_brands": lambda db, s: BrandRepository(db).get_popular_brands(),
+        "TagRepository.get_popular_tags": lambda db, s: TagRepository(db).get_popular_tags(),
+        "outbox.read_events": lambda db, s: read_events(db, s["outbox_position"], 500),
+    }
+
+
+def run_checks(engine: Engine, sample: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Выполнить проверки; вернуть по каждой запросы, планы и найденные полные просмотры"""
+    results = []
+    for name, check in get_checks().items():
+        with Session(engine) as db, capture_statements(engine) as statements:
+            check(db, sample)
+
+        queries = []
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                plan = explain(conn, statement, parameters)
+                queries.append({
+                    "statement": statement,
+                    "plan": plan,
+                    "seq_scans": find_seq_scans(plan, engine.dialect.name),
+                })
+
+        results.append({
+            "name": name,
+            "queries": queries,
+            "seq_scans": sorted({table for query in queries for table in query["seq_scans"]}),
+            "expected": EXPECTED_SCANS.get(name),
+        })
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN запросов репозиториев")
+    parser.add_argument("--database-url", help="пустая БД для проверки (по умолчанию временная SQLite)")
+    parser.add_argument("--products", type=int, default=20000, help="сколько товаров сгенерировать")
+    parser.add_argument("--verbose", action="store_true", help="печатать планы всех запросов")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'explain.db')}"
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        sample = seed(db, args.products)
+
+    failed = 0
+    for result in run_checks(engine, sample):
+        if not result["seq_scans"]:
+            status = "OK"
+        elif result["expected"]:
+            status = f"SCAN (ожидаемо: {result['expected']})"
+        else:
+            status = f"SEQ SCAN: {', '.join(result['seq_scans'])}"
+            failed += 1
+        print(f"{'✅' if status == 'OK' or result['expected'] else '❌'} {result['name']}: {status}")
+
+        if args.verbose or (result["seq_scans"] and not result["expected"]):
+            for query in result["queries"]:
+                print(f"    {' '.join(query['statement'].split())[:160]}")
+                for line in query["plan"]:
+                    print(f"      {line}")
+
+    engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
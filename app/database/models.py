@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Table, JSON
+import hashlib
+
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Float, Boolean, DateTime, Text, ForeignKey, Table, JSON, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.database.types import MoneyType, UTCDateTime, utcnow
 
 Base = declarative_base()
 
@@ -20,6 +23,46 @@ product_images = Table(
     Column('image_id', Integer, ForeignKey('images.id'), primary_key=True)
 )
 
+# Инвертированный индекс фильтров: значение атрибута -> товары с активными вариантами этого значения
+attribute_products = Table(
+    'attribute_products',
+    Base.metadata,
+    Column('attribute_id', Integer, ForeignKey('attributes.id', ondelete='CASCADE'), primary_key=True),
+    Column('product_id', Integer, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+)
+
+class CacheChange(Base):
+    """Журнал изменений для инвалидации кэша, когда LISTEN/NOTIFY недоступен"""
+    __tablename__ = 'cache_changes'
+    
+    id = Column(Integer, primary_key=True)
+    tags = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class OutboxEvent(Base):
+    """Событие об изменении, записанное в одной транзакции с самим изменением"""
+    __tablename__ = 'outbox_events'
+    
+    # На SQLite автоинкремент есть только у INTEGER PRIMARY KEY
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True)
+    aggregate = Column(String(50), nullable=False)  # product, ...
+    aggregate_id = Column(Integer, nullable=False)
+    event_type = Column(String(30), nullable=False)  # created, updated, stock_changed, deactivated, deleted
+    payload = Column(JSON)
+    created_at = Column(DateTime, default=func.now(), index=True)
+    
+    __table_args__ = (
+        Index('ix_outbox_events_aggregate', 'aggregate', 'aggregate_id'),
+    )
+
+class OutboxOffset(Base):
+    """Позиция постоянного потребителя outbox"""
+    __tablename__ = 'outbox_offsets'
+    
+    consumer = Column(String(100), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 class Category(Base):
     __tablename__ = 'categories'
     
@@ -110,8 +153,8 @@ class Product(Base):
     sku = Column(String(50), nullable=True, unique=True)
     
     # Basic product info
-    base_price = Column(Float, nullable=True)
-    old_price = Column(Float, nullable=True)
+    base_price = Column(MoneyType, nullable=True)
+    old_price = Column(MoneyType, nullable=True)
     
     # Stock and availability
     stock_state = Column(String(20), nullable=True, default='Available')  # Available, OutOfStock, Discontinued
@@ -142,6 +185,8 @@ class Product(Base):
     tags = relationship("Tag", secondary=product_tags, back_populates="products")
     images = relationship("Image", secondary=product_images, back_populates="products")
     variants = relationship("ProductVariant", back_populates="product", cascade="all, delete-orphan")
+    combinations = relationship("VariantCombination", back_populates="product", cascade="all, delete-orphan", passive_deletes=True)
+    variant_summary = relationship("ProductVariantSummary", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
     reviews = relationship("Review", back_populates="product")
 
 class ProductVariant(Base):
@@ -152,7 +197,7 @@ class ProductVariant(Base):
     attribute_id = Column(Integer, ForeignKey('attributes.id'), nullable=False)
     
     # Variant-specific pricing and stock
-    price_modifier = Column(Float, default=0.0)  # Additional price for this variant
+    price_modifier = Column(MoneyType, default=0)  # Additional price for this variant
     stock_quantity = Column(Integer, default=0)
     sku_suffix = Column(String(20))  # To create unique SKU for variant
     
@@ -163,6 +208,56 @@ class ProductVariant(Base):
     product = relationship("Product", back_populates="variants")
     attribute = relationship("Attribute", back_populates="product_variants")
 
+class VariantCombination(Base):
+    """Вариант товара - сочетание значений атрибутов (Цвет x Размер x Память) со своим SKU, ценой и остатком"""
+    __tablename__ = 'variant_combinations'
+    __table_args__ = (
+        # Одно сочетание значений атрибутов - один вариант товара
+        UniqueConstraint('product_id', 'attribute_set_hash', name='uq_variant_combinations_product_attributes'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    attribute_set_hash = Column(String(64), nullable=False)  # sha256 отсортированных id атрибутов
+    sku = Column(String(80), unique=True)
+    price_modifier = Column(MoneyType, default=0)  # надбавка к цене товара
+    stock_quantity = Column(Integer, default=0)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    product = relationship("Product", back_populates="combinations")
+    attributes = relationship("VariantCombinationAttribute", back_populates="combination",
+                              cascade="all, delete-orphan", passive_deletes=True)
+
+class VariantCombinationAttribute(Base):
+    """Значение атрибута в сочетании; product_id продублирован для поиска товаров по атрибуту"""
+    __tablename__ = 'variant_combination_attributes'
+    
+    combination_id = Column(Integer, ForeignKey('variant_combinations.id', ondelete='CASCADE'), primary_key=True)
+    # Одно значение каждого типа атрибута в сочетании
+    attribute_type_id = Column(Integer, ForeignKey('attribute_types.id'), primary_key=True)
+    attribute_id = Column(Integer, ForeignKey('attributes.id'), nullable=False)
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    
+    # Relationships
+    combination = relationship("VariantCombination", back_populates="attributes")
+    attribute = relationship("Attribute")
+
+class ProductVariantSummary(Base):
+    """Предрасчитанная сводка вариантов товара для списков (без чтения вариантов)"""
+    __tablename__ = 'product_variant_summaries'
+    
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    colors = Column(JSON, nullable=False, default=list)
+    options = Column(JSON, nullable=False, default=dict)  # slug типа атрибута -> значения
+    variants_count = Column(Integer, nullable=False, default=0)
+    min_price_modifier = Column(MoneyType)
+    max_price_modifier = Column(MoneyType)
+    total_stock = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 class Tag(Base):
     __tablename__ = 'tags'
     
@@ -175,19 +270,87 @@ class Tag(Base):
     # Relationships
     products = relationship("Product", secondary=product_tags, back_populates="tags")
 
+def url_hash(url: str) -> str:
+    """sha256 URL изображения: поиск по короткому уникальному ключу вместо строки до 500 символов"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
 class Image(Base):
     __tablename__ = 'images'
     
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String(500), nullable=False)
+    url_hash = Column(String(64), unique=True,
+                      default=lambda context: url_hash(context.get_current_parameters()['url']))
     alt_text = Column(String(255))
     is_primary = Column(Boolean, default=False)
     sort_order = Column(Integer, default=0)
+    # Для загруженных файлов: sha256 содержимого (одинаковые файлы хранятся один раз)
+    content_hash = Column(String(64), unique=True)
+    content_type = Column(String(50))
+    file_size = Column(Integer)
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
     products = relationship("Product", secondary=product_images, back_populates="images")
 
+class PriceSchedule(Base):
+    """Запланированное изменение цен для набора товаров"""
+    __tablename__ = 'price_schedules'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(255), nullable=False)
+    rule = Column(String(20), nullable=False)  # percent_off, amount_off, fixed_price
+    percent = Column(Integer)
+    amount = Column(MoneyType)
+    
+    # Набор товаров: все заданные условия должны выполняться
+    category_id = Column(Integer, ForeignKey('categories.id'))
+    brand_id = Column(Integer, ForeignKey('brands.id'))
+    tag_id = Column(Integer, ForeignKey('tags.id'))
+    product_ids = Column(JSON)
+    
+    # Время в UTC; сравнивается с временем из Python, а не с now() базы
+    starts_at = Column(UTCDateTime, nullable=False)
+    ends_at = Column(UTCDateTime)
+    status = Column(String(20), nullable=False, default='scheduled')  # scheduled, active, finished, cancelled
+    affected_count = Column(Integer, default=0)
+    activated_at = Column(UTCDateTime)
+    finished_at = Column(UTCDateTime)
+    created_at = Column(UTCDateTime, default=utcnow)
+    
+    __table_args__ = (
+        Index('ix_price_schedules_status_starts', 'status', 'starts_at'),
+    )
+
+class PriceHistory(Base):
+    """История цен товара: строка на каждое изменение"""
+    __tablename__ = 'price_history'
+    
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    schedule_id = Column(Integer, ForeignKey('price_schedules.id'))
+    kind = Column(String(20), nullable=False)  # manual, apply, revert
+    previous_base_price = Column(MoneyType)
+    previous_old_price = Column(MoneyType)
+    base_price = Column(MoneyType)
+    old_price = Column(MoneyType)
+    changed_at = Column(UTCDateTime, default=utcnow)
+    
+    __table_args__ = (
+        Index('ix_price_history_product_changed', 'product_id', 'changed_at'),
+        Index('ix_price_history_schedule_product', 'schedule_id', 'product_id'),
+    )
+
+class RelatedProduct(Base):
+    """Предрасчитанные похожие товары: top-k соседей по тегам, категории и бренду"""
+    __tablename__ = 'related_products'
+    
+    # Первичный ключ (product_id, rank) - список соседей читается одним диапазоном индекса
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True, autoincrement=False)
+    related_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    score = Column(Float, nullable=False)
+
 class Review(Base):
     __tablename__ = 'reviews'
     
@@ -215,7 +378,7 @@ class Order(Base):
     customer_phone = Column(String(20))
     
     # Order details
-    total_amount = Column(Float, nullable=False)
+    total_amount = Column(MoneyType, nullable=False)
     status = Column(String(20), default='pending')  # pending, confirmed, processing, shipped, delivered, cancelled
     notes = Column(Text)
     
@@ -237,12 +400,51 @@ class OrderItem(Base):
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
     
     quantity = Column(Integer, nullable=False)
-    unit_price = Column(Float, nullable=False)
-    total_price = Column(Float, nullable=False)
+    unit_price = Column(MoneyType, nullable=False)
+    total_price = Column(MoneyType, nullable=False)
     
     # Selected variant attributes (stored as JSON)
     variant_attributes = Column(JSON)
     
     # Relationships
     order = relationship("Order", back_populates="order_items")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Product")
+
+# Индексы под запросы репозиториев. Частичные индексы (WHERE is_active) описаны
+# тем же выражением, что и в запросах, иначе SQLite их не использует.
+_active_product = Product.is_active == True
+
+Index('ix_products_active_created', Product.created_at,
+      postgresql_where=_active_product, sqlite_where=_active_product)
+Index('ix_products_active_category_created', Product.category_id, Product.created_at,
+      postgresql_where=_active_product, sqlite_where=_active_product)
+Index('ix_products_active_brand_created', Product.brand_id, Product.created_at,
+      postgresql_where=_active_product, sqlite_where=_active_product)
+Index('ix_products_active_price', Product.base_price,
+      postgresql_where=_active_product, sqlite_where=_active_product)
+Index('ix_products_active_stock_state', Product.stock_state, Product.total_stock,
+      postgresql_where=_active_product, sqlite_where=_active_product)
+Index('ix_products_featured', Product.created_at,
+      postgresql_where=_active_product & (Product.is_featured == True),
+      sqlite_where=_active_product & (Product.is_featured == True))
+# Витрины магазинов: магазин первым, чтобы каждый читал только свой участок индекса
+Index('ix_products_active_shop_created', Product.shop_id, Product.created_at,
+      postgresql_where=_active_product, sqlite_where=_active_product)
+Index('ix_products_active_shop_price', Product.shop_id, Product.base_price,
+      postgresql_where=_active_product, sqlite_where=_active_product)
+
+Index('ix_categories_parent_active', Category.parent_id, Category.is_active)
+Index('ix_attributes_attribute_type_id', Attribute.attribute_type_id)
+Index('ix_product_variants_product_id', ProductVariant.product_id)
+Index('ix_product_variants_attribute_id', ProductVariant.attribute_id)
+# Варианты товара читаются по уникальному ключу (product_id, attribute_set_hash)
+Index('ix_variant_combination_attributes_attribute_product',
+      VariantCombinationAttribute.attribute_id, VariantCombinationAttribute.product_id)
+Index('ix_reviews_product_id', Review.product_id)
+Index('ix_order_items_order_id', OrderItem.order_id)
+Index('ix_order_items_product_id', OrderItem.product_id)
+# Прямое направление покрывает составной первичный ключ, обратное - нет
+Index('ix_product_tags_tag_id', product_tags.c.tag_id, product_tags.c.product_id)
+Index('ix_product_images_image_id', product_images.c.image_id, product_images.c.product_id)
+# Пересчет индекса фильтров идет по товару
+Index('ix_attribute_products_product_id', attribute_products.c.product_id)
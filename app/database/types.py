@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime
+from sqlalchemy.types import TypeDecorator
+
+from app.core.money import from_minor, to_minor
+
+
+class MoneyType(TypeDecorator):
+    """Денежная колонка: BIGINT в минимальных единицах в БД, Decimal в Python.
+
+    Параметры сравнений (base_price >= :min_price) тоже переводятся в
+    минимальные единицы, поэтому фильтры и сортировка идут по целым числам.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Optional[int]:
+        return to_minor(value)
+
+    def process_result_value(self, value, dialect) -> Optional[Decimal]:
+        return from_minor(value)
+
+
+def utcnow() -> datetime:
+    """Текущее время в UTC с часовым поясом"""
+    return datetime.now(timezone.utc)
+
+
+class UTCDateTime(TypeDecorator):
+    """Время в UTC: в БД - без часового пояса, в Python - всегда с tzinfo=UTC.
+
+    Наивные значения считаются временем в UTC. Сравнения идут с параметром
+    из Python, а не с now() базы, который зависит от часового пояса сессии.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect) -> Optional[datetime]:
+        return value.replace(tzinfo=timezone.utc) if value is not None else None
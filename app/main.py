@@ -1,83 +1,114 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from fastapi.exceptions import RequestValidationError
-from starlette.exceptions import HTTPException as StarletteHTTPException
+"""Точка входа API.
+
+Приложение собирает create_app(): роутеры, сервисы и схемы импортируются
+только там, поэтому `import app.main` ничего не тянет. Атрибут app
+создается при первом обращении - `app.main:app` работает как раньше.
+"""
+
+from typing import TYPE_CHECKING, Any, Optional
 
 from app.config import settings
-from app.api.v1.api import api_router
-from app.core.middleware import setup_middleware
-from app.core.exceptions import (
-    validation_exception_handler,
-    http_exception_handler,
-    general_exception_handler
-)
-
-# Создание FastAPI приложения
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
-    description="API для интернет-магазина",
-    openapi_url="/api/v1/openapi.json",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# Настройка middleware
-setup_middleware(app)
-
-# Обработчики ошибок
-app.add_exception_handler(RequestValidationError, validation_exception_handler)
-app.add_exception_handler(StarletteHTTPException, http_exception_handler)
-app.add_exception_handler(Exception, general_exception_handler)
-
-# Подключение роутеров
-app.include_router(api_router, prefix="/api/v1")
-
-# Корневой эндпоинт
-@app.get("/")
-async def root():
-    """Корневой эндпоинт"""
-    return {
-        "message": "E-commerce Backend API",
-        "version": settings.app_version,
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
-
-# Эндпоинт для проверки здоровья приложения
-@app.get("/health")
-async def health_check():
-    """Проверка состояния приложения"""
-    return {
-        "status": "healthy",
-        "service": settings.app_name,
-        "version": settings.app_version
-    }
-
-# Эндпоинт для получения информации о API
-@app.get("/api/v1")
-async def api_info():
-    """Информация о API"""
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "endpoints": {
-            "categories": "/api/v1/categories",
-            "brands": "/api/v1/brands", 
-            "products": "/api/v1/products"
-        },
-        "documentation": {
-            "swagger": "/docs",
-            "redoc": "/redoc",
-            "openapi": "/api/v1/openapi.json"
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+_app: Optional["FastAPI"] = None
+
+
+def create_app() -> "FastAPI":
+    """Создать FastAPI-приложение со всеми роутерами, middleware и обработчиками ошибок"""
+    from fastapi import FastAPI
+    from starlette.exceptions import HTTPException as StarletteHTTPException
+    from fastapi.exceptions import RequestValidationError
+
+    from app.api.health import router as health_router
+    from app.api.media import router as media_router
+    from app.api.sitemaps import router as sitemaps_router
+    from app.api.v1.api import include_routers
+    from app.core.lifespan import lifespan
+    from app.core.middleware import setup_middleware
+    from app.core.exceptions import (
+        validation_exception_handler,
+        http_exception_handler,
+        general_exception_handler
+    )
+
+    application = FastAPI(
+        title=settings.app_name,
+        version=settings.app_version,
+        description="API для интернет-магазина",
+        openapi_url="/api/v1/openapi.json",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan
+    )
+
+    # Настройка middleware
+    setup_middleware(application)
+
+    # Обработчики ошибок
+    application.add_exception_handler(RequestValidationError, validation_exception_handler)
+    application.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    application.add_exception_handler(Exception, general_exception_handler)
+
+    # Подключение роутеров
+    application.include_router(health_router, tags=["health"])
+    application.include_router(media_router, prefix=settings.media_url, tags=["media"])
+    application.include_router(sitemaps_router, prefix=settings.sitemap_url, tags=["sitemaps"])
+    include_routers(application, "/api/v1")
+
+    # Корневой эндпоинт
+    @application.get("/")
+    async def root():
+        """Корневой эндпоинт"""
+        return {
+            "message": "E-commerce Backend API",
+            "version": settings.app_version,
+            "docs": "/docs",
+            "redoc": "/redoc"
+        }
+
+    # Эндпоинт для получения информации о API
+    @application.get("/api/v1")
+    async def api_info():
+        """Информация о API"""
+        return {
+            "name": settings.app_name,
+            "version": settings.app_version,
+            "endpoints": {
+                "categories": "/api/v1/categories",
+                "brands": "/api/v1/brands", 
+                "products": "/api/v1/products",
+                "images": "/api/v1/images",
+                "shops": "/api/v1/shops",
+                "storefront": "/api/v1/storefront/home"
+            },
+            "documentation": {
+                "swagger": "/docs",
+                "redoc": "/redoc",
+                "openapi": "/api/v1/openapi.json"
+            }
         }
-    }
+
+    return application
+
+
+def __getattr__(name: str) -> Any:
+    # app создается при первом обращении (from app.main import app, uvicorn "app.main:app")
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "app.main:app",
+        "app.main:create_app",
+        factory=True,
         host="0.0.0.0",
         port=8000,
         reload=settings.debug
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,21 @@
+from .storage import ORIGINAL, image_url, media_path, media_url, sniff_image_type, store_original, thumbnails_available
+from .thumbnails import ThumbnailWorkers, thumbnails
+from .uploads import FileTooLarge, MultipartUpload, UnsupportedMediaType, UploadedFile, UploadError, receive_upload
+
+__all__ = [
+    "ORIGINAL",
+    "image_url",
+    "media_path",
+    "media_url",
+    "sniff_image_type",
+    "store_original",
+    "thumbnails_available",
+    "ThumbnailWorkers",
+    "thumbnails",
+    "MultipartUpload",
+    "UploadedFile",
+    "UploadError",
+    "FileTooLarge",
+    "UnsupportedMediaType",
+    "receive_upload",
+]
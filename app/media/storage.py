@@ -0,0 +1,80 @@
+import importlib.util
+import os
+import re
+from typing import Optional
+
+from app.config import settings
+
+# Оригиналы лежат рядом с превью: <upload_dir>/<вид>/<первые 2 символа хэша>/<хэш>.<расширение>
+ORIGINAL = "original"
+
+IMAGE_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+EXTENSION_TYPES = {ext: content_type for content_type, ext in IMAGE_TYPES.items()}
+
+MEDIA_NAME = re.compile(r"(?P<digest>[0-9a-f]{64})\.(?P<ext>jpg|png|gif|webp)")
+
+# Pillow - необязательная зависимость: без него отдаются оригиналы
+_PILLOW = importlib.util.find_spec("PIL") is not None
+
+
+def thumbnails_available() -> bool:
+    return _PILLOW and bool(settings.image_variants)
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Тип изображения по сигнатуре файла (заголовку Content-Type клиента не доверяем)"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def media_kinds():
+    return {ORIGINAL, *settings.image_variants}
+
+
+def media_path(kind: str, digest: str, ext: str) -> str:
+    return os.path.join(settings.upload_dir, kind, digest[:2], f"{digest}.{ext}")
+
+
+def media_url(kind: str, digest: str, ext: str) -> str:
+    return f"{settings.media_url}/{kind}/{digest[:2]}/{digest}.{ext}"
+
+
+def temp_dir() -> str:
+    """Каталог временных файлов загрузки (та же ФС, что и хранилище, - os.replace атомарен)"""
+    path = os.path.join(settings.upload_dir, "tmp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def store_original(temp_path: str, digest: str, ext: str) -> str:
+    """Переместить загруженный файл в хранилище; одинаковое содержимое хранится один раз"""
+    path = media_path(ORIGINAL, digest, ext)
+    if os.path.exists(path):
+        os.unlink(temp_path)
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temp_path, path)
+    return path
+
+
+def image_url(image, variant: Optional[str] = None) -> str:
+    """URL изображения для фронтенда: для загруженных - превью нужного размера"""
+    content_hash = getattr(image, "content_hash", None)
+    if not content_hash:
+        return image.url
+    ext = IMAGE_TYPES.get(image.content_type, "jpg")
+    if variant in settings.image_variants and thumbnails_available():
+        return media_url(variant, content_hash, ext)
+    return media_url(ORIGINAL, content_hash, ext)
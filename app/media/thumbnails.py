@@ -0,0 +1,100 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from app.config import settings
+from app.core.resources import Resource, resources
+from app.media.storage import ORIGINAL, media_path, thumbnails_available
+
+logger = logging.getLogger(__name__)
+
+_SAVE_FORMATS = {"jpg": "JPEG", "png": "PNG", "gif": "GIF", "webp": "WEBP"}
+
+
+def build_variants(digest: str, ext: str, variants: Dict[str, int], upload_dir: str) -> List[str]:
+    """Создать уменьшенные копии оригинала (выполняется в дочернем процессе)"""
+    from PIL import Image as PILImage
+
+    source = os.path.join(upload_dir, ORIGINAL, digest[:2], f"{digest}.{ext}")
+    created = []
+    with PILImage.open(source) as original:
+        original.load()
+        for name, size in sorted(variants.items(), key=lambda item: -item[1]):
+            path = os.path.join(upload_dir, name, digest[:2], f"{digest}.{ext}")
+            if os.path.exists(path):
+                continue
+            image = original.copy()
+            # Меньше исходного не увеличиваем: превью - копия оригинала
+            image.thumbnail((size, size))
+            if ext == "jpg" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Запись во временный файл и rename: читатели не видят недописанное превью
+            temp = f"{path}.{os.getpid()}.tmp"
+            image.save(temp, _SAVE_FORMATS[ext], optimize=True)
+            os.replace(temp, path)
+            created.append(name)
+    return created
+
+
+class ThumbnailWorkers(Resource):
+    """Пул процессов для генерации превью вне обработки запроса.
+
+    Пул создается при первой задаче; процессы запускаются через spawn,
+    чтобы не наследовать потоки и соединения воркера. Повторные задачи
+    для одного файла, пока первая не завершилась, не ставятся.
+    """
+
+    name = "thumbnails"
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if settings.image_variants and not thumbnails_available():
+            logger.warning("Pillow не установлен: превью не создаются, отдаются оригиналы")
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pending.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def missing(self, digest: str, ext: str) -> List[str]:
+        return [name for name in settings.image_variants
+                if not os.path.exists(media_path(name, digest, ext))]
+
+    def submit(self, digest: str, ext: str) -> Optional[Future]:
+        """Поставить генерацию недостающих превью; None - ставить нечего"""
+        if not thumbnails_available() or not self.missing(digest, ext):
+            return None
+        with self._lock:
+            if digest in self._pending:
+                return None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=settings.image_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            future = self._pool.submit(build_variants, digest, ext, dict(settings.image_variants), settings.upload_dir)
+            self._pending.add(digest)
+        future.add_done_callback(lambda done: self._done(digest, done))
+        return future
+
+    def _done(self, digest: str, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(digest)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Ошибка генерации превью %s: %s", digest, future.exception())
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._pending)}
+
+
+thumbnails = resources.register(ThumbnailWorkers())
@@ -0,0 +1,206 @@
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiofiles
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.config import settings
+from app.media.storage import IMAGE_TYPES, sniff_image_type, temp_dir
+
+# Байт заголовка файла, достаточных для определения типа
+_SNIFF_BYTES = 16
+MAX_FILES = 20
+MAX_FIELD_SIZE = 1024
+
+
+class UploadError(ValueError):
+    """Ошибка загрузки файла; status_code - код ответа"""
+
+    status_code = 400
+
+
+class FileTooLarge(UploadError):
+    status_code = 413
+
+
+class UnsupportedMediaType(UploadError):
+    status_code = 415
+
+
+@dataclass
+class UploadedFile:
+    """Файл, записанный во временный каталог; content_hash - sha256 содержимого"""
+
+    field_name: str
+    filename: str
+    path: str
+    content_hash: str
+    content_type: str
+    size: int
+
+    @property
+    def ext(self) -> str:
+        return IMAGE_TYPES[self.content_type]
+
+
+@dataclass
+class _Part:
+    name: str = ""
+    filename: Optional[str] = None
+    headers: Dict[bytes, bytes] = field(default_factory=dict)
+    head: bytes = b""
+    pending: List[bytes] = field(default_factory=list)
+    pending_size: int = 0
+    size: int = 0
+    path: Optional[str] = None
+    sha256: Any = None
+    file: Any = None
+    content_type: Optional[str] = None
+    finished: bool = False
+
+
+class MultipartUpload:
+    """Потоковый разбор multipart/form-data.
+
+    Тело запроса читается по мере поступления: данные файлов сразу
+    хэшируются и дописываются во временные файлы кусками upload_chunk_size,
+    в памяти держится не больше одного куска на файл. Тип файла
+    определяется по сигнатуре до записи основной части содержимого.
+    """
+
+    def __init__(self, content_type: str, max_file_size: Optional[int] = None):
+        mime, options = parse_options_header(content_type or "")
+        boundary = options.get(b"boundary")
+        if mime != b"multipart/form-data" or not boundary:
+            raise UploadError("Ожидается multipart/form-data")
+        self.max_file_size = max_file_size or settings.max_file_size
+        self.chunk_size = settings.upload_chunk_size
+        self.files: List[UploadedFile] = []
+        self.fields: Dict[str, str] = {}
+        self._parts: List[_Part] = []
+        self._part: Optional[_Part] = None
+        self._header_field = b""
+        self._header_value = b""
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    async def consume(self, stream: AsyncIterator[bytes]) -> "MultipartUpload":
+        """Прочитать тело запроса; при ошибке временные файлы удаляются"""
+        try:
+            async for chunk in stream:
+                self._parser.write(chunk)
+                await self._flush()
+            self._parser.finalize()
+            await self._flush()
+            if any(not part.finished for part in self._parts):
+                raise UploadError("Тело multipart оборвано")
+        except BaseException:
+            await self.discard()
+            raise
+        return self
+
+    async def discard(self) -> None:
+        """Удалить временные файлы, которые еще не перенесены в хранилище"""
+        for part in self._parts:
+            if part.file is not None:
+                await part.file.close()
+                part.file = None
+            if part.path and os.path.exists(part.path):
+                os.unlink(part.path)
+
+    # Колбэки парсера вызываются синхронно внутри write()
+
+    def _on_part_begin(self) -> None:
+        self._part = _Part()
+        self._parts.append(self._part)
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._part.headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        part = self._part
+        _, options = parse_options_header(part.headers.get(b"content-disposition", b""))
+        part.name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        if filename is not None:
+            if sum(1 for p in self._parts if p.filename is not None) >= MAX_FILES:
+                raise UploadError(f"Не больше {MAX_FILES} файлов за запрос")
+            part.filename = os.path.basename(filename.decode("utf-8", "replace"))
+            part.path = os.path.join(temp_dir(), f"{uuid.uuid4().hex}.part")
+            part.sha256 = hashlib.sha256()
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        part = self._part
+        chunk = bytes(data[start:end])
+        part.size += len(chunk)
+        if part.filename is None:
+            if part.size > MAX_FIELD_SIZE:
+                raise UploadError(f"Поле {part.name} длиннее {MAX_FIELD_SIZE} байт")
+        elif part.size > self.max_file_size:
+            raise FileTooLarge(f"Файл {part.filename} больше {self.max_file_size} байт")
+        else:
+            part.sha256.update(chunk)
+            if len(part.head) < _SNIFF_BYTES:
+                part.head += chunk[:_SNIFF_BYTES - len(part.head)]
+        part.pending.append(chunk)
+        part.pending_size += len(chunk)
+
+    def _on_part_end(self) -> None:
+        self._part.finished = True
+
+    async def _flush(self) -> None:
+        for part in self._parts:
+            if part.filename is None:
+                if part.finished and part.name not in self.fields:
+                    self.fields[part.name] = b"".join(part.pending).decode("utf-8", "replace")
+                continue
+            if part.content_type is None and (len(part.head) >= _SNIFF_BYTES or part.finished):
+                part.content_type = sniff_image_type(part.head)
+                if part.content_type is None:
+                    raise UnsupportedMediaType(
+                        f"Файл {part.filename}: поддерживаются {', '.join(sorted(IMAGE_TYPES))}"
+                    )
+            if part.content_type is None:
+                continue
+            if part.pending and (part.pending_size >= self.chunk_size or part.finished):
+                if part.file is None:
+                    part.file = await aiofiles.open(part.path, "wb")
+                await part.file.write(b"".join(part.pending))
+                part.pending, part.pending_size = [], 0
+            if part.finished and part.file is not None:
+                await part.file.close()
+                part.file = None
+                self.files.append(UploadedFile(
+                    field_name=part.name,
+                    filename=part.filename,
+                    path=part.path,
+                    content_hash=part.sha256.hexdigest(),
+                    content_type=part.content_type,
+                    size=part.size,
+                ))
+
+
+async def receive_upload(request) -> MultipartUpload:
+    """Разобрать multipart-запрос потоково, без буферизации файлов в памяти"""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.max_file_size * MAX_FILES:
+        raise FileTooLarge("Тело запроса слишком большое")
+    upload = MultipartUpload(request.headers.get("content-type", ""))
+    return await upload.consume(request.stream())
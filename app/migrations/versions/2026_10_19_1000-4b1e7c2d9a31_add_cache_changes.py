@@ -0,0 +1,35 @@
+"""add cache_changes log for cache invalidation
+
+Revision ID: 4b1e7c2d9a31
+Revises: 19c4a10af4ce
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e7c2d9a31'
+down_revision: Union[str, Sequence[str], None] = '19c4a10af4ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cache_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tags', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cache_changes_created_at'), 'cache_changes', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cache_changes_created_at'), table_name='cache_changes')
+    op.drop_table('cache_changes')
@@ -0,0 +1,47 @@
+"""add transactional outbox tables
+
+Revision ID: 7d2f1a9c5e40
+Revises: 4b1e7c2d9a31
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f1a9c5e40'
+down_revision: Union[str, Sequence[str], None] = '4b1e7c2d9a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('aggregate', sa.String(length=50), nullable=False),
+    sa.Column('aggregate_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=30), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_aggregate', 'outbox_events', ['aggregate', 'aggregate_id'], unique=False)
+    op.create_index(op.f('ix_outbox_events_created_at'), 'outbox_events', ['created_at'], unique=False)
+    op.create_table('outbox_offsets',
+    sa.Column('consumer', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('consumer')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('outbox_offsets')
+    op.drop_index(op.f('ix_outbox_events_created_at'), table_name='outbox_events')
+    op.drop_index('ix_outbox_events_aggregate', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,74 @@
+"""add indexes for repository query patterns
+
+Revision ID: a3c9e8f61b27
+Revises: 7d2f1a9c5e40
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e8f61b27'
+down_revision: Union[str, Sequence[str], None] = '7d2f1a9c5e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('is_active = true')
+ACTIVE_FEATURED = sa.text('is_active = true AND is_featured = true')
+
+# (имя, таблица, колонки, условие частичного индекса)
+INDEXES = [
+    ('ix_products_active_created', 'products', ['created_at'], ACTIVE),
+    ('ix_products_active_category_created', 'products', ['category_id', 'created_at'], ACTIVE),
+    ('ix_products_active_brand_created', 'products', ['brand_id', 'created_at'], ACTIVE),
+    ('ix_products_active_price', 'products', ['base_price'], ACTIVE),
+    ('ix_products_active_stock_state', 'products', ['stock_state', 'total_stock'], ACTIVE),
+    ('ix_products_featured', 'products', ['created_at'], ACTIVE_FEATURED),
+    ('ix_categories_parent_active', 'categories', ['parent_id', 'is_active'], None),
+    ('ix_attributes_attribute_type_id', 'attributes', ['attribute_type_id'], None),
+    ('ix_product_variants_product_id', 'product_variants', ['product_id'], None),
+    ('ix_product_variants_attribute_id', 'product_variants', ['attribute_id'], None),
+    ('ix_reviews_product_id', 'reviews', ['product_id'], None),
+    ('ix_order_items_order_id', 'order_items', ['order_id'], None),
+    ('ix_order_items_product_id', 'order_items', ['product_id'], None),
+    ('ix_product_tags_tag_id', 'product_tags', ['tag_id', 'product_id'], None),
+    ('ix_product_images_image_id', 'product_images', ['image_id', 'product_id'], None),
+]
+
+
+def _where(condition):
+    # SQLite хранит булевы как 0/1, и условие индекса должно совпадать с условием запроса
+    if condition is None or op.get_bind().dialect.name != 'sqlite':
+        return condition
+    return sa.text(condition.text.replace('true', '1'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+        with op.get_context().autocommit_block():
+            for name, table, columns, condition in INDEXES:
+                op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                                postgresql_where=condition, postgresql_concurrently=True)
+        return
+
+    for name, table, columns, condition in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                        sqlite_where=_where(condition))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+        return
+
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
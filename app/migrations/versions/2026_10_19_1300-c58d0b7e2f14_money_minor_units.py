@@ -0,0 +1,71 @@
+"""store money columns as integer minor units
+
+Revision ID: c58d0b7e2f14
+Revises: a3c9e8f61b27
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58d0b7e2f14'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e8f61b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# таблица -> денежные колонки (nullable)
+MONEY_COLUMNS = {
+    'products': [('base_price', True), ('old_price', True)],
+    'product_variants': [('price_modifier', True)],
+    'orders': [('total_amount', False)],
+    'order_items': [('unit_price', False), ('total_price', False)],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, columns in MONEY_COLUMNS.items():
+            for column, nullable in columns:
+                op.alter_column(table, column,
+                                existing_type=sa.DOUBLE_PRECISION(),
+                                type_=sa.BigInteger(),
+                                existing_nullable=nullable,
+                                postgresql_using=f'round({column} * 100)::bigint')
+        return
+
+    # SQLite: сначала переводим значения в центы, затем пересоздаем таблицу с целым типом
+    for table, columns in MONEY_COLUMNS.items():
+        op.execute(f"UPDATE {table} SET " + ", ".join(
+            f"{column} = round({column} * 100)" for column, _ in columns
+        ))
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(column, existing_type=sa.Float(), type_=sa.BigInteger(),
+                                      existing_nullable=nullable)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, columns in MONEY_COLUMNS.items():
+            for column, nullable in columns:
+                op.alter_column(table, column,
+                                existing_type=sa.BigInteger(),
+                                type_=sa.DOUBLE_PRECISION(),
+                                existing_nullable=nullable,
+                                postgresql_using=f'{column} / 100.0')
+        return
+
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(column, existing_type=sa.BigInteger(), type_=sa.Float(),
+                                      existing_nullable=nullable)
+        op.execute(f"UPDATE {table} SET " + ", ".join(
+            f"{column} = {column} / 100.0" for column, _ in columns
+        ))
@@ -0,0 +1,72 @@
+"""add price schedules and price history
+
+Revision ID: e61f4b8d2a07
+Revises: c58d0b7e2f14
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e61f4b8d2a07'
+down_revision: Union[str, Sequence[str], None] = 'c58d0b7e2f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('price_schedules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('rule', sa.String(length=20), nullable=False),
+    sa.Column('percent', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.BigInteger(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('brand_id', sa.Integer(), nullable=True),
+    sa.Column('tag_id', sa.Integer(), nullable=True),
+    sa.Column('product_ids', sa.JSON(), nullable=True),
+    sa.Column('starts_at', sa.DateTime(), nullable=False),
+    sa.Column('ends_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('affected_count', sa.Integer(), nullable=True),
+    sa.Column('activated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['brand_id'], ['brands.id'], ),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_price_schedules_id'), 'price_schedules', ['id'], unique=False)
+    op.create_index('ix_price_schedules_status_starts', 'price_schedules', ['status', 'starts_at'], unique=False)
+    op.create_table('price_history',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('schedule_id', sa.Integer(), nullable=True),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('previous_base_price', sa.BigInteger(), nullable=True),
+    sa.Column('previous_old_price', sa.BigInteger(), nullable=True),
+    sa.Column('base_price', sa.BigInteger(), nullable=True),
+    sa.Column('old_price', sa.BigInteger(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['schedule_id'], ['price_schedules.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_price_history_product_changed', 'price_history', ['product_id', 'changed_at'], unique=False)
+    op.create_index('ix_price_history_schedule_product', 'price_history', ['schedule_id', 'product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_price_history_schedule_product', table_name='price_history')
+    op.drop_index('ix_price_history_product_changed', table_name='price_history')
+    op.drop_table('price_history')
+    op.drop_index('ix_price_schedules_status_starts', table_name='price_schedules')
+    op.drop_index(op.f('ix_price_schedules_id'), table_name='price_schedules')
+    op.drop_table('price_schedules')
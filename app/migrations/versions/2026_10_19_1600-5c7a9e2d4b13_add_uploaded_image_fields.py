@@ -0,0 +1,36 @@
+"""add content hash and file info to images
+
+Revision ID: 5c7a9e2d4b13
+Revises: 0b8d5e3f7c62
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7a9e2d4b13'
+down_revision: Union[str, Sequence[str], None] = '0b8d5e3f7c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('content_type', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('file_size', sa.Integer(), nullable=True))
+        batch_op.create_unique_constraint('uq_images_content_hash', ['content_hash'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.drop_constraint('uq_images_content_hash', type_='unique')
+        batch_op.drop_column('file_size')
+        batch_op.drop_column('content_type')
+        batch_op.drop_column('content_hash')
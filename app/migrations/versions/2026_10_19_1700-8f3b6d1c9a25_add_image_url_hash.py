@@ -0,0 +1,62 @@
+"""add unique url hash to images
+
+Revision ID: 8f3b6d1c9a25
+Revises: 5c7a9e2d4b13
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3b6d1c9a25'
+down_revision: Union[str, Sequence[str], None] = '5c7a9e2d4b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+images = sa.table('images', sa.column('id', sa.Integer), sa.column('url', sa.String), sa.column('url_hash', sa.String))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.add_column(sa.Column('url_hash', sa.String(length=64), nullable=True))
+
+    # Хэш получает самое раннее изображение с данным URL; у дублей он остается NULL
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE images SET url_hash = encode(sha256(convert_to(url, 'UTF8')), 'hex') "
+            "WHERE id IN (SELECT min(id) FROM images GROUP BY url)"
+        )
+    else:
+        _backfill(bind)
+
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.create_unique_constraint('uq_images_url_hash', ['url_hash'])
+
+
+def _backfill(bind) -> None:
+    seen = set()
+    rows = []
+    for image_id, url in bind.execute(sa.select(images.c.id, images.c.url).order_by(images.c.id)):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        if digest not in seen:
+            seen.add(digest)
+            rows.append({'image_id': image_id, 'digest': digest})
+    for start in range(0, len(rows), 1000):
+        bind.execute(
+            images.update().where(images.c.id == sa.bindparam('image_id')).values(url_hash=sa.bindparam('digest')),
+            rows[start:start + 1000],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.drop_constraint('uq_images_url_hash', type_='unique')
+        batch_op.drop_column('url_hash')
@@ -0,0 +1,70 @@
+"""add multi-attribute variant combinations and summaries
+
+Revision ID: 3d9e7a4b2f60
+Revises: 8f3b6d1c9a25
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9e7a4b2f60'
+down_revision: Union[str, Sequence[str], None] = '8f3b6d1c9a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('variant_combinations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('attribute_set_hash', sa.String(length=64), nullable=False),
+    sa.Column('sku', sa.String(length=80), nullable=True),
+    sa.Column('price_modifier', sa.BigInteger(), nullable=True),
+    sa.Column('stock_quantity', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('product_id', 'attribute_set_hash', name='uq_variant_combinations_product_attributes'),
+    sa.UniqueConstraint('sku')
+    )
+    op.create_table('variant_combination_attributes',
+    sa.Column('combination_id', sa.Integer(), nullable=False),
+    sa.Column('attribute_type_id', sa.Integer(), nullable=False),
+    sa.Column('attribute_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['attribute_id'], ['attributes.id'], ),
+    sa.ForeignKeyConstraint(['attribute_type_id'], ['attribute_types.id'], ),
+    sa.ForeignKeyConstraint(['combination_id'], ['variant_combinations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('combination_id', 'attribute_type_id')
+    )
+    op.create_index('ix_variant_combination_attributes_attribute_product', 'variant_combination_attributes',
+                    ['attribute_id', 'product_id'], unique=False)
+    op.create_table('product_variant_summaries',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('colors', sa.JSON(), nullable=False),
+    sa.Column('options', sa.JSON(), nullable=False),
+    sa.Column('variants_count', sa.Integer(), nullable=False),
+    sa.Column('min_price_modifier', sa.BigInteger(), nullable=True),
+    sa.Column('max_price_modifier', sa.BigInteger(), nullable=True),
+    sa.Column('total_stock', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_variant_summaries')
+    op.drop_index('ix_variant_combination_attributes_attribute_product', table_name='variant_combination_attributes')
+    op.drop_table('variant_combination_attributes')
+    op.drop_table('variant_combinations')
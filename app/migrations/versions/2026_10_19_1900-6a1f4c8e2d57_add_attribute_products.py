@@ -0,0 +1,45 @@
+"""add attribute_products inverted index for attribute filters
+
+Revision ID: 6a1f4c8e2d57
+Revises: 3d9e7a4b2f60
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1f4c8e2d57'
+down_revision: Union[str, Sequence[str], None] = '3d9e7a4b2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attribute_products',
+    sa.Column('attribute_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['attribute_id'], ['attributes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('attribute_id', 'product_id')
+    )
+    op.create_index('ix_attribute_products_product_id', 'attribute_products', ['product_id'], unique=False)
+
+    # Заполнение из активных одноатрибутных вариантов и сочетаний
+    op.execute(
+        "INSERT INTO attribute_products (attribute_id, product_id) "
+        "SELECT attribute_id, product_id FROM product_variants WHERE is_active "
+        "UNION "
+        "SELECT a.attribute_id, a.product_id FROM variant_combination_attributes a "
+        "JOIN variant_combinations c ON c.id = a.combination_id WHERE c.is_active"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attribute_products_product_id', table_name='attribute_products')
+    op.drop_table('attribute_products')
@@ -0,0 +1,54 @@
+"""add indexes for shop-scoped product listings
+
+Revision ID: b7e2d9c4f183
+Revises: 6a1f4c8e2d57
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d9c4f183'
+down_revision: Union[str, Sequence[str], None] = '6a1f4c8e2d57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = 'is_active = true'
+
+# (имя, колонки) частичных индексов по активным товарам
+INDEXES = [
+    ('ix_products_active_shop_created', ['shop_id', 'created_at']),
+    ('ix_products_active_shop_price', ['shop_id', 'base_price']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES:
+                op.create_index(name, 'products', columns, unique=False, if_not_exists=True,
+                                postgresql_where=sa.text(ACTIVE), postgresql_concurrently=True)
+        return
+
+    # SQLite хранит булевы как 0/1, и условие индекса должно совпадать с условием запроса
+    for name, columns in INDEXES:
+        op.create_index(name, 'products', columns, unique=False, if_not_exists=True,
+                        sqlite_where=sa.text(ACTIVE.replace('true', '1')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, _ in reversed(INDEXES):
+                op.drop_index(name, table_name='products', if_exists=True, postgresql_concurrently=True)
+        return
+
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='products', if_exists=True)
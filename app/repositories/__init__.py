@@ -3,11 +3,19 @@ from .category import CategoryRepository
 from .brand import BrandRepository
 from .product import ProductRepository
 from .tag import TagRepository
+from .pricing import PriceScheduleRepository
+from .image import ImageRepository
+from .variant import VariantRepository
+from .shop import ShopRepository
 
 __all__ = [
     "BaseRepository",
     "CategoryRepository", 
     "BrandRepository",
     "ProductRepository",
-    "TagRepository"
+    "TagRepository",
+    "PriceScheduleRepository",
+    "ImageRepository",
+    "VariantRepository",
+    "ShopRepository"
 ]
\ No newline at end of file
@@ -3,6 +3,9 @@ from typing import List, Optional, Dict, Any, Type, TypeVar, Generic
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 from pydantic import BaseModel
+from app.cache.bus import publish
+from app.core.outbox import record_event
+from app.database.connection import read_only
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -11,14 +14,39 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """Базовый репозиторий с общими CRUD операциями"""
     
+    # Префикс тегов кэша для объектов репозитория (None - не рассылать инвалидацию)
+    cache_namespace: Optional[str] = None
+    # Агрегат для событий outbox (None - события не пишутся)
+    outbox_aggregate: Optional[str] = None
+    
     def __init__(self, model: Type[ModelType], db: Session):
         self.model = model
         self.db = db
     
+    def cache_tags(self, db_obj: ModelType) -> List[str]:
+        """Теги кэша, которые сбрасываются при изменении объекта"""
+        if not self.cache_namespace:
+            return []
+        return [self.cache_namespace, f"{self.cache_namespace}:{db_obj.id}"]
+    
+    def outbox_payload(self, db_obj: ModelType) -> Dict[str, Any]:
+        """Данные события outbox об объекте"""
+        return {"id": db_obj.id}
+    
+    def publish_change(self, db_obj: ModelType, event_type: str = "updated") -> None:
+        """Разослать инвалидацию и записать событие об изменении в текущей транзакции"""
+        tags = self.cache_tags(db_obj)
+        if tags:
+            publish(self.db, *tags)
+        if self.outbox_aggregate:
+            record_event(self.db, self.outbox_aggregate, db_obj.id, event_type, self.outbox_payload(db_obj))
+    
+    @read_only
     def get_by_id(self, id: int) -> Optional[ModelType]:
         """Получить объект по ID"""
         return self.db.query(self.model).filter(self.model.id == id).first()
     
+    @read_only
     def get_all(self, skip: int = 0, limit: int = 10, active_only: bool = True) -> List[ModelType]:
         """Получить все объекты с пагинацией"""
         query = self.db.query(self.model)
@@ -26,6 +54,7 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
             query = query.filter(self.model.is_active == True)
         return query.offset(skip).limit(limit).all()
     
+    @read_only
     def get_count(self, active_only: bool = True) -> int:
         """Получить количество объектов"""
         query = self.db.query(self.model)
@@ -38,6 +67,8 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
         obj_data = obj_in.dict() if hasattr(obj_in, 'dict') else obj_in
         db_obj = self.model(**obj_data)
         self.db.add(db_obj)
+        self.db.flush()
+        self.publish_change(db_obj, "created")
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
@@ -48,6 +79,7 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
         for field, value in update_data.items():
             if hasattr(db_obj, field):
                 setattr(db_obj, field, value)
+        self.publish_change(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
@@ -56,6 +88,7 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
         """Удалить объект по ID"""
         db_obj = self.get_by_id(id)
         if db_obj:
+            self.publish_change(db_obj, "deleted")
             self.db.delete(db_obj)
             self.db.commit()
             return True
@@ -66,6 +99,7 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
         db_obj = self.get_by_id(id)
         if db_obj and hasattr(db_obj, 'is_active'):
             db_obj.is_active = False
+            self.publish_change(db_obj, "deactivated")
             self.db.commit()
             return True
         return False
\ No newline at end of file
@@ -1,18 +1,24 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from app.database.models import Brand
 from app.schemas import BrandCreate, BrandUpdate
+from app.database.connection import read_only
 from .base import BaseRepository
 
 class BrandRepository(BaseRepository[Brand, BrandCreate, BrandUpdate]):
+    cache_namespace = "brand"
+    outbox_aggregate = "brand"
+    
     def __init__(self, db: Session):
         super().__init__(Brand, db)
     
+    @read_only
     def get_by_slug(self, slug: str) -> Optional[Brand]:
         """Получить бренд по slug"""
         return self.db.query(Brand).filter(Brand.slug == slug).first()
     
+    @read_only
     def search_by_name(self, name: str) -> List[Brand]:
         """Поиск брендов по имени"""
         return self.db.query(Brand).filter(
@@ -22,6 +28,7 @@ class BrandRepository(BaseRepository[Brand, BrandCreate, BrandUpdate]):
             )
         ).all()
     
+    @read_only
     def get_popular_brands(self, limit: int = 10) -> List[Brand]:
         """Получить популярные бренды (с наибольшим количеством товаров)"""
         from app.database.models import Product
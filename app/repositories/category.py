@@ -3,28 +3,35 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.database.models import Category
 from app.schemas import CategoryCreate, CategoryUpdate
+from app.database.connection import read_only
 from .base import BaseRepository
 
 class CategoryRepository(BaseRepository[Category, CategoryCreate, CategoryUpdate]):
+    cache_namespace = "category"
+    
     def __init__(self, db: Session):
         super().__init__(Category, db)
     
+    @read_only
     def get_by_slug(self, slug: str) -> Optional[Category]:
         """Получить категорию по slug"""
         return self.db.query(Category).filter(Category.slug == slug).first()
     
+    @read_only
     def get_root_categories(self) -> List[Category]:
         """Получить корневые категории (без родителя)"""
         return self.db.query(Category).filter(
             and_(Category.parent_id.is_(None), Category.is_active == True)
         ).all()
     
+    @read_only
     def get_children(self, parent_id: int) -> List[Category]:
         """Получить дочерние категории"""
         return self.db.query(Category).filter(
             and_(Category.parent_id == parent_id, Category.is_active == True)
         ).all()
     
+    @read_only
     def get_category_tree(self) -> List[Category]:
         """Получить дерево категорий"""
         # Сначала получаем все корневые категории
@@ -36,6 +43,7 @@ class CategoryRepository(BaseRepository[Category, CategoryCreate, CategoryUpdate
         
         return root_categories
     
+    @read_only
     def search_by_name(self, name: str) -> List[Category]:
         """Поиск категорий по имени"""
         return self.db.query(Category).filter(
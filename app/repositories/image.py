@@ -0,0 +1,116 @@
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app.cache.memory import MemoryBackend
+from app.config import settings
+from app.database.models import Image, url_hash
+from app.schemas import ImageCreate, ImageUpdate
+from .base import BaseRepository
+
+# Недавно встреченные URL -> id изображения (изображения не удаляются и URL не меняют)
+_url_ids = MemoryBackend(max_entries=settings.image_url_cache_size)
+# Найденные и созданные в транзакции связи попадают в кэш только после commit
+_PENDING_URLS = "image_urls_pending"
+_CHUNK = 1000
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_pending(session: Session) -> None:
+    for digest, image_id in session.info.pop(_PENDING_URLS, {}).items():
+        _url_ids.set(digest, image_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING_URLS, None)
+
+
+class ImageRepository(BaseRepository[Image, ImageCreate, ImageUpdate]):
+    # Изменения изображений попадают в фид товаров (карта сайта перестраивает их шарды)
+    outbox_aggregate = "image"
+
+    def __init__(self, db: Session):
+        super().__init__(Image, db)
+
+    def get_by_content_hash(self, content_hash: str) -> Optional[Image]:
+        """Получить загруженное изображение по sha256 содержимого"""
+        return self.db.query(Image).filter(Image.content_hash == content_hash).first()
+
+    def get_or_create_upload(self, content_hash: str, url: str, content_type: str, file_size: int,
+                             alt_text: Optional[str] = None) -> Image:
+        """Найти изображение с тем же содержимым или создать новое (без commit)"""
+        image = self.get_by_content_hash(content_hash)
+        if image:
+            return image
+        image = Image(url=url, alt_text=alt_text, content_hash=content_hash,
+                      content_type=content_type, file_size=file_size)
+        try:
+            # Параллельная загрузка того же файла упирается в уникальный индекс
+            with self.db.begin_nested():
+                self.db.add(image)
+        except IntegrityError:
+            image = self.get_by_content_hash(content_hash)
+        return image
+
+    def _select_ids(self, digests: List[str]) -> Dict[str, int]:
+        found = {}
+        for start in range(0, len(digests), _CHUNK):
+            found.update(self.db.execute(
+                select(Image.url_hash, Image.id).where(Image.url_hash.in_(digests[start:start + _CHUNK]))
+            ).all())
+        return found
+
+    def _insert_ignoring_conflicts(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Вставить строки одним запросом; занятые параллельной вставкой URL пропускаются"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(Image).on_conflict_do_nothing(index_elements=["url_hash"])
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(Image).on_conflict_do_nothing(index_elements=["url_hash"])
+        else:
+            stmt = insert(Image)
+        return dict(self.db.execute(stmt.returning(Image.url_hash, Image.id), rows).all())
+
+    def resolve_urls(self, urls: Iterable[str],
+                     values: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+        """URL -> id изображения; недостающие создаются (без commit).
+
+        Известные воркеру URL берутся из LRU, остальные - одним SELECT по
+        url_hash и одной пачкой INSERT; values задает поля новых строк по URL
+        (одинаковый набор полей для всех URL).
+        """
+        digests = {}
+        for url in urls:
+            if url:
+                digests.setdefault(url, url_hash(url))
+
+        resolved = {}
+        unknown = []
+        for url, digest in digests.items():
+            image_id = _url_ids.get(digest)
+            if image_id is None:
+                unknown.append(digest)
+            else:
+                resolved[digest] = image_id
+        if unknown:
+            resolved.update(self._select_ids(unknown))
+
+        missing = [(url, digest) for url, digest in digests.items() if digest not in resolved]
+        if missing:
+            values = values or {}
+            created = self._insert_ignoring_conflicts([
+                {**values.get(url, {}), "url": url, "url_hash": digest} for url, digest in missing
+            ])
+            lost = [digest for _, digest in missing if digest not in created]
+            if lost:
+                # Эти URL только что вставил другой запрос
+                created.update(self._select_ids(lost))
+            resolved.update(created)
+
+        self.db.info.setdefault(_PENDING_URLS, {}).update(
+            (digest, resolved[digest]) for digest in unknown
+        )
+
+        return {url: resolved[digest] for url, digest in digests.items()}
@@ -0,0 +1,226 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, and_, case, func, insert, literal, select, update, String
+from sqlalchemy.sql import type_coerce
+from app.core.money import to_minor
+from app.core.outbox import record_events_for
+from app.database.models import PriceHistory, PriceSchedule, Product
+from app.schemas import PriceScheduleCreate
+from app.database.connection import read_only
+from app.database.types import UTCDateTime
+from .base import BaseRepository
+from .product import ProductRepository
+
+# Цены в выражениях - целые минимальные единицы, без преобразования MoneyType
+_base = type_coerce(Product.base_price, BigInteger)
+_old = type_coerce(Product.old_price, BigInteger)
+_history = PriceHistory.__table__
+# Расписания, которые сейчас действуют на цены
+_IN_EFFECT = ('scheduled', 'active')
+
+
+def _last_manual_id(product_id):
+    """id последнего ручного изменения цены товара (0 - не было)"""
+    manual = _history.alias('manual')
+    return select(func.coalesce(func.max(manual.c.id), 0)).where(
+        and_(manual.c.product_id == product_id, manual.c.kind == 'manual')
+    ).scalar_subquery()
+
+
+def _applied_after_manual(schedule_id: int):
+    """Расписание применено к товару после его последнего ручного изменения цены"""
+    applied = _history.alias('applied')
+    return select(applied.c.id).where(and_(
+        applied.c.schedule_id == schedule_id,
+        applied.c.kind == 'apply',
+        applied.c.product_id == Product.id,
+        applied.c.id > _last_manual_id(applied.c.product_id),
+    )).exists()
+
+
+def _latest_base_price():
+    """Цена из последней записи истории товара"""
+    latest = _history.alias('latest')
+    return type_coerce(
+        select(latest.c.base_price).where(latest.c.product_id == Product.id)
+        .order_by(latest.c.id.desc()).limit(1).scalar_subquery(),
+        BigInteger,
+    )
+
+
+def _list_price(column: str):
+    """Цена до первого расписания, действующего с последнего ручного изменения"""
+    chain = _history.alias('chain')
+    return type_coerce(
+        select(chain.c[column]).where(and_(
+            chain.c.product_id == Product.id,
+            chain.c.kind == 'apply',
+            chain.c.id > _last_manual_id(chain.c.product_id),
+        )).order_by(chain.c.id).limit(1).scalar_subquery(),
+        BigInteger,
+    )
+
+
+class PriceScheduleRepository(BaseRepository[PriceSchedule, PriceScheduleCreate, PriceScheduleCreate]):
+    def __init__(self, db: Session):
+        super().__init__(PriceSchedule, db)
+
+    @read_only
+    def get_all(self, skip: int = 0, limit: int = 10, active_only: bool = True) -> List[PriceSchedule]:
+        """Получить расписания, новые первыми (active_only - только запланированные и действующие)"""
+        query = self.db.query(PriceSchedule)
+        if active_only:
+            query = query.filter(PriceSchedule.status.in_(_IN_EFFECT))
+        return query.order_by(PriceSchedule.id.desc()).offset(skip).limit(limit).all()
+
+    def get_due_to_start(self, now: datetime) -> List[PriceSchedule]:
+        """Расписания, время начала которых наступило"""
+        return self.db.query(PriceSchedule).filter(
+            and_(PriceSchedule.status == 'scheduled', PriceSchedule.starts_at <= now)
+        ).order_by(PriceSchedule.starts_at).all()
+
+    def get_due_to_finish(self, now: datetime) -> List[PriceSchedule]:
+        """Активные расписания, время окончания которых наступило"""
+        return self.db.query(PriceSchedule).filter(
+            and_(PriceSchedule.status == 'active', PriceSchedule.ends_at <= now)
+        ).order_by(PriceSchedule.ends_at).all()
+
+    def get_active(self) -> List[PriceSchedule]:
+        """Действующие расписания в порядке применения"""
+        return self.db.query(PriceSchedule).filter(
+            PriceSchedule.status == 'active'
+        ).order_by(PriceSchedule.activated_at, PriceSchedule.id).all()
+
+    def claim(self, id: int, from_status: str, to_status: str) -> bool:
+        """Атомарно перевести расписание в новый статус (один воркер из всех)"""
+        result = self.db.execute(
+            update(PriceSchedule)
+            .where(and_(PriceSchedule.id == id, PriceSchedule.status == from_status))
+            .values(status=to_status)
+        )
+        return result.rowcount == 1
+
+    def _target_ids(self, schedule: PriceSchedule):
+        filters = {
+            'ids': schedule.product_ids,
+            'category_id': schedule.category_id,
+            'brand_id': schedule.brand_id,
+            'tag_id': schedule.tag_id,
+        }
+        return ProductRepository(self.db).select_ids(filters).where(Product.base_price.is_not(None))
+
+    def _new_prices(self, schedule: PriceSchedule):
+        """Выражения новой цены и зачеркнутой цены в целых минимальных единицах"""
+        amount = literal(to_minor(schedule.amount) or 0, BigInteger)
+        if schedule.rule == 'percent_off':
+            if not 1 <= (schedule.percent or 0) <= 99:
+                raise ValueError(f"Скидка должна быть от 1 до 99%, а не {schedule.percent}")
+            # Округление половины вверх: (цена * (100 - p) + 50) // 100
+            discounted = (_base * (100 - schedule.percent) + 50) // 100
+        elif schedule.rule == 'amount_off':
+            discounted = _base - amount
+        else:
+            discounted = amount
+        # Цена не опускается ниже одной минимальной единицы
+        new_base = case((discounted > 0, discounted), else_=literal(1, BigInteger))
+        # Зачеркнутой остается исходная цена, если скидка уже была - прежняя зачеркнутая
+        new_old = func.coalesce(_old, _base)
+        return new_base, new_old
+
+    def apply(self, schedule: PriceSchedule, now: datetime) -> int:
+        """Применить расписание к набору товаров: история, UPDATE и события - по одному запросу"""
+        target = self._target_ids(schedule)
+        new_base, new_old = self._new_prices(schedule)
+
+        self.db.execute(insert(PriceHistory).from_select(
+            ['product_id', 'schedule_id', 'kind', 'previous_base_price', 'previous_old_price',
+             'base_price', 'old_price', 'changed_at'],
+            select(Product.id, literal(schedule.id), literal('apply', String), _base, _old,
+                   new_base, new_old, literal(now, UTCDateTime))
+            .where(Product.id.in_(target)),
+        ))
+        result = self.db.execute(
+            update(Product)
+            .where(Product.id.in_(target))
+            .values({Product.base_price: new_base, Product.old_price: new_old, Product.updated_at: func.now()})
+            .execution_options(synchronize_session=False)
+        )
+        record_events_for(self.db, 'product', self._history_ids(schedule.id, 'apply'), 'price_changed')
+        return result.rowcount
+
+    def _history_ids(self, schedule_id: int, kind: str):
+        return select(PriceHistory.product_id).where(
+            and_(PriceHistory.schedule_id == schedule_id, PriceHistory.kind == kind)
+        )
+
+    def revert(self, schedule: PriceSchedule, now: datetime) -> int:
+        """Снять расписание: цена пересчитывается от исходной с учетом остальных действующих расписаний.
+
+        Исходная цена - цена до первого расписания, примененного после
+        последнего ручного изменения. Товары, цену которых с тех пор меняли,
+        не трогаем. Все шаги - set-based, по запросу на каждое
+        пересекающееся действующее расписание.
+        """
+        # Запись истории появляется сразу и задает набор товаров; новая цена дописывается в конце
+        self.db.execute(insert(PriceHistory).from_select(
+            ['product_id', 'schedule_id', 'kind', 'previous_base_price', 'previous_old_price', 'changed_at'],
+            select(Product.id, literal(schedule.id), literal('revert', String), _base, _old,
+                   literal(now, UTCDateTime))
+            .where(and_(_applied_after_manual(schedule.id), _base == _latest_base_price())),
+        ))
+        reverted = Product.id.in_(self._history_ids(schedule.id, 'revert'))
+
+        result = self.db.execute(
+            update(Product)
+            .where(reverted)
+            .values({
+                Product.base_price: _list_price('previous_base_price'),
+                Product.old_price: _list_price('previous_old_price'),
+                Product.updated_at: func.now(),
+            })
+            .execution_options(synchronize_session=False)
+        )
+        for other in self.get_active():
+            if other.id == schedule.id:
+                continue
+            new_base, new_old = self._new_prices(other)
+            self.db.execute(
+                update(Product)
+                .where(and_(reverted, _applied_after_manual(other.id)))
+                .values({Product.base_price: new_base, Product.old_price: new_old})
+                .execution_options(synchronize_session=False)
+            )
+
+        current = select(Product.__table__).where(Product.id == PriceHistory.product_id)
+        self.db.execute(
+            update(PriceHistory)
+            .where(and_(PriceHistory.schedule_id == schedule.id, PriceHistory.kind == 'revert'))
+            .values({
+                PriceHistory.base_price: type_coerce(
+                    current.with_only_columns(Product.__table__.c.base_price).scalar_subquery(), BigInteger),
+                PriceHistory.old_price: type_coerce(
+                    current.with_only_columns(Product.__table__.c.old_price).scalar_subquery(), BigInteger),
+            })
+            .execution_options(synchronize_session=False)
+        )
+        record_events_for(self.db, 'product', self._history_ids(schedule.id, 'revert'), 'price_changed')
+        return result.rowcount
+
+    def record_manual_change(self, product_id: int, previous_base_price, previous_old_price, base_price, old_price) -> None:
+        """Записать ручное изменение цены товара в историю (фиксируется вместе с изменением)"""
+        self.db.add(PriceHistory(
+            product_id=product_id,
+            kind='manual',
+            previous_base_price=previous_base_price,
+            previous_old_price=previous_old_price,
+            base_price=base_price,
+            old_price=old_price,
+        ))
+
+    @read_only
+    def get_history(self, product_id: int, skip: int = 0, limit: int = 50) -> List[PriceHistory]:
+        """История цен товара, новые изменения первыми"""
+        return self.db.query(PriceHistory).filter(
+            PriceHistory.product_id == product_id
+        ).order_by(PriceHistory.id.desc()).offset(skip).limit(limit).all()
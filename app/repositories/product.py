@@ -1,33 +1,149 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc
-from app.database.models import Product, Category, Brand, Tag, Image, ProductVariant
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, or_, func, desc, inspect, select, update, Select
+from app.cache.bus import publish
+from app.core.money import to_minor
+from app.core.outbox import record_events_for
+from app.database.models import (
+    Product, Category, Brand, Tag, Image, ProductVariant, Attribute, RelatedProduct, attribute_products, product_tags
+)
 from app.schemas import ProductCreate, ProductUpdate
+from app.database.connection import read_only
 from .base import BaseRepository
 
 class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
+    cache_namespace = "product"
+    outbox_aggregate = "product"
+    
     def __init__(self, db: Session):
         super().__init__(Product, db)
     
+    def cache_tags(self, db_obj: Product) -> List[str]:
+        """Теги товара и его магазина (и прежнего магазина, если товар перенесли)"""
+        shop_ids = {db_obj.shop_id, *inspect(db_obj).attrs.shop_id.history.deleted} - {None}
+        return super().cache_tags(db_obj) + [f"shop:{shop_id}" for shop_id in sorted(shop_ids)]
+    
+    def outbox_payload(self, db_obj: Product) -> Dict[str, Any]:
+        """Снимок полей товара для потребителей событий"""
+        return {
+            "id": db_obj.id,
+            "sku": db_obj.sku,
+            "slug": db_obj.slug,
+            "title": db_obj.title,
+            # Цены - в минимальных единицах, чтобы payload оставался JSON
+            "base_price_minor": to_minor(db_obj.base_price),
+            "old_price_minor": to_minor(db_obj.old_price),
+            "total_stock": db_obj.total_stock,
+            "stock_state": db_obj.stock_state,
+            "is_active": db_obj.is_active,
+            "is_featured": db_obj.is_featured,
+            "category_id": db_obj.category_id,
+            "brand_id": db_obj.brand_id,
+            "shop_id": db_obj.shop_id,
+        }
+    
+    @read_only
     def get_by_id_with_relations(self, id: int) -> Optional[Product]:
         """Получить товар со всеми связанными данными"""
+        # Коллекции грузятся отдельными запросами по индексам связей, а не одним JOIN
         return self.db.query(Product).options(
             joinedload(Product.category),
             joinedload(Product.brand),
             joinedload(Product.shop),
-            joinedload(Product.tags),
-            joinedload(Product.images),
-            joinedload(Product.variants).joinedload(ProductVariant.attribute)
+            selectinload(Product.tags),
+            selectinload(Product.images),
+            selectinload(Product.variants).joinedload(ProductVariant.attribute).joinedload(Attribute.attribute_type),
+            joinedload(Product.variant_summary)
         ).filter(Product.id == id).first()
     
+    @read_only
+    def get_many_with_relations(self, ids: List[int]) -> List[Product]:
+        """Получить товары по списку ID со связанными данными (без фильтра по активности)"""
+        if not ids:
+            return []
+        return self.db.query(Product).options(
+            selectinload(Product.category),
+            selectinload(Product.brand),
+            selectinload(Product.shop),
+            selectinload(Product.tags),
+            selectinload(Product.images),
+            selectinload(Product.variants).joinedload(ProductVariant.attribute).joinedload(Attribute.attribute_type),
+            selectinload(Product.variant_summary)
+        ).filter(Product.id.in_(ids)).all()
+    
+    def select_ids(self, filters: Dict[str, Any]) -> Select:
+        """SELECT id товаров по набору условий (для операций над множеством товаров).
+
+        Поддерживаются ids, category_id, brand_id, tag_id, shop_id и is_active;
+        условия объединяются через AND.
+        """
+        query = select(Product.id)
+        if filters.get('ids') is not None:
+            query = query.where(Product.id.in_(filters['ids']))
+        if filters.get('category_id') is not None:
+            query = query.where(Product.category_id == filters['category_id'])
+        if filters.get('brand_id') is not None:
+            query = query.where(Product.brand_id == filters['brand_id'])
+        if filters.get('shop_id') is not None:
+            query = query.where(Product.shop_id == filters['shop_id'])
+        if filters.get('is_active') is not None:
+            query = query.where(Product.is_active == filters['is_active'])
+        if filters.get('tag_id') is not None:
+            query = query.where(Product.id.in_(
+                select(product_tags.c.product_id).where(product_tags.c.tag_id == filters['tag_id'])
+            ))
+        return query
+    
+    def bulk_update(self, filters: Dict[str, Any], values: Dict[str, Any], event_type: str = "updated") -> int:
+        """Изменить поля у множества товаров одним UPDATE; вернуть число измененных.
+
+        Строки, где значения уже совпадают, не трогаются. События outbox
+        пишутся одним INSERT ... SELECT, инвалидация - один тег на пачку.
+        """
+        if not values:
+            return 0
+        changed = or_(*[getattr(Product, field).is_distinct_from(value) for field, value in values.items()])
+        target = self.select_ids(filters).where(changed)
+        
+        # События пишутся до UPDATE: после него условие уже не выбирает эти строки
+        record_events_for(self.db, self.outbox_aggregate, target, event_type)
+        result = self.db.execute(
+            update(Product)
+            .where(Product.id.in_(target))
+            .values(**values, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            publish(self.db, "catalog")
+        self.db.commit()
+        return result.rowcount
+    
+    def bulk_soft_delete(self, filters: Dict[str, Any]) -> int:
+        """Снять с продажи множество товаров одним UPDATE"""
+        return self.bulk_update(filters, {"is_active": False}, "deactivated")
+    
+    @read_only
+    def get_related_ids(self, product_id: int, limit: int = 12) -> List[int]:
+        """ID предрасчитанных похожих товаров (только активные), по убыванию сходства"""
+        return self.db.execute(
+            select(RelatedProduct.related_id)
+            .join(Product, Product.id == RelatedProduct.related_id)
+            .where(and_(RelatedProduct.product_id == product_id, Product.is_active == True))
+            .order_by(RelatedProduct.rank)
+            .limit(limit)
+        ).scalars().all()
+    
+    @read_only
     def get_by_slug(self, slug: str) -> Optional[Product]:
         """Получить товар по slug"""
         return self.db.query(Product).filter(Product.slug == slug).first()
     
+    @read_only
     def get_by_sku(self, sku: str) -> Optional[Product]:
         """Получить товар по SKU"""
         return self.db.query(Product).filter(Product.sku == sku).first()
     
+    @read_only
     def get_by_category(self, category_id: int, skip: int = 0, limit: int = 10) -> List[Product]:
         """Получить товары по категории"""
         return self.db.query(Product).filter(
@@ -37,6 +153,7 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
             )
         ).offset(skip).limit(limit).all()
     
+    @read_only
     def get_by_brand(self, brand_id: int, skip: int = 0, limit: int = 10) -> List[Product]:
         """Получить товары по бренду"""
         return self.db.query(Product).filter(
@@ -46,6 +163,7 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
             )
         ).offset(skip).limit(limit).all()
     
+    @read_only
     def get_featured(self, limit: int = 10) -> List[Product]:
         """Получить рекомендуемые товары"""
         return self.db.query(Product).filter(
@@ -55,6 +173,7 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
             )
         ).limit(limit).all()
     
+    @read_only
     def search(self, query: str, skip: int = 0, limit: int = 10) -> List[Product]:
         """Поиск товаров по названию и описанию"""
         search_filter = or_(
@@ -67,6 +186,7 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
             and_(search_filter, Product.is_active == True)
         ).offset(skip).limit(limit).all()
     
+    @read_only
     def filter_products(self, filters: Dict[str, Any], skip: int = 0, limit: int = 10) -> List[Product]:
         """Фильтрация товаров по различным параметрам"""
         query = self.db.query(Product).filter(Product.is_active == True)
@@ -79,6 +199,17 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
         if 'brand_id' in filters:
             query = query.filter(Product.brand_id == filters['brand_id'])
         
+        # Фильтр по магазину
+        if 'shop_id' in filters:
+            query = query.filter(Product.shop_id == filters['shop_id'])
+        
+        # Фильтр по атрибутам (группы ID из resolve_attribute_filters): внутри группы -
+        # любое значение, между группами - все; каждая группа - поиск по индексу attribute_products
+        for attribute_ids in filters.get('attributes') or ():
+            query = query.filter(Product.id.in_(
+                select(attribute_products.c.product_id).where(attribute_products.c.attribute_id.in_(attribute_ids))
+            ))
+        
         # Фильтр по цене
         if 'min_price' in filters:
             query = query.filter(Product.base_price >= filters['min_price'])
@@ -137,6 +268,8 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
             db_product.images = images
         
         self.db.add(db_product)
+        self.db.flush()
+        self.publish_change(db_product, "created")
         self.db.commit()
         self.db.refresh(db_product)
         return db_product
@@ -159,6 +292,7 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
             images = self.db.query(Image).filter(Image.id.in_(obj_in.image_ids)).all()
             db_obj.images = images
         
+        self.publish_change(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
\ No newline at end of file
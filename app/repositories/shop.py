@@ -0,0 +1,26 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.database.models import Shop
+from app.schemas import ShopCreate, ShopUpdate
+from app.database.connection import read_only
+from .base import BaseRepository
+
+class ShopRepository(BaseRepository[Shop, ShopCreate, ShopUpdate]):
+    cache_namespace = "shop"
+    
+    def __init__(self, db: Session):
+        super().__init__(Shop, db)
+    
+    def cache_tags(self, db_obj: Shop) -> List[str]:
+        # Общие списки товаров тоже зависят от магазина (витрина закрыта - ее товары не показываются)
+        return super().cache_tags(db_obj) + ["catalog"]
+    
+    @read_only
+    def get_by_slug(self, slug: str) -> Optional[Shop]:
+        """Получить магазин по slug"""
+        return self.db.query(Shop).filter(Shop.slug == slug).first()
+    
+    @read_only
+    def get_active(self, skip: int = 0, limit: int = 10) -> List[Shop]:
+        """Активные магазины по названию"""
+        return self.db.query(Shop).filter(Shop.is_active == True).order_by(Shop.name).offset(skip).limit(limit).all()
@@ -3,16 +3,19 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from app.database.models import Tag, Product
 from app.schemas import TagCreate, TagUpdate
+from app.database.connection import read_only
 from .base import BaseRepository
 
 class TagRepository(BaseRepository[Tag, TagCreate, TagUpdate]):
     def __init__(self, db: Session):
         super().__init__(Tag, db)
     
+    @read_only
     def get_by_slug(self, slug: str) -> Optional[Tag]:
         """Получить тег по slug"""
         return self.db.query(Tag).filter(Tag.slug == slug).first()
     
+    @read_only
     def get_popular_tags(self, limit: int = 20) -> List[Tag]:
         """Получить популярные теги (с наибольшим количеством товаров)"""
         return self.db.query(Tag).join(Tag.products).filter(
@@ -21,6 +24,7 @@ class TagRepository(BaseRepository[Tag, TagCreate, TagUpdate]):
             func.count(Product.id).desc()
         ).limit(limit).all()
     
+    @read_only
     def search_by_name(self, name: str) -> List[Tag]:
         """Поиск тегов по имени"""
         return self.db.query(Tag).filter(
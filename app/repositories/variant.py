@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Set
+from slugify import slugify
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import and_, delete, insert, or_, select
+from app.core.variants import build_summary, is_color
+from app.database.models import (
+    Attribute, AttributeType, ProductVariant, ProductVariantSummary,
+    VariantCombination, VariantCombinationAttribute, attribute_products
+)
+from app.schemas import VariantCombinationCreate, VariantCombinationUpdate
+from app.database.connection import read_only
+from .base import BaseRepository
+
+_CHUNK = 1000
+
+
+class VariantRepository(BaseRepository[VariantCombination, VariantCombinationCreate, VariantCombinationUpdate]):
+    def __init__(self, db: Session):
+        super().__init__(VariantCombination, db)
+
+    @read_only
+    def load_for_products(self, product_ids: List[int]) -> Dict[int, List[VariantCombination]]:
+        """Варианты с атрибутами и их типами для набора товаров - одним запросом"""
+        grouped: Dict[int, List[VariantCombination]] = {product_id: [] for product_id in product_ids}
+        for start in range(0, len(product_ids), _CHUNK):
+            combinations = self.db.execute(
+                select(VariantCombination)
+                .join(VariantCombination.attributes)
+                .join(VariantCombinationAttribute.attribute)
+                .join(Attribute.attribute_type)
+                .options(
+                    contains_eager(VariantCombination.attributes)
+                    .contains_eager(VariantCombinationAttribute.attribute)
+                    .contains_eager(Attribute.attribute_type)
+                )
+                .where(VariantCombination.product_id.in_(product_ids[start:start + _CHUNK]))
+                .order_by(VariantCombination.product_id, VariantCombination.id, AttributeType.id)
+                # Варианты, уже загруженные в сессию, перечитываются вместе с атрибутами
+                .execution_options(populate_existing=True)
+            ).unique().scalars().all()
+            for combination in combinations:
+                grouped[combination.product_id].append(combination)
+        return grouped
+
+    @read_only
+    def get_for_product(self, product_id: int) -> List[VariantCombination]:
+        """Варианты товара с атрибутами"""
+        return self.load_for_products([product_id])[product_id]
+
+    def get_combination(self, product_id: int, id: int) -> Optional[VariantCombination]:
+        """Вариант товара по ID"""
+        return self.db.query(VariantCombination).filter(
+            and_(VariantCombination.id == id, VariantCombination.product_id == product_id)
+        ).first()
+
+    def existing_hashes(self, product_id: int) -> Set[str]:
+        """Ключи уже существующих сочетаний товара"""
+        return set(self.db.execute(
+            select(VariantCombination.attribute_set_hash).where(VariantCombination.product_id == product_id)
+        ).scalars())
+
+    def add_combinations(self, combinations: List[VariantCombination]) -> None:
+        """Добавить варианты с атрибутами (вставка пачками, без commit)"""
+        self.db.add_all(combinations)
+        self.db.flush()
+
+    @read_only
+    def get_attribute_type_slugs(self) -> List[str]:
+        """Slug всех типов атрибутов"""
+        return self.db.execute(select(AttributeType.slug).order_by(AttributeType.slug)).scalars().all()
+
+    @read_only
+    def resolve_attribute_filters(self, values: Dict[str, List[str]]) -> List[List[int]]:
+        """Фильтры вида {slug типа: [значения]} -> группы ID атрибутов (одна группа на тип).
+
+        Значение совпадает по value или slug атрибута; ключи, которые не
+        являются типами атрибутов, пропускаются. Тип без совпавших значений
+        дает пустую группу - под фильтр не попадает ни один товар.
+        """
+        wanted = {type_slug: set(items) | {slugify(item) for item in items} for type_slug, items in values.items() if items}
+        if not wanted:
+            return []
+        names = set().union(*wanted.values())
+        rows = self.db.execute(
+            select(AttributeType.slug, Attribute.id, Attribute.value, Attribute.slug)
+            .outerjoin(Attribute, and_(
+                Attribute.attribute_type_id == AttributeType.id,
+                or_(Attribute.value.in_(names), Attribute.slug.in_(names)),
+            ))
+            .where(AttributeType.slug.in_(wanted))
+        ).all()
+
+        groups: Dict[str, Set[int]] = {}
+        for type_slug, attribute_id, value, slug in rows:
+            group = groups.setdefault(type_slug, set())
+            # Значение другого фильтра могло совпасть с атрибутом этого типа
+            if attribute_id is not None and (value in wanted[type_slug] or slug in wanted[type_slug]):
+                group.add(attribute_id)
+        # Стабильный порядок - для ключей кэша и объединения запросов
+        return [sorted(groups[type_slug]) for type_slug in sorted(groups)]
+
+    def _legacy_attributes(self, product_ids: List[int]) -> Dict[int, List[Attribute]]:
+        """Значения активных одноатрибутных вариантов (product_variants)"""
+        attributes: Dict[int, List[Attribute]] = {}
+        for start in range(0, len(product_ids), _CHUNK):
+            rows = self.db.execute(
+                select(ProductVariant.product_id, Attribute)
+                .join(Attribute, Attribute.id == ProductVariant.attribute_id)
+                .options(contains_eager(Attribute.attribute_type))
+                .join(AttributeType, AttributeType.id == Attribute.attribute_type_id)
+                .where(and_(
+                    ProductVariant.product_id.in_(product_ids[start:start + _CHUNK]),
+                    ProductVariant.is_active == True,
+                ))
+                .order_by(ProductVariant.product_id, ProductVariant.id)
+            ).all()
+            for product_id, attribute in rows:
+                attributes.setdefault(product_id, []).append(attribute)
+        return attributes
+
+    def refresh_summaries(self, product_ids: List[int]) -> None:
+        """Пересчитать сводки вариантов и индекс фильтров товаров (в текущей транзакции)"""
+        if not product_ids:
+            return
+        combinations = self.load_for_products(product_ids)
+        legacy = self._legacy_attributes(product_ids)
+        rows, index_rows = [], []
+        for product_id in product_ids:
+            legacy_colors = [a.value for a in legacy.get(product_id, ()) if is_color(a.attribute_type)]
+            rows.append({"product_id": product_id, **build_summary(combinations[product_id], legacy_colors)})
+            attribute_ids = {a.id for a in legacy.get(product_id, ())}
+            attribute_ids.update(
+                item.attribute_id for combination in combinations[product_id] if combination.is_active
+                for item in combination.attributes
+            )
+            index_rows += [{"attribute_id": attribute_id, "product_id": product_id} for attribute_id in attribute_ids]
+
+        for start in range(0, len(product_ids), _CHUNK):
+            chunk = product_ids[start:start + _CHUNK]
+            self.db.execute(delete(ProductVariantSummary).where(ProductVariantSummary.product_id.in_(chunk)))
+            self.db.execute(delete(attribute_products).where(attribute_products.c.product_id.in_(chunk)))
+        self.db.execute(insert(ProductVariantSummary), rows)
+        if index_rows:
+            self.db.execute(insert(attribute_products), index_rows)
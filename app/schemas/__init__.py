@@ -2,12 +2,19 @@ from .category import CategoryCreate, CategoryUpdate, CategoryResponse
 from .brand import BrandCreate, BrandUpdate, BrandResponse
 from .product import (
     ProductCreate, ProductUpdate, ProductResponse, ProductListResponse,
+    ProductBulkFilter, ProductBulkValues, ProductBulkUpdate, ProductBulkResult,
     TagCreate, TagUpdate, TagResponse,
     ShopCreate, ShopUpdate, ShopResponse,
-    ImageCreate, ImageUpdate, ImageResponse,
+    ImageCreate, ImageUpdate, ImageResponse, UploadedImageResponse,
     AttributeTypeCreate, AttributeTypeResponse,
     AttributeCreate, AttributeResponse,
-    ProductVariantCreate, ProductVariantResponse
+    ProductVariantCreate, ProductVariantResponse,
+    VariantCombinationCreate, VariantMatrixCreate, VariantCombinationUpdate,
+    VariantCombinationResponse, VariantSummaryResponse
+)
+from .pricing import (
+    PriceRule, PriceScheduleStatus,
+    PriceScheduleCreate, PriceScheduleResponse, PriceHistoryResponse
 )
 from .common import PaginationParams, PaginatedResponse, BaseSchema, StockState
 
@@ -18,17 +25,23 @@ __all__ = [
     "BrandCreate", "BrandUpdate", "BrandResponse",
     # Product schemas
     "ProductCreate", "ProductUpdate", "ProductResponse", "ProductListResponse",
+    "ProductBulkFilter", "ProductBulkValues", "ProductBulkUpdate", "ProductBulkResult",
     # Tag schemas
     "TagCreate", "TagUpdate", "TagResponse",
     # Shop schemas
     "ShopCreate", "ShopUpdate", "ShopResponse",
     # Image schemas
-    "ImageCreate", "ImageUpdate", "ImageResponse",
+    "ImageCreate", "ImageUpdate", "ImageResponse", "UploadedImageResponse",
     # Attribute schemas
     "AttributeTypeCreate", "AttributeTypeResponse",
     "AttributeCreate", "AttributeResponse",
     # Variant schemas
     "ProductVariantCreate", "ProductVariantResponse",
+    "VariantCombinationCreate", "VariantMatrixCreate", "VariantCombinationUpdate",
+    "VariantCombinationResponse", "VariantSummaryResponse",
+    # Pricing schemas
+    "PriceRule", "PriceScheduleStatus",
+    "PriceScheduleCreate", "PriceScheduleResponse", "PriceHistoryResponse",
     # Common schemas
     "PaginationParams", "PaginatedResponse", "BaseSchema", "StockState"
 ]
\ No newline at end of file
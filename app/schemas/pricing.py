@@ -0,0 +1,83 @@
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
+from datetime import datetime, timezone
+from enum import Enum
+from app.core.money import Money
+from .common import BaseSchema
+
+class PriceRule(str, Enum):
+    PERCENT_OFF = "percent_off"
+    AMOUNT_OFF = "amount_off"
+    FIXED_PRICE = "fixed_price"
+
+class PriceScheduleStatus(str, Enum):
+    SCHEDULED = "scheduled"
+    ACTIVE = "active"
+    FINISHED = "finished"
+    CANCELLED = "cancelled"
+
+# PriceSchedule schemas
+class PriceScheduleBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    rule: PriceRule
+    percent: Optional[int] = Field(None, ge=1, le=99)
+    amount: Optional[Money] = Field(None, gt=0)
+    category_id: Optional[int] = None
+    brand_id: Optional[int] = None
+    tag_id: Optional[int] = None
+    product_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    starts_at: datetime
+    ends_at: Optional[datetime] = None
+
+class PriceScheduleCreate(PriceScheduleBase):
+    @validator('starts_at', 'ends_at')
+    def to_utc(cls, v):
+        # Время без часового пояса считается временем в UTC
+        if v is None:
+            return v
+        return v.replace(tzinfo=timezone.utc) if v.tzinfo is None else v.astimezone(timezone.utc)
+
+    @validator('ends_at')
+    def check_period(cls, v, values):
+        starts_at = values.get('starts_at')
+        if v is not None and starts_at is not None and v <= starts_at:
+            raise ValueError("ends_at должен быть позже starts_at")
+        return v
+
+    @validator('product_ids', always=True)
+    def check_target(cls, v, values):
+        if v is None and all(values.get(field) is None for field in ('category_id', 'brand_id', 'tag_id')):
+            raise ValueError("Нужно указать товары: product_ids, category_id, brand_id или tag_id")
+        return v
+
+    @validator('amount', always=True)
+    def check_rule_value(cls, v, values):
+        rule = values.get('rule')
+        if rule == PriceRule.PERCENT_OFF:
+            if values.get('percent') is None:
+                raise ValueError("Для percent_off нужен percent")
+            if v is not None:
+                raise ValueError("Для percent_off amount не указывается")
+        elif rule is not None and v is None:
+            raise ValueError(f"Для {rule.value} нужен amount")
+        return v
+
+class PriceScheduleResponse(PriceScheduleBase, BaseSchema):
+    id: int
+    status: PriceScheduleStatus
+    affected_count: int = 0
+    activated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+
+# PriceHistory schemas
+class PriceHistoryResponse(BaseSchema):
+    id: int
+    product_id: int
+    schedule_id: Optional[int] = None
+    kind: str
+    previous_base_price: Optional[Money] = None
+    previous_old_price: Optional[Money] = None
+    base_price: Optional[Money] = None
+    old_price: Optional[Money] = None
+    changed_at: datetime
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, model_validator, validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from app.core.money import Money, discount_percentage, format_money
 from .common import BaseSchema, StockState
 from .category import CategoryResponse
 from .brand import BrandResponse
@@ -68,8 +69,15 @@ class ImageUpdate(BaseModel):
 
 class ImageResponse(ImageBase, BaseSchema):
     id: int
+    content_hash: Optional[str] = None
+    content_type: Optional[str] = None
+    file_size: Optional[int] = None
     created_at: datetime
 
+class UploadedImageResponse(ImageResponse):
+    # URL превью по именам размеров (пока превью нет, по ним отдается оригинал)
+    variants: Dict[str, str] = {}
+
 # AttributeType schemas
 class AttributeTypeBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=50)
@@ -105,7 +113,7 @@ class AttributeResponse(AttributeBase, BaseSchema):
 # ProductVariant schemas
 class ProductVariantBase(BaseModel):
     attribute_id: int
-    price_modifier: float = 0.0
+    price_modifier: Money = 0
     stock_quantity: int = 0
     sku_suffix: Optional[str] = Field(None, max_length=20)
     is_active: bool = True
@@ -119,6 +127,68 @@ class ProductVariantResponse(ProductVariantBase, BaseSchema):
     created_at: datetime
     attribute: AttributeResponse
 
+# Variant combination schemas
+class VariantCombinationBase(BaseModel):
+    sku: Optional[str] = Field(None, min_length=1, max_length=80)
+    price_modifier: Money = 0
+    stock_quantity: int = Field(default=0, ge=0)
+    is_active: bool = True
+
+class VariantCombinationCreate(VariantCombinationBase):
+    # По одному значению каждого типа атрибута (Цвет, Размер, Память)
+    attribute_ids: List[int] = Field(..., min_length=1, max_length=10)
+    
+    @validator('attribute_ids')
+    def check_unique_attributes(cls, v):
+        if len(set(v)) != len(v):
+            raise ValueError("Атрибуты в сочетании не должны повторяться")
+        return v
+
+class VariantMatrixCreate(BaseModel):
+    """Все сочетания значений: [[цвета], [размеры], ...] - декартово произведение списков"""
+    attribute_ids: List[List[int]] = Field(..., min_length=1, max_length=10)
+    price_modifier: Money = 0
+    stock_quantity: int = Field(default=0, ge=0)
+    is_active: bool = True
+    
+    @validator('attribute_ids')
+    def check_matrix_size(cls, v):
+        size = 1
+        for values in v:
+            if not values or len(set(values)) != len(values):
+                raise ValueError("Каждый список значений должен быть непустым и без повторов")
+            size *= len(values)
+        if size > 1000:
+            raise ValueError("Не больше 1000 сочетаний за запрос")
+        return v
+
+class VariantCombinationUpdate(BaseModel):
+    sku: Optional[str] = Field(None, min_length=1, max_length=80)
+    price_modifier: Optional[Money] = None
+    stock_quantity: Optional[int] = Field(None, ge=0)
+    is_active: Optional[bool] = None
+
+class VariantCombinationAttributeResponse(BaseSchema):
+    attribute_type_id: int
+    attribute_id: int
+    attribute: AttributeResponse
+
+class VariantCombinationResponse(VariantCombinationBase, BaseSchema):
+    id: int
+    product_id: int
+    attribute_set_hash: str
+    created_at: datetime
+    updated_at: datetime
+    attributes: List[VariantCombinationAttributeResponse] = []
+
+class VariantSummaryResponse(BaseSchema):
+    colors: List[str] = []
+    options: Dict[str, List[str]] = {}
+    variants_count: int = 0
+    min_price_modifier: Optional[Money] = None
+    max_price_modifier: Optional[Money] = None
+    total_stock: int = 0
+
 # Product schemas
 class ProductBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -126,8 +196,8 @@ class ProductBase(BaseModel):
     description: Optional[str] = None
     short_description: Optional[str] = None
     sku: Optional[str] = Field(None)
-    base_price: float = Field(..., gt=0)
-    old_price: Optional[float] = Field(None, gt=0)
+    base_price: Money = Field(..., gt=0)
+    old_price: Optional[Money] = Field(None, gt=0)
     stock_state: StockState = StockState.AVAILABLE
     total_stock: int = Field(default=0, ge=0)
     min_order_quantity: int = Field(default=1, ge=1)
@@ -168,8 +238,8 @@ class ProductUpdate(BaseModel):
     description: Optional[str] = None
     short_description: Optional[str] = None
     sku: Optional[str] = Field(None)
-    base_price: Optional[float] = Field(None, gt=0)
-    old_price: Optional[float] = Field(None, gt=0)
+    base_price: Optional[Money] = Field(None, gt=0)
+    old_price: Optional[Money] = Field(None, gt=0)
     stock_state: Optional[StockState] = None
     total_stock: Optional[int] = Field(None, ge=0)
     min_order_quantity: Optional[int] = Field(None, ge=1)
@@ -203,11 +273,12 @@ class ProductResponse(ProductBase, BaseSchema):
     tags: List[TagResponse] = []
     images: List[ImageResponse] = []
     variants: List[ProductVariantResponse] = []
+    variant_summary: Optional[VariantSummaryResponse] = None
     
     rating: str = "0.0"
     reviewCount: str = "0"
     shop_name: str = "L&M Zone"
-    price: float = 0.0
+    price: Money = 0
     old_price_formatted: str = ""  
     new_price_formatted: str = ""  
     image: str = "" 
@@ -219,7 +290,7 @@ class ProductResponse(ProductBase, BaseSchema):
     
     review_count: int = 0
     discount_percentage: Optional[float] = None
-    new_price: float = 0.0
+    new_price: Money = 0
     
     @validator('price', always=True)
     def set_price_from_base_price(cls, v, values):
@@ -231,27 +302,56 @@ class ProductResponse(ProductBase, BaseSchema):
     
     @validator('discount_percentage', always=True)
     def calculate_discount(cls, v, values):
-        old_price = values.get('old_price')
-        base_price = values.get('base_price')
-        if old_price and base_price and old_price > base_price:
-            return round(((old_price - base_price) / old_price) * 100, 1)
-        return None
+        return discount_percentage(values.get('old_price'), values.get('base_price')) or None
     
     @validator('old_price_formatted', always=True)
     def format_old_price(cls, v, values):
         old_price = values.get('old_price')
-        return f"{old_price}$" if old_price else ""
+        return f"{format_money(old_price)}$" if old_price else ""
     
     @validator('new_price_formatted', always=True)
     def format_new_price(cls, v, values):
-        base_price = values.get('base_price', 0)
-        return f"{base_price}$"
+        base_price = values.get('base_price') or 0
+        return f"{format_money(base_price)}$"
     
     @validator('discount', always=True)
     def format_discount(cls, v, values):
         discount_percentage = values.get('discount_percentage')
         return f"{int(discount_percentage)}%OFF" if discount_percentage else ""
 
+# Bulk operations
+class ProductBulkFilter(BaseModel):
+    """Набор товаров для массовой операции: список ID и/или условия (через AND)"""
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    category_id: Optional[int] = None
+    brand_id: Optional[int] = None
+    tag_id: Optional[int] = None
+    shop_id: Optional[int] = None
+    is_active: Optional[bool] = None
+    
+    @model_validator(mode="after")
+    def check_target(self):
+        # Без условий операция затронула бы весь каталог
+        if all(getattr(self, field) is None for field in ('ids', 'category_id', 'brand_id', 'tag_id', 'shop_id')):
+            raise ValueError("Нужно указать ids или хотя бы одно из category_id, brand_id, tag_id, shop_id")
+        return self
+
+class ProductBulkValues(BaseModel):
+    """Поля, которые можно менять массово (цены - через расписания цен)"""
+    is_active: Optional[bool] = None
+    is_featured: Optional[bool] = None
+    stock_state: Optional[StockState] = None
+    category_id: Optional[int] = None
+    brand_id: Optional[int] = None
+    shop_id: Optional[int] = None
+
+class ProductBulkUpdate(BaseModel):
+    filter: ProductBulkFilter
+    values: ProductBulkValues
+
+class ProductBulkResult(BaseModel):
+    affected: int
+
 # Simplified product response for listings
 class ProductListResponse(BaseSchema):
     id: int
@@ -261,7 +361,7 @@ class ProductListResponse(BaseSchema):
     reviewCount: str = "0"
     title: str
     shop_name: str = "L&M Zone"
-    price: float
+    price: Money
     old_price: str = ""
     new_price: str = ""
     image: str = ""
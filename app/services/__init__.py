@@ -2,10 +2,18 @@ from .base import BaseService
 from .category_service import CategoryService
 from .brand_service import BrandService
 from .product_service import ProductService
+from .pricing_service import PricingService
+from .image_service import ImageService
+from .variant_service import VariantService
+from .shop_service import ShopService
 
 __all__ = [
     "BaseService",
     "CategoryService",
     "BrandService", 
-    "ProductService"
+    "ProductService",
+    "PricingService",
+    "ImageService",
+    "VariantService",
+    "ShopService"
 ]
\ No newline at end of file
@@ -1,9 +1,10 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from slugify import slugify
+from app.cache import cached
 from app.database.models import Brand
 from app.repositories.brand import BrandRepository
-from app.schemas import BrandCreate, BrandUpdate
+from app.schemas import BrandCreate, BrandUpdate, BrandResponse
 from .base import BaseService
 
 class BrandService(BaseService[Brand, BrandCreate, BrandUpdate, BrandRepository]):
@@ -66,6 +67,11 @@ class BrandService(BaseService[Brand, BrandCreate, BrandUpdate, BrandRepository]
         """Получить бренд по slug"""
         return self.repository.get_by_slug(slug)
     
+    @cached("brand:slug:{slug}", tags=("brand:{result.id}",), schema=BrandResponse)
+    def get_response_by_slug(self, slug: str) -> Optional[BrandResponse]:
+        """Бренд по slug в виде схемы ответа (кэшируется)"""
+        return self.repository.get_by_slug(slug)
+    
     def search_by_name(self, name: str) -> List[Brand]:
         """Поиск брендов по имени"""
         return self.repository.search_by_name(name)
@@ -74,6 +80,10 @@ class BrandService(BaseService[Brand, BrandCreate, BrandUpdate, BrandRepository]
         """Получить популярные бренды"""
         return self.repository.get_popular_brands(limit)
     
+    def soft_delete(self, id: int) -> bool:
+        """Мягкое удаление бренда"""
+        return super().soft_delete(id)
+    
     def delete(self, id: int) -> bool:
         """Удалить бренд с проверкой зависимостей"""
         brand = self.repository.get_by_id(id)
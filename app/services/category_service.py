@@ -1,9 +1,10 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from slugify import slugify
+from app.cache import cached
 from app.database.models import Category
 from app.repositories.category import CategoryRepository
-from app.schemas import CategoryCreate, CategoryUpdate
+from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse
 from .base import BaseService
 
 class CategoryService(BaseService[Category, CategoryCreate, CategoryUpdate, CategoryRepository]):
@@ -51,6 +52,7 @@ class CategoryService(BaseService[Category, CategoryCreate, CategoryUpdate, Cate
         
         return True
     
+    # Кэшированные категории содержат дочерние, поэтому любое изменение сбрасывает общий тег
     def create(self, obj_in: CategoryCreate) -> Category:
         """Создать категорию с валидацией"""
         # Автоматически генерируем slug если не задан
@@ -82,6 +84,11 @@ class CategoryService(BaseService[Category, CategoryCreate, CategoryUpdate, Cate
         """Получить категорию по slug"""
         return self.repository.get_by_slug(slug)
     
+    @cached("category:slug:{slug}", tags=("category",), schema=CategoryResponse)
+    def get_response_by_slug(self, slug: str) -> Optional[CategoryResponse]:
+        """Категория по slug в виде схемы ответа (кэшируется)"""
+        return self.repository.get_by_slug(slug)
+    
     def get_root_categories(self) -> List[Category]:
         """Получить корневые категории"""
         return self.repository.get_root_categories()
@@ -98,6 +105,10 @@ class CategoryService(BaseService[Category, CategoryCreate, CategoryUpdate, Cate
         """Поиск категорий по имени"""
         return self.repository.search_by_name(name)
     
+    def soft_delete(self, id: int) -> bool:
+        """Мягкое удаление категории"""
+        return super().soft_delete(id)
+    
     def delete(self, id: int) -> bool:
         """Удалить категорию с проверкой зависимостей"""
         category = self.repository.get_by_id(id)
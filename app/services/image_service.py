@@ -0,0 +1,40 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.database.models import Image
+from app.media import ORIGINAL, UploadedFile, media_url, store_original, thumbnails
+from app.repositories.image import ImageRepository
+from app.schemas import ImageCreate, ImageUpdate
+from .base import BaseService
+
+class ImageService(BaseService[Image, ImageCreate, ImageUpdate, ImageRepository]):
+    """Загруженные изображения: хранение по хэшу содержимого и превью"""
+    
+    def __init__(self, db: Session):
+        repository = ImageRepository(db)
+        super().__init__(repository)
+        self.db = db
+    
+    def validate_create(self, obj_in: ImageCreate) -> bool:
+        return True
+    
+    def validate_update(self, id: int, obj_in: ImageUpdate) -> bool:
+        return True
+    
+    def save_uploads(self, files: List[UploadedFile], alt_text: Optional[str] = None) -> List[Image]:
+        """Перенести загруженные файлы в хранилище и записать изображения; повторный файл не дублируется"""
+        images = []
+        for file in files:
+            store_original(file.path, file.content_hash, file.ext)
+            images.append(self.repository.get_or_create_upload(
+                content_hash=file.content_hash,
+                url=media_url(ORIGINAL, file.content_hash, file.ext),
+                content_type=file.content_type,
+                file_size=file.size,
+                alt_text=alt_text or file.filename,
+            ))
+        self.db.commit()
+        
+        # Превью создаются в пуле процессов, ответ их не ждет
+        for file in files:
+            thumbnails.submit(file.content_hash, file.ext)
+        return images
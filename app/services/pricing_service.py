@@ -0,0 +1,118 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.cache import publish
+from app.database.models import PriceHistory, PriceSchedule, Tag
+from app.database.types import utcnow
+from app.repositories.pricing import PriceScheduleRepository
+from app.repositories.category import CategoryRepository
+from app.repositories.brand import BrandRepository
+from app.schemas import PriceScheduleCreate
+from .base import BaseService
+
+class PricingService(BaseService[PriceSchedule, PriceScheduleCreate, PriceScheduleCreate, PriceScheduleRepository]):
+    """Расписания цен: активация и откат одним set-based UPDATE на расписание"""
+    
+    def __init__(self, db: Session):
+        repository = PriceScheduleRepository(db)
+        super().__init__(repository)
+        self.db = db
+        self.category_repo = CategoryRepository(db)
+        self.brand_repo = BrandRepository(db)
+    
+    def validate_create(self, obj_in: PriceScheduleCreate) -> bool:
+        """Валидация перед созданием расписания"""
+        if obj_in.category_id and not self.category_repo.get_by_id(obj_in.category_id):
+            raise ValueError(f"Категория с ID {obj_in.category_id} не найдена")
+        
+        if obj_in.brand_id and not self.brand_repo.get_by_id(obj_in.brand_id):
+            raise ValueError(f"Бренд с ID {obj_in.brand_id} не найден")
+        
+        if obj_in.tag_id and not self.db.get(Tag, obj_in.tag_id):
+            raise ValueError(f"Тег с ID {obj_in.tag_id} не найден")
+        
+        if obj_in.rule.value == 'percent_off' and not 1 <= (obj_in.percent or 0) <= 99:
+            raise ValueError("Скидка в процентах должна быть от 1 до 99")
+        
+        if obj_in.ends_at and obj_in.ends_at <= utcnow():
+            raise ValueError("Расписание уже закончилось")
+        
+        return True
+    
+    def validate_update(self, id: int, obj_in: PriceScheduleCreate) -> bool:
+        """Расписания не редактируются: отменяются и создаются заново"""
+        raise ValueError("Расписание нельзя изменить, только отменить")
+    
+    def create(self, obj_in: PriceScheduleCreate) -> PriceSchedule:
+        """Создать расписание; если время начала уже наступило - сразу применить"""
+        self.validate_create(obj_in)
+        
+        schedule = PriceSchedule(**{**obj_in.dict(), 'rule': obj_in.rule.value})
+        self.db.add(schedule)
+        self.db.commit()
+        self.db.refresh(schedule)
+        
+        if schedule.starts_at <= utcnow():
+            self.activate(schedule.id)
+            self.db.refresh(schedule)
+        return schedule
+    
+    def get_all(self, skip: int = 0, limit: int = 10, active_only: bool = False) -> List[PriceSchedule]:
+        """Получить расписания (active_only - только запланированные и действующие)"""
+        return self.repository.get_all(skip=skip, limit=limit, active_only=active_only)
+    
+    def activate(self, id: int) -> bool:
+        """Применить расписание (ровно один раз среди всех воркеров)"""
+        if not self.repository.claim(id, 'scheduled', 'active'):
+            self.db.rollback()
+            return False
+        
+        schedule = self.repository.get_by_id(id)
+        now = utcnow()
+        schedule.affected_count = self.repository.apply(schedule, now)
+        schedule.activated_at = now
+        # Один тег на всю пачку вместо тега на каждый товар
+        publish(self.db, "catalog")
+        self.db.commit()
+        return True
+    
+    def finish(self, id: int, status: str = 'finished') -> bool:
+        """Завершить активное расписание и вернуть прежние цены"""
+        if not self.repository.claim(id, 'active', status):
+            self.db.rollback()
+            return False
+        
+        schedule = self.repository.get_by_id(id)
+        now = utcnow()
+        self.repository.revert(schedule, now)
+        schedule.finished_at = now
+        publish(self.db, "catalog")
+        self.db.commit()
+        return True
+    
+    def cancel(self, id: int) -> Optional[PriceSchedule]:
+        """Отменить расписание; активное при этом откатывается"""
+        schedule = self.repository.get_by_id(id)
+        if not schedule:
+            return None
+        
+        if schedule.status == 'scheduled' and self.repository.claim(id, 'scheduled', 'cancelled'):
+            self.db.commit()
+        elif not self.finish(id, status='cancelled'):
+            raise ValueError(f"Расписание в статусе '{schedule.status}' нельзя отменить")
+        
+        self.db.refresh(schedule)
+        return schedule
+    
+    def run_due(self) -> int:
+        """Запустить и завершить расписания, время которых наступило; вернуть число переходов"""
+        processed = 0
+        now = utcnow()
+        for schedule_id in [s.id for s in self.repository.get_due_to_start(now)]:
+            processed += self.activate(schedule_id)
+        for schedule_id in [s.id for s in self.repository.get_due_to_finish(now)]:
+            processed += self.finish(schedule_id)
+        return processed
+    
+    def get_history(self, product_id: int, skip: int = 0, limit: int = 50) -> List[PriceHistory]:
+        """История цен товара"""
+        return self.repository.get_history(product_id, skip, limit)
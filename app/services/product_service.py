@@ -1,13 +1,63 @@
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, update
 from slugify import slugify
-from app.database.models import Product
+from app.cache import bus, cache, cached, publish
+from app.config import settings
+from app.core.outbox import ChangeTokenExpired, current_position, pruned_position, read_events
+from app.core.singleflight import PartitionedReads, StaleWhileRevalidate, make_key
+from app.core.snapshot import catalog_snapshot
+from app.database.connection import allow_replica_reads
+from app.database.models import Image, Product, product_images
+from app.repositories.image import ImageRepository
 from app.repositories.product import ProductRepository
 from app.repositories.category import CategoryRepository
 from app.repositories.brand import BrandRepository
-from app.schemas import ProductCreate, ProductUpdate
+from app.repositories.pricing import PriceScheduleRepository
+from app.repositories.shop import ShopRepository
+from app.repositories.variant import VariantRepository
+from app.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductBulkFilter, ProductBulkValues
 from .base import BaseService
+from .serializers import transform_product_for_frontend
+
+# Горячие чтения каталога, общие для всех запросов воркера
+catalog_reads = StaleWhileRevalidate(
+    fresh_ttl=settings.catalog_read_fresh_ttl,
+    stale_ttl=settings.catalog_read_stale_ttl,
+)
+
+# Витрины магазинов (/shops/{slug}/products) - отдельный кэш на магазин
+shop_reads = PartitionedReads(
+    fresh_ttl=settings.catalog_read_fresh_ttl,
+    stale_ttl=settings.catalog_read_stale_ttl,
+)
+
+# Кэш товара со связями: общий для карточки и списков, которые догружают промахи пачкой
+PRODUCT_KEY = "product:{id}:full"
+PRODUCT_TAGS = ("product:{id}", "brand:{result.brand_id}", "shop:{result.shop_id}", "category", "catalog")
+
+def invalidate_listings(shop_ids: Optional[Iterable[Optional[int]]] = None) -> None:
+    """Сбросить списки воркера после изменения товаров; shop_ids - их магазины (None - все)"""
+    catalog_reads.invalidate()
+    shop_reads.invalidate(None if shop_ids is None else [i for i in shop_ids if i is not None])
+
+@bus.subscribe
+def _invalidate_catalog_reads(tags: Optional[List[str]]) -> None:
+    # Списки зависят только от товаров: изменения в других воркерах сбрасывают их здесь
+    if tags is None or "catalog" in tags:
+        invalidate_listings()
+        return
+    if any(tag.startswith("product") for tag in tags):
+        catalog_reads.invalidate()
+    # Товары публикуют тег своего магазина - сбрасываются только витрины этих магазинов
+    shop_ids = [int(tag[5:]) for tag in tags if tag.startswith("shop:") and tag[5:].isdigit()]
+    if shop_ids:
+        shop_reads.invalidate(shop_ids)
+
+@catalog_snapshot.subscribe
+def _invalidate_snapshot_listings(shop_ids: Set[int]) -> None:
+    # Сброс при записи мог опередить снимок: списки, заполненные между ними, устарели
+    invalidate_listings(shop_ids)
 
 class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductRepository]):
     def __init__(self, db: Session):
@@ -16,6 +66,9 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
         self.db = db
         self.category_repo = CategoryRepository(db)
         self.brand_repo = BrandRepository(db)
+        self.shop_repo = ShopRepository(db)
+        self.image_repo = ImageRepository(db)
+        self.variant_repo = VariantRepository(db)
     
     def validate_create(self, obj_in: ProductCreate) -> bool:
         """Валидация перед созданием товара"""
@@ -99,52 +152,53 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
             db_product.tags = tags
         
         if image_ids:
-            from app.database.models import Image
             images = self.db.query(Image).filter(Image.id.in_(image_ids)).all()
             db_product.images = images
         
         self.db.add(db_product)
+        self.db.flush()
+        self.repository.publish_change(db_product, "created")
         self.db.commit()
         self.db.refresh(db_product)
         
         if hasattr(obj_in, 'specifications') and obj_in.specifications:
-            from app.database.models import Image
-            created_images = []
-            
             all_spec_images = []
             for key, images_list in obj_in.specifications.items():
                 if isinstance(images_list, list):
                     all_spec_images.extend(images_list)
             
+            # Новые изображения получают подпись и порядок по первому вхождению URL
+            new_values = {}
             for i, img_url in enumerate(all_spec_images):
-                if img_url:  # Проверяем что URL не пустой
-                    # Проверяем, есть ли уже такое изображение
-                    existing_image = self.db.query(Image).filter(Image.url == img_url).first()
-                    if not existing_image:
-                        image = Image(
-                            url=img_url,
-                            alt_text=f"{db_product.title} - Spec Image {i+1}",
-                            is_primary=(i == 0),  # Первое изображение - основное
-                            sort_order=i+1
-                        )
-                        self.db.add(image)
-                        self.db.commit()
-                        self.db.refresh(image)
-                        created_images.append(image)
-                    else:
-                        # Если изображение уже есть, но это первое - делаем его главным
-                        if i == 0:
-                            existing_image.is_primary = True
-                            self.db.commit()
-                        created_images.append(existing_image)
+                if img_url and img_url not in new_values:
+                    new_values[img_url] = {
+                        'alt_text': f"{db_product.title} - Spec Image {i+1}",
+                        'is_primary': i == 0,  # Первое изображение - основное
+                        'sort_order': i+1
+                    }
             
-            if created_images:
-                existing_images = list(db_product.images) if db_product.images else []
-                db_product.images = existing_images + created_images
+            # Все URL разрешаются одним SELECT и одной пачкой INSERT
+            spec_image_ids = list(self.image_repo.resolve_urls(new_values, new_values).values())
+            if spec_image_ids:
+                if all_spec_images[0]:
+                    # Если первое изображение уже было, делаем его главным
+                    self.db.execute(
+                        update(Image)
+                        .where(and_(Image.id == spec_image_ids[0], Image.is_primary == False))
+                        .values(is_primary=True)
+                    )
+                linked = {image.id for image in db_product.images}
+                links = [
+                    {'product_id': db_product.id, 'image_id': image_id}
+                    for image_id in spec_image_ids if image_id not in linked
+                ]
+                if links:
+                    self.db.execute(insert(product_images), links)
+                self.db.commit()
+                self.db.expire(db_product, ['images'])
         
         if hasattr(obj_in, 'colors') and obj_in.colors:
             from app.database.models import AttributeType, Attribute, ProductVariant
-            from sqlalchemy import and_
             
             color_attr_type = self.db.query(AttributeType).filter(
                 AttributeType.name == "Color"
@@ -157,6 +211,8 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
                     input_type="select"
                 )
                 self.db.add(color_attr_type)
+                # Новый тип атрибута - новый допустимый фильтр списка товаров
+                publish(self.db, "attribute_types")
                 self.db.commit()
                 self.db.refresh(color_attr_type)
             
@@ -188,6 +244,9 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
                 )
                 self.db.add(variant)
             
+            self.db.flush()
+            # Цвета товара в сводке вариантов (для списков)
+            VariantRepository(self.db).refresh_summaries([db_product.id])
             self.db.commit()
         
         if hasattr(obj_in, 'tags_names') and obj_in.tags_names:
@@ -211,8 +270,11 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
                 existing_tags = list(db_product.tags) if db_product.tags else []
                 db_product.tags = existing_tags + created_tags
         
+        # Связи добавлены отдельными коммитами - сообщаем об итоговом состоянии
+        self.repository.publish_change(db_product)
         self.db.commit()
         self.db.refresh(db_product)
+        invalidate_listings([db_product.shop_id])
         
         return db_product
     
@@ -227,7 +289,60 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
         if obj_in.title and not obj_in.slug:
             obj_in.slug = slugify(obj_in.title)
         
-        return self.repository.update_with_relations(db_obj, obj_in)
+        # Ручное изменение цены попадает в историю в той же транзакции
+        prices = obj_in.dict(exclude_unset=True, include={'base_price', 'old_price'})
+        new_prices = {'base_price': db_obj.base_price, 'old_price': db_obj.old_price, **prices}
+        if new_prices['base_price'] != db_obj.base_price or new_prices['old_price'] != db_obj.old_price:
+            PriceScheduleRepository(self.db).record_manual_change(
+                db_obj.id, db_obj.base_price, db_obj.old_price, new_prices['base_price'], new_prices['old_price']
+            )
+        
+        shop_id = db_obj.shop_id
+        product = self.repository.update_with_relations(db_obj, obj_in)
+        invalidate_listings([shop_id, product.shop_id])
+        return product
+    
+    def delete(self, id: int) -> bool:
+        """Удалить товар"""
+        deleted = self.repository.delete(id)
+        if deleted:
+            invalidate_listings()
+        return deleted
+    
+    def soft_delete(self, id: int) -> bool:
+        """Мягкое удаление товара"""
+        deleted = self.repository.soft_delete(id)
+        if deleted:
+            invalidate_listings()
+        return deleted
+    
+    def _validate_bulk_values(self, values: Dict[str, Any]) -> None:
+        if values.get('category_id') and not self.category_repo.get_by_id(values['category_id']):
+            raise ValueError(f"Категория с ID {values['category_id']} не найдена")
+        if values.get('brand_id') and not self.brand_repo.get_by_id(values['brand_id']):
+            raise ValueError(f"Бренд с ID {values['brand_id']} не найден")
+        if values.get('shop_id') and not self.shop_repo.get_by_id(values['shop_id']):
+            raise ValueError(f"Магазин с ID {values['shop_id']} не найден")
+    
+    def bulk_update(self, filters: ProductBulkFilter, values: ProductBulkValues) -> int:
+        """Массово изменить товары по списку ID или условиям"""
+        update_values = values.dict(exclude_none=True)
+        if not update_values:
+            raise ValueError("Не указаны поля для изменения")
+        self._validate_bulk_values(update_values)
+        
+        event_type = "deactivated" if update_values == {"is_active": False} else "updated"
+        affected = self.repository.bulk_update(filters.dict(exclude_none=True), update_values, event_type)
+        if affected:
+            invalidate_listings()
+        return affected
+    
+    def bulk_soft_delete(self, filters: ProductBulkFilter) -> int:
+        """Массово снять товары с продажи"""
+        affected = self.repository.bulk_soft_delete(filters.dict(exclude_none=True))
+        if affected:
+            invalidate_listings()
+        return affected
     
     def get_by_slug(self, slug: str) -> Optional[Product]:
         """Получить товар по slug"""
@@ -241,6 +356,11 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
         """Получить товар со всеми связанными данными"""
         return self.repository.get_by_id_with_relations(id)
     
+    @cached(PRODUCT_KEY, tags=PRODUCT_TAGS, schema=ProductResponse)
+    def get_response_with_relations(self, id: int) -> Optional[ProductResponse]:
+        """Товар со всеми связанными данными в виде схемы ответа (кэшируется)"""
+        return self.repository.get_by_id_with_relations(id)
+    
     def get_by_category(self, category_id: int, skip: int = 0, limit: int = 10) -> List[Product]:
         """Получить товары по категории"""
         return self.repository.get_by_category(category_id, skip, limit)
@@ -261,6 +381,161 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
         """Фильтрация товаров"""
         return self.repository.filter_products(filters, skip, limit)
     
+    def _to_frontend(self, products: List[Product]) -> List[Dict[str, Any]]:
+        """Загрузить связи и преобразовать товары в формат фронтенда"""
+        return self._ids_to_frontend([product.id for product in products])
+    
+    def _ids_to_frontend(self, ids: List[int]) -> List[Dict[str, Any]]:
+        """Товары по списку ID (из кэша строк или БД) в формате фронтенда"""
+        products: Dict[int, ProductResponse] = {}
+        missing = []
+        for product_id in ids:
+            full_product = cache.get(PRODUCT_KEY.format(id=product_id))
+            if full_product is None:
+                missing.append(product_id)
+            else:
+                products[product_id] = full_product
+        
+        if missing:
+            # Промахи страницы - одним запросом; кэш наполняется только из основной БД
+            with allow_replica_reads(False):
+                loaded = self.repository.get_many_with_relations(missing)
+            for product in loaded:
+                full_product = ProductResponse.model_validate(product)
+                cache.set(
+                    PRODUCT_KEY.format(id=product.id),
+                    full_product,
+                    tags=[tag.format(id=product.id, result=full_product) for tag in PRODUCT_TAGS],
+                )
+                products[product.id] = full_product
+        
+        return [
+            transform_product_for_frontend(products[product_id], include_colors=False)
+            for product_id in ids if product_id in products
+        ]
+    
+    def get_related_for_frontend(self, id: int, limit: int = 12) -> Optional[List[Dict[str, Any]]]:
+        """Похожие товары в формате фронтенда; None - товар не найден"""
+        product = self.repository.get_by_id(id)
+        if not product:
+            return None
+        
+        ids = self.repository.get_related_ids(id, limit)
+        if not ids and product.category_id:
+            # Соседи еще не рассчитаны (новый товар или товар без тегов) - товары той же категории
+            ids = [p.id for p in self.repository.get_by_category(product.category_id, 0, limit + 1) if p.id != id][:limit]
+        return self._ids_to_frontend(ids)
+    
+    def _coalesced(self, key: str, loader, shop_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Выполнить чтение через общий для воркера single-flight кэш (витрины магазинов - через кэш магазина)"""
+        if not settings.catalog_coalescing_enabled:
+            return loader(self.db)
+        reads = catalog_reads if shop_id is None else shop_reads.partition(shop_id)
+        return reads.get(key, loader, self.db)
+    
+    def search_for_frontend(self, query: str, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Поиск товаров в формате фронтенда"""
+        return self._to_frontend(self.search(query, skip, limit))
+    
+    def get_featured_for_frontend(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Рекомендуемые товары в формате фронтенда"""
+        def load(db: Session) -> List[Dict[str, Any]]:
+            service = ProductService(db)
+            ids = catalog_snapshot.query({"is_featured": True}, 0, limit)
+            if ids is not None:
+                return service._ids_to_frontend(ids)
+            return service._to_frontend(service.get_featured(limit))
+        
+        return self._coalesced(make_key("featured", limit=limit), load)
+    
+    @cached("attribute_types:slugs", tags=("attribute_types",))
+    def get_attribute_type_slugs(self) -> List[str]:
+        """Slug типов атрибутов - допустимые фильтры списка товаров (кэшируется)"""
+        return self.variant_repo.get_attribute_type_slugs()
+    
+    def _known_attribute_filters(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Оставить фильтры только по существующим типам атрибутов.
+
+        Остальные параметры запроса (utm_source, cache-buster и т.п.) не
+        фильтруют список и не плодят ключи кэша и объединения запросов.
+        """
+        if not filters.get('attribute_values'):
+            return filters
+        known = set(self.get_attribute_type_slugs())
+        values = {slug: items for slug, items in filters['attribute_values'].items() if slug in known and items}
+        filtered = {k: v for k, v in filters.items() if k != 'attribute_values'}
+        if values:
+            filtered['attribute_values'] = values
+        return filtered
+    
+    def _resolve_attribute_filters(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Значения атрибутов из запроса ({slug типа: [значения]}) -> группы ID атрибутов"""
+        if not filters.get('attribute_values'):
+            return filters
+        resolved = {k: v for k, v in filters.items() if k != 'attribute_values'}
+        resolved['attributes'] = self.variant_repo.resolve_attribute_filters(filters['attribute_values'])
+        return resolved
+    
+    def filter_products_for_frontend(self, filters: Dict[str, Any], skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Фильтрация товаров в формате фронтенда (страницы категорий, брендов, каталога)"""
+        filters = self._known_attribute_filters(filters)
+        
+        def load(db: Session) -> List[Dict[str, Any]]:
+            service = ProductService(db)
+            query = service._resolve_attribute_filters(filters)
+            # Снимок в памяти отдает ID страницы, из БД грузятся только они
+            ids = catalog_snapshot.query(query, skip, limit)
+            if ids is not None:
+                return service._ids_to_frontend(ids)
+            return service._to_frontend(service.filter_products(query, skip, limit))
+        
+        return self._coalesced(make_key("filter_products", skip=skip, limit=limit, **filters), load, filters.get('shop_id'))
+    
+    def get_changes(self, since: Optional[int], limit: int = 100) -> Dict[str, Any]:
+        """Изменения товаров после позиции since в outbox (инкрементальная синхронизация)"""
+        if since is None:
+            # Начальный токен: клиент делает полную выгрузку и дальше читает изменения
+            return {"changes": [], "next_token": current_position(self.db), "has_more": False}
+        
+        if since < pruned_position(self.db):
+            raise ChangeTokenExpired("История изменений для этого токена удалена, нужна полная синхронизация")
+        
+        messages, position = read_events(self.db, since, limit, aggregate="product")
+        
+        # По каждому товару - одно изменение, в порядке последнего события
+        latest = {}
+        created = set()
+        for message in messages:
+            latest.pop(message.aggregate_id, None)
+            latest[message.aggregate_id] = message
+            if message.event_type == "created":
+                created.add(message.aggregate_id)
+        
+        products = {p.id: p for p in self.repository.get_many_with_relations(list(latest))}
+        
+        changes = []
+        for product_id, message in latest.items():
+            product = products.get(product_id)
+            if product is None:
+                change = "deleted"
+            elif not product.is_active:
+                change = "deactivated"
+            else:
+                change = "created" if product_id in created else "updated"
+            
+            changes.append({
+                "id": product_id,
+                "change": change,
+                "position": message.id,
+                "product": transform_product_for_frontend(product) if change in ("created", "updated") else None,
+            })
+        
+        return {
+            "changes": changes,
+            "next_token": position,
+            "has_more": position < current_position(self.db),
+        }
+    
     def update_stock(self, id: int, quantity: int) -> Optional[Product]:
         """Обновить остаток товара"""
         product = self.repository.get_by_id(id)
@@ -275,8 +550,10 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
         else:
             product.stock_state = "Available"
         
+        self.repository.publish_change(product, "stock_changed")
         self.db.commit()
         self.db.refresh(product)
+        invalidate_listings([product.shop_id])
         return product
     
     def decrease_stock(self, id: int, quantity: int) -> Optional[Product]:
@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Union
+
+from app.config import settings
+from app.core.money import discount_percent, format_money
+from app.database.models import Product
+from app.media.storage import image_url
+from app.schemas import ProductResponse
+
+
+def get_product_colors(product: Union[Product, ProductResponse]) -> List[str]:
+    """Получить цвета товара из вариантов"""
+    colors = []
+    for variant in product.variants or []:
+        if (variant.attribute and
+            variant.attribute.attribute_type.name.lower() == 'color'):
+            colors.append(variant.attribute.value)
+    return colors or ["Default"]
+
+
+def transform_product_for_frontend(product: Union[Product, ProductResponse], include_colors: bool = True) -> Dict[str, Any]:
+    """Преобразовать товар в формат фронтенда (формат мок-данных)"""
+    # Получаем основное изображение; для загруженных файлов - превью вместо оригинала
+    image = ""
+    spec_images = []
+    if product.images:
+        for img in product.images:
+            if img.is_primary:
+                image = image_url(img, "card")
+            spec_images.append(image_url(img, "large"))
+        if not image and product.images:
+            image = image_url(product.images[0], "card")
+
+    # Получаем теги
+    tags = [tag.name for tag in product.tags] if product.tags else []
+
+    # Цвета и диапазон цен вариантов - из предрасчитанной сводки; без нее в списках
+    # цвета не загружаем - это отдельный запрос на каждый товар
+    summary = product.variant_summary
+    if summary and summary.colors:
+        colors = list(summary.colors)
+    else:
+        colors = get_product_colors(product) if include_colors else ["Default"]
+    variants = None
+    if summary and summary.variants_count:
+        variants = {
+            "count": summary.variants_count,
+            "min_price": (product.base_price or 0) + summary.min_price_modifier,
+            "max_price": (product.base_price or 0) + summary.max_price_modifier,
+            "total_stock": summary.total_stock,
+            "options": summary.options,
+        }
+
+    # Вычисляем скидку
+    percent = discount_percent(product.old_price, product.base_price)
+    discount = f"{percent}%OFF" if percent else ""
+
+    # Название магазина
+    shop_name = settings.default_shop_name
+    if product.shop:
+        shop_name = product.shop.name
+
+    return {
+        "id": product.id,
+        "stock_state": product.stock_state,
+        "total_stock": product.total_stock,
+        "rating": "3.8",
+        "reviewCount": "0",
+        "title": product.title,
+        "shop_name": shop_name,
+        "price": product.base_price,
+        "old_price": f"{format_money(product.old_price)}$" if product.old_price else "",
+        "new_price": f"{format_money(product.base_price or 0)}$",
+        "image": image,
+        "delivered_by": "Aug 02",
+        "discount": discount,
+        "sku": product.sku,
+        "description": product.description or "",
+        "specifications": {
+            "spec_images": spec_images
+        },
+        "colors": colors,
+        "variants": variants,
+        "tags": tags
+    }
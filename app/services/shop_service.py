@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.cache import cached
+from app.database.models import Shop
+from app.repositories.shop import ShopRepository
+from app.schemas import ShopCreate, ShopUpdate, ShopResponse
+from .base import BaseService
+from .product_service import ProductService, invalidate_listings
+
+class ShopService(BaseService[Shop, ShopCreate, ShopUpdate, ShopRepository]):
+    def __init__(self, db: Session):
+        repository = ShopRepository(db)
+        super().__init__(repository)
+        self.db = db
+
+    def validate_create(self, obj_in: ShopCreate) -> bool:
+        """Валидация перед созданием магазина"""
+        if self.repository.get_by_slug(obj_in.slug):
+            raise ValueError(f"Магазин с slug '{obj_in.slug}' уже существует")
+        return True
+
+    def validate_update(self, id: int, obj_in: ShopUpdate) -> bool:
+        """Валидация перед обновлением магазина"""
+        if obj_in.slug:
+            existing = self.repository.get_by_slug(obj_in.slug)
+            if existing and existing.id != id:
+                raise ValueError(f"Магазин с slug '{obj_in.slug}' уже существует")
+        return True
+
+    def create(self, obj_in: ShopCreate) -> Shop:
+        """Создать магазин с валидацией"""
+        self.validate_create(obj_in)
+        return self.repository.create(obj_in)
+
+    def update(self, id: int, obj_in: ShopUpdate) -> Optional[Shop]:
+        """Обновить магазин с валидацией"""
+        self.validate_update(id, obj_in)
+        shop = super().update(id, obj_in)
+        if shop:
+            # Название и статус магазина есть в карточках общих списков, не только в его витрине
+            invalidate_listings()
+        return shop
+
+    def delete(self, id: int) -> bool:
+        """Удалить магазин"""
+        deleted = self.repository.delete(id)
+        if deleted:
+            invalidate_listings()
+        return deleted
+
+    def soft_delete(self, id: int) -> bool:
+        """Закрыть магазин (is_active = False)"""
+        deactivated = self.repository.soft_delete(id)
+        if deactivated:
+            invalidate_listings()
+        return deactivated
+
+    def get_active(self, skip: int = 0, limit: int = 10) -> List[Shop]:
+        """Активные магазины"""
+        return self.repository.get_active(skip, limit)
+
+    def get_by_slug(self, slug: str) -> Optional[Shop]:
+        """Получить магазин по slug"""
+        return self.repository.get_by_slug(slug)
+
+    @cached("shop:slug:{slug}", tags=("shop:{result.id}",), schema=ShopResponse)
+    def get_response_by_slug(self, slug: str) -> Optional[ShopResponse]:
+        """Магазин по slug в виде схемы ответа (кэшируется)"""
+        return self.repository.get_by_slug(slug)
+
+    def get_products_for_frontend(self, slug: str, filters: Dict[str, Any], skip: int = 0, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Товары витрины магазина в формате фронтенда; None - магазин не найден или закрыт"""
+        shop = self.get_response_by_slug(slug)
+        if not shop or not shop.is_active:
+            return None
+        return ProductService(self.db).filter_products_for_frontend({**filters, 'shop_id': shop.id}, skip, limit)
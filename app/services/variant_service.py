@@ -0,0 +1,148 @@
+import itertools
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.core.variants import attribute_set_hash
+from app.database.models import Attribute, Product, VariantCombination, VariantCombinationAttribute
+from app.repositories.product import ProductRepository
+from app.repositories.variant import VariantRepository
+from app.schemas import VariantCombinationCreate, VariantCombinationUpdate, VariantMatrixCreate
+from .base import BaseService
+from .product_service import invalidate_listings
+
+class VariantService(BaseService[VariantCombination, VariantCombinationCreate, VariantCombinationUpdate, VariantRepository]):
+    """Варианты товара - сочетания атрибутов; сводка товара пересчитывается в той же транзакции"""
+
+    def __init__(self, db: Session):
+        repository = VariantRepository(db)
+        super().__init__(repository)
+        self.db = db
+        self.product_repo = ProductRepository(db)
+
+
+    def _load_attributes(self, attribute_ids) -> Dict[int, Attribute]:
+        """Атрибуты по ID одним запросом; в сочетании - не больше одного значения каждого типа"""
+        ids = set(attribute_ids)
+        attributes = {a.id: a for a in self.db.query(Attribute).filter(Attribute.id.in_(ids)).all()}
+        missing = ids - set(attributes)
+        if missing:
+            raise ValueError(f"Атрибуты не найдены: {', '.join(map(str, sorted(missing)))}")
+        return attributes
+
+    def validate_create(self, obj_in: VariantCombinationCreate) -> bool:
+        attributes = self._load_attributes(obj_in.attribute_ids)
+        types = [attributes[attribute_id].attribute_type_id for attribute_id in obj_in.attribute_ids]
+        if len(set(types)) != len(types):
+            raise ValueError("В сочетании может быть только одно значение каждого типа атрибута")
+        return True
+
+    def validate_update(self, id: int, obj_in: VariantCombinationUpdate) -> bool:
+        return True
+
+    def _build(self, product: Product, attributes: List[Attribute], sku: Optional[str],
+               price_modifier, stock_quantity: int, is_active: bool) -> VariantCombination:
+        if not sku and product.sku:
+            # SKU варианта по умолчанию: SKU товара и slug значений в порядке типов
+            ordered = sorted(attributes, key=lambda a: a.attribute_type_id)
+            sku = "-".join([product.sku] + [a.slug for a in ordered])[:80]
+        return VariantCombination(
+            product_id=product.id,
+            attribute_set_hash=attribute_set_hash(a.id for a in attributes),
+            sku=sku,
+            price_modifier=price_modifier,
+            stock_quantity=stock_quantity,
+            is_active=is_active,
+            attributes=[
+                VariantCombinationAttribute(
+                    attribute_type_id=a.attribute_type_id, attribute_id=a.id, attribute=a, product_id=product.id
+                )
+                for a in attributes
+            ],
+        )
+
+    def _save(self, product: Product, combinations: List[VariantCombination]) -> None:
+        """Сохранить изменения вариантов, пересчитать сводку и разослать изменение товара"""
+        try:
+            if combinations:
+                self.repository.add_combinations(combinations)
+            self.db.flush()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError("Вариант с таким SKU уже существует")
+        self.repository.refresh_summaries([product.id])
+        self.product_repo.publish_change(product, "variants_changed")
+        self.db.commit()
+        invalidate_listings([product.shop_id])
+
+    def _loaded(self, product_id: int, id: int) -> VariantCombination:
+        """Вариант с загруженными атрибутами (для ответа)"""
+        return next(c for c in self.repository.get_for_product(product_id) if c.id == id)
+
+    def get_for_product(self, product_id: int) -> Optional[List[VariantCombination]]:
+        """Варианты товара с атрибутами; None - товар не найден"""
+        if not self.product_repo.get_by_id(product_id):
+            return None
+        return self.repository.get_for_product(product_id)
+
+    def create(self, product_id: int, obj_in: VariantCombinationCreate) -> Optional[VariantCombination]:
+        """Создать вариант товара из набора значений атрибутов; None - товар не найден"""
+        product = self.product_repo.get_by_id(product_id)
+        if not product:
+            return None
+        self.validate_create(obj_in)
+        attributes = self._load_attributes(obj_in.attribute_ids)
+
+        if attribute_set_hash(obj_in.attribute_ids) in self.repository.existing_hashes(product_id):
+            raise ValueError("Вариант с таким набором атрибутов уже существует")
+
+        combination = self._build(
+            product, [attributes[attribute_id] for attribute_id in obj_in.attribute_ids],
+            obj_in.sku, obj_in.price_modifier, obj_in.stock_quantity, obj_in.is_active,
+        )
+        self._save(product, [combination])
+        return self._loaded(product_id, combination.id)
+
+    def create_matrix(self, product_id: int, obj_in: VariantMatrixCreate) -> Optional[List[VariantCombination]]:
+        """Создать недостающие варианты для всех сочетаний значений (декартово произведение)"""
+        product = self.product_repo.get_by_id(product_id)
+        if not product:
+            return None
+        attributes = self._load_attributes(itertools.chain.from_iterable(obj_in.attribute_ids))
+        for values in obj_in.attribute_ids:
+            if len({attributes[attribute_id].attribute_type_id for attribute_id in values}) != 1:
+                raise ValueError("Каждый список должен содержать значения одного типа атрибута")
+        types = [attributes[values[0]].attribute_type_id for values in obj_in.attribute_ids]
+        if len(set(types)) != len(types):
+            raise ValueError("Типы атрибутов в списках не должны повторяться")
+
+        existing = self.repository.existing_hashes(product_id)
+        combinations = []
+        for combination_ids in itertools.product(*obj_in.attribute_ids):
+            if attribute_set_hash(combination_ids) in existing:
+                continue
+            combinations.append(self._build(
+                product, [attributes[attribute_id] for attribute_id in combination_ids],
+                None, obj_in.price_modifier, obj_in.stock_quantity, obj_in.is_active,
+            ))
+        self._save(product, combinations)
+        return self.repository.get_for_product(product_id)
+
+    def update(self, product_id: int, id: int, obj_in: VariantCombinationUpdate) -> Optional[VariantCombination]:
+        """Изменить SKU, надбавку к цене, остаток или активность варианта"""
+        combination = self.repository.get_combination(product_id, id)
+        if not combination:
+            return None
+        for field, value in obj_in.dict(exclude_unset=True).items():
+            setattr(combination, field, value)
+        self._save(combination.product, [])
+        return self._loaded(product_id, id)
+
+    def delete(self, product_id: int, id: int) -> bool:
+        """Удалить вариант товара"""
+        combination = self.repository.get_combination(product_id, id)
+        if not combination:
+            return False
+        product = combination.product
+        self.db.delete(combination)
+        self._save(product, [])
+        return True
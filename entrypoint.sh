@@ -60,4 +60,4 @@ alembic -c alembic.ini upgrade head
 echo "Migrations completed successfully!"
 
 echo "Starting FastAPI application..."
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+exec python -m app.core.servers.gunicorn.run
@@ -0,0 +1,65 @@
+import sys
+import os
+import uuid
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, database
+from app.database.models import Base
+
+
+class QueryCounter:
+    """SQL-запросы движка, выполненные внутри блока with"""
+
+    def __init__(self, engine=None):
+        self.engine = engine or database.engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        return False
+
+    def __len__(self):
+        return len(self.statements)
+
+    def clear(self):
+        self.statements.clear()
+
+    def count(self, fragment: str) -> int:
+        """Число запросов, содержащих фрагмент SQL (например, "FROM products")"""
+        return sum(fragment in statement for statement in self.statements)
+
+
+@pytest.fixture
+def db():
+    """Сессия основной БД; таблицы создаются, если их еще нет"""
+    Base.metadata.create_all(database.engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def suffix():
+    """Уникальный суффикс для slug и SKU: все тесты пишут в одну БД"""
+    return uuid.uuid4().hex[:8]
+
+
+@pytest.fixture
+def count_queries():
+    """Счетчик запросов: with count_queries() as queries: ...; len(queries)"""
+    return QueryCounter
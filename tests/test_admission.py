@@ -0,0 +1,64 @@
+import sys
+import os
+import asyncio
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.admission import ConcurrencyLimiter, classify_request, create_limiters
+
+
+def test_limiter_queue_and_rejection():
+    async def scenario():
+        limiter = ConcurrencyLimiter("read", limit=1, max_queue=1, queue_timeout=0.05)
+
+        assert await limiter.acquire()
+        # Второй запрос ждет в очереди, третий отклоняется сразу
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not await limiter.acquire()
+
+        limiter.release()
+        assert await waiting
+        assert limiter.active == 1
+
+        # Очередь пуста, но слот занят дольше таймаута - отказ
+        assert not await limiter.acquire()
+        limiter.release()
+        assert limiter.active == 0
+        print(f"✅ Статистика лимитера: {limiter.stats()}")
+
+    asyncio.run(scenario())
+
+
+def test_adaptive_limit_shrinks_on_latency():
+    limiter = ConcurrencyLimiter(
+        "write", limit=10, max_queue=0, queue_timeout=0.1, adaptive=True, target_latency=0.1
+    )
+    limiter.active = 10
+    for _ in range(5):
+        limiter.release(latency=1.0)
+        limiter.active += 1
+    print(f"✅ Лимит после роста задержек: {limiter.limit}")
+    assert limiter.limit < 10
+
+
+def test_classify_request():
+    assert classify_request("GET", "/api/v1/products/") == "read"
+    assert classify_request("POST", "/api/v1/products/") == "write"
+    assert classify_request("GET", "/health/ready") is None
+    # Выгрузки и файлы карты сайта по умолчанию ограничиваются отдельно от обычного чтения
+    assert classify_request("GET", "/sitemaps/sitemap.xml") == "static"
+    assert classify_request("GET", "/sitemaps/products-0.xml.gz") == "static"
+    assert classify_request("GET", "/api/v1/products/changes") == "export"
+    assert classify_request("POST", "/api/v1/products/bulk-update") == "export"
+
+
+def test_static_paths_follow_sitemap_url():
+    from app.config import Settings
+
+    assert Settings(sitemap_url="/seo/files").admission_static_paths == ["/seo/files/"]
+    assert Settings(sitemap_url="/seo", admission_static_paths=["/feeds/"]).admission_static_paths == ["/feeds/"]
+    limiters = create_limiters()
+    # Краулер качает шарды параллельно - у файлов свой, более широкий лимит
+    assert limiters["static"].limit > limiters["export"].limit
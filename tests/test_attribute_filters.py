@@ -0,0 +1,113 @@
+import sys
+import os
+from decimal import Decimal
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.cache import publish
+from app.config import settings
+from app.database.models import Attribute, AttributeType, Brand, Product, ProductVariant
+from app.repositories import ProductRepository, VariantRepository
+from app.schemas import VariantCombinationUpdate, VariantMatrixCreate
+from app.services import ProductService, VariantService
+
+
+@pytest.fixture
+def catalog(db, suffix):
+    """Телефоны: 0 - Midnight/256GB, 1 - Midnight/128GB, 2 - Silver/256GB, 3 - цвет Midnight без сочетаний"""
+    color = AttributeType(name=f"Color {suffix}", slug=f"color-{suffix}", input_type="select")
+    storage = AttributeType(name=f"Storage {suffix}", slug=f"storage-{suffix}", input_type="select")
+    brand = Brand(name=f"Filters {suffix}", slug=f"filters-{suffix}")
+    db.add_all([color, storage, brand])
+    # Новые типы атрибутов - новые допустимые фильтры
+    publish(db, "attribute_types")
+    db.flush()
+    midnight, silver = [Attribute(attribute_type_id=color.id, value=value, slug=value.lower()) for value in ("Midnight", "Silver")]
+    small, large = [Attribute(attribute_type_id=storage.id, value=value, slug=value.lower()) for value in ("128GB", "256GB")]
+    products = [Product(title=f"Phone {i}", slug=f"filter-{suffix}-{i}", sku=f"FLT-{suffix}-{i}",
+                        base_price=Decimal(100 + i), brand_id=brand.id) for i in range(4)]
+    db.add_all([midnight, silver, small, large] + products)
+    db.commit()
+
+    service = VariantService(db)
+    for product, values in zip(products, [(midnight, large), (midnight, small), (silver, large)]):
+        service.create_matrix(product.id, VariantMatrixCreate(attribute_ids=[[v.id] for v in values]))
+    db.add(ProductVariant(product_id=products[3].id, attribute_id=midnight.id))
+    db.flush()
+    VariantRepository(db).refresh_summaries([products[3].id])
+    db.commit()
+    return db, suffix, brand, [p.id for p in products]
+
+
+def query(db, suffix, brand, **values):
+    groups = VariantRepository(db).resolve_attribute_filters(
+        {f"{name}-{suffix}": items for name, items in values.items()})
+    return {"brand_id": brand.id, "attributes": groups, "sort_by": "id", "sort_order": "asc"}
+
+
+def test_sql_attribute_filters(catalog):
+    db, suffix, brand, ids = catalog
+    repository = ProductRepository(db)
+
+    def found(**values):
+        return [p.id for p in repository.filter_products(query(db, suffix, brand, **values), 0, 10)]
+
+    assert found(color=["Midnight"]) == [ids[0], ids[1], ids[3]]
+    assert found(color=["midnight"], storage=["256GB"]) == [ids[0]]
+    assert found(color=["Midnight", "Silver"], storage=["256gb"]) == [ids[0], ids[2]]
+    # Неизвестное значение известного типа - пустой результат, неизвестный тип - без фильтра
+    assert found(color=["Gold"]) == []
+    assert VariantRepository(db).resolve_attribute_filters({"utm_source": ["mail"]}) == []
+    print("✅ Фильтры по атрибутам в SQL")
+
+    # Неактивный вариант выпадает из индекса
+    combination, = VariantService(db).get_for_product(ids[2])
+    VariantService(db).update(ids[2], combination.id, VariantCombinationUpdate(is_active=False))
+    assert found(storage=["256GB"]) == [ids[0]]
+
+
+def test_snapshot_attribute_filters(catalog, monkeypatch):
+    pytest.importorskip("numpy")
+    from app.core.snapshot import CatalogSnapshot
+
+    monkeypatch.setattr(settings, "catalog_snapshot_enabled", True)
+    db, suffix, brand, ids = catalog
+    snapshot = CatalogSnapshot()
+    snapshot.load(db)
+    repository = ProductRepository(db)
+
+    for values in ({"color": ["Midnight"]}, {"color": ["Midnight"], "storage": ["256GB"]},
+                   {"color": ["Midnight", "Silver"], "storage": ["256GB"]}, {"color": ["Gold"]}):
+        filters = query(db, suffix, brand, **values)
+        assert snapshot.query(filters, 0, 10) == [p.id for p in repository.filter_products(dict(filters), 0, 10)]
+
+    # Изменения вариантов доходят до индекса снимка через refresh
+    combination, = VariantService(db).get_for_product(ids[1])
+    VariantService(db).update(ids[1], combination.id, VariantCombinationUpdate(is_active=False))
+    snapshot.refresh(db, [ids[1]])
+    assert snapshot.query(query(db, suffix, brand, color=["Midnight"]), 0, 10) == [ids[0], ids[3]]
+    print(f"✅ Фильтры по атрибутам в снимке: {snapshot.stats()['attributes']} значений")
+
+
+def test_unknown_params_are_not_filters(catalog):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    db, suffix, brand, ids = catalog
+    service = ProductService(db)
+    filters = {"brand_id": brand.id, "attribute_values": {f"color-{suffix}": ["midnight"], "utm_source": ["mail"], "_": ["1"]}}
+    assert service._known_attribute_filters(filters) == {"brand_id": brand.id, "attribute_values": {f"color-{suffix}": ["midnight"]}}
+    assert service._known_attribute_filters({"brand_id": brand.id, "attribute_values": {"utm_source": ["mail"]}}) == {"brand_id": brand.id}
+
+    # Посторонние параметры не сужают выдачу до пустой и не меняют ее
+    client = TestClient(app)
+    plain = client.get(f"/api/v1/products/?brand_id={brand.id}&color-{suffix}=midnight&limit=10").json()
+    tagged = client.get(f"/api/v1/products/?brand_id={brand.id}&color-{suffix}=midnight&limit=10&utm_source=mail&_=123").json()
+    assert [p["id"] for p in tagged] == [p["id"] for p in plain]
+    assert {p["id"] for p in plain} == {ids[0], ids[1], ids[3]}
+    everything = client.get(f"/api/v1/products/?brand_id={brand.id}&limit=10&utm_source=mail").json()
+    print(f"✅ Неизвестные параметры пропущены: {len(everything)} товаров бренда")
+    assert len(everything) == 4
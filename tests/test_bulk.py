@@ -0,0 +1,73 @@
+import sys
+import os
+from decimal import Decimal
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.outbox import current_position, read_events
+from app.database.models import Brand, Product
+from app.schemas import ProductBulkFilter, ProductBulkValues
+from app.services.product_service import ProductService
+
+
+def test_bulk_update_and_deactivate(db, suffix):
+    brand = Brand(name=f"Bulk {suffix}", slug=f"bulk-{suffix}")
+    db.add(brand)
+    db.flush()
+    db.add_all([
+        Product(title=f"Bulk {i}", slug=f"bulk-{suffix}-{i}", sku=f"BULK-{suffix}-{i}",
+                base_price=Decimal("10.00"), brand_id=brand.id, is_featured=(i == 0))
+        for i in range(5)
+    ])
+    db.commit()
+    start = current_position(db)
+
+    service = ProductService(db)
+    by_brand = ProductBulkFilter(brand_id=brand.id)
+    # Уже рекомендуемый товар не считается измененным
+    assert service.bulk_update(by_brand, ProductBulkValues(is_featured=True)) == 4
+    assert service.bulk_update(by_brand, ProductBulkValues(is_featured=True)) == 0
+
+    affected = service.bulk_soft_delete(by_brand)
+    print(f"✅ Снято с продажи товаров: {affected}")
+    assert affected == 5
+    assert db.query(Product).filter(Product.brand_id == brand.id, Product.is_active == True).count() == 0
+
+    messages, _ = read_events(db, start, 100, aggregate="product")
+    assert [m.event_type for m in messages] == ["updated"] * 4 + ["deactivated"] * 5
+
+
+def test_bulk_filter_requires_target():
+    try:
+        ProductBulkFilter(is_active=True)
+    except ValueError:
+        return
+    raise AssertionError("Фильтр без условий должен отклоняться")
+
+
+def test_bulk_update_rejects_unknown_shop(db, suffix):
+    product = Product(title=f"Bulk shop {suffix}", slug=f"bulk-shop-{suffix}", sku=f"BULK-SHOP-{suffix}",
+                      base_price=Decimal("10.00"))
+    db.add(product)
+    db.commit()
+
+    service = ProductService(db)
+    try:
+        service.bulk_update(ProductBulkFilter(ids=[product.id]), ProductBulkValues(shop_id=10 ** 9))
+    except ValueError as e:
+        print(f"✅ Неизвестный магазин отклонен: {e}")
+    else:
+        raise AssertionError("Неизвестный магазин должен отклоняться до записи")
+    db.refresh(product)
+    assert product.shop_id is None
+
+
+def test_bulk_filter_accepts_any_selector():
+    assert ProductBulkFilter(ids=[1]).ids == [1]
+    assert ProductBulkFilter(shop_id=0).shop_id == 0
+    try:
+        ProductBulkFilter(is_active=False)
+    except ValueError:
+        return
+    raise AssertionError("is_active без других условий не выбирает набор товаров")
@@ -0,0 +1,196 @@
+import sys
+import os
+import importlib
+import tempfile
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.cache import Cache, MemoryBackend
+from app.cache.fake import FakeRedis
+from app.cache.redis import RedisBackend
+from app.cache.shared import SharedMemoryBackend
+
+
+def test_memory_lru_evicts_least_recent():
+    backend = MemoryBackend(max_entries=2, eviction="lru")
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    print(f"✅ LRU: a={backend.get('a')}, b={backend.get('b')}, c={backend.get('c')}")
+    assert backend.get("b") is None
+    assert backend.get("a") == 1 and backend.get("c") == 3
+
+
+def test_memory_lfu_evicts_least_frequent():
+    backend = MemoryBackend(max_entries=2, eviction="lfu")
+    backend.set("a", 1)
+    backend.set("b", 2)
+    for _ in range(3):
+        backend.get("b")
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get("a") is None
+    assert backend.get("b") == 2 and backend.get("c") == 3
+
+
+def test_tag_invalidation_on_all_backends():
+    path = os.path.join(tempfile.mkdtemp(), "cache")
+    backends = {
+        "memory": lambda: MemoryBackend(),
+        "shared": lambda: SharedMemoryBackend(path, slots=64, slot_size=1024, version_slots=64),
+        "redis": lambda: RedisBackend(FakeRedis()),
+    }
+
+    for name, factory in backends.items():
+        cache = Cache(factory, default_ttl=60)
+        cache.set("brand:slug:apple", {"id": 1}, tags=["brand:1"])
+        assert cache.get("brand:slug:apple") == {"id": 1}
+
+        cache.invalidate_tags("brand:1")
+        print(f"✅ {name}: после сброса тега -> {cache.get('brand:slug:apple')}")
+        assert cache.get("brand:slug:apple") is None
+        cache.close()
+
+
+def test_get_or_set_skips_none():
+    cache = Cache(MemoryBackend, default_ttl=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return None
+
+    cache.get_or_set("missing", load)
+    cache.get_or_set("missing", load)
+    assert len(calls) == 2
+
+
+def test_publish_is_transactional(db):
+    from sqlalchemy import func
+    from app.cache import publish
+    from app.database.models import CacheChange
+
+    before = db.query(func.count(CacheChange.id)).scalar()
+    publish(db, "brand:1")
+    db.rollback()
+    publish(db, "brand:2", "brand")
+    db.commit()
+
+    rows = db.query(CacheChange).order_by(CacheChange.id.desc()).limit(1).all()
+    print(f"✅ Записей в журнале: {before} -> {before + 1}, теги: {rows[0].tags}")
+    assert db.query(func.count(CacheChange.id)).scalar() == before + 1
+    assert rows[0].tags == '["brand", "brand:2"]'
+
+
+def test_writer_invalidates_once_after_commit(db, monkeypatch):
+    from app.cache import publish
+
+    # app.cache.bus - это и модуль, и объект шины в app.cache
+    bus_module = importlib.import_module("app.cache.bus")
+
+    path = os.path.join(tempfile.mkdtemp(), "cache")
+    shared = Cache(lambda: SharedMemoryBackend(path, slots=64, slot_size=1024, version_slots=64), default_ttl=60)
+    monkeypatch.setattr(bus_module, "cache", shared)
+    try:
+        shared.set("brand:slug:apple", {"id": 1}, tags=["brand:1"])
+        publish(db, "brand:1")
+        db.rollback()
+        assert shared.get("brand:slug:apple") == {"id": 1}
+
+        # Пишущий воркер сбрасывает общее хранилище сразу после коммита
+        publish(db, "brand:1")
+        db.commit()
+        assert shared.get("brand:slug:apple") is None
+        version = shared.backend.get_version("brand:1")
+        assert version == 1
+
+        # Подписчики шины в других воркерах общее хранилище не трогают
+        bus_module.bus.dispatch(["brand:1"])
+        bus_module.bus.dispatch(None)
+        assert shared.backend.get_version("brand:1") == version
+        print(f"✅ Версия тега после коммита и событий шины: {version}")
+    finally:
+        shared.close()
+
+
+def test_bus_invalidates_process_local_cache(monkeypatch):
+    bus_module = importlib.import_module("app.cache.bus")
+    local = Cache(MemoryBackend, default_ttl=60)
+    monkeypatch.setattr(bus_module, "cache", local)
+    local.set("brand:slug:apple", {"id": 1}, tags=["brand:1"])
+    bus_module.bus.dispatch(["brand:1"])
+    assert local.get("brand:slug:apple") is None
+
+
+def test_bus_resets_after_listen_on_reconnect(monkeypatch):
+    from types import SimpleNamespace
+
+    bus_module = importlib.import_module("app.cache.bus")
+    bus = bus_module.InvalidationBus()
+    events = []
+
+    class FakeCursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def execute(self, sql):
+            events.append("listen")
+
+    class FakeConnection:
+        driver_connection = SimpleNamespace(autocommit=False, cursor=FakeCursor)
+
+        def detach(self):
+            pass
+
+        def close(self):
+            pass
+
+    attempts = []
+
+    def raw_connection():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("сервер недоступен")
+        return FakeConnection()
+
+    def handler(tags):
+        events.append(("dispatch", tags))
+        bus._stop.set()
+
+    monkeypatch.setattr(bus_module, "database", SimpleNamespace(engine=SimpleNamespace(raw_connection=raw_connection)))
+    monkeypatch.setattr(bus_module.logger, "exception", lambda *args, **kwargs: None)
+    bus.subscribe(handler)
+    bus._listen()
+
+    # Пока LISTEN не выполнен, сбрасывать рано: кэш успели бы заполнить устаревшим
+    assert events == ["listen", ("dispatch", None)]
+    print("✅ Полный сброс после переподключения идет только после LISTEN")
+
+
+def test_services_keep_orm_results(db, suffix):
+    from decimal import Decimal
+    from app.database.models import Brand, Product
+    from app.schemas import BrandResponse, ProductResponse
+    from app.services import BrandService, ProductService
+
+    brand = Brand(name=f"Orm {suffix}", slug=f"orm-{suffix}")
+    db.add(brand)
+    db.flush()
+    product = Product(title=f"Orm {suffix}", slug=f"orm-{suffix}", sku=f"ORM-{suffix}",
+                      brand_id=brand.id, base_price=Decimal("1.00"))
+    db.add(product)
+    db.commit()
+
+    # Обычные методы отдают ORM-объекты со связями, кэшируемые - схемы ответа
+    assert isinstance(BrandService(db).get_by_slug(brand.slug), Brand)
+    assert isinstance(BrandService(db).get_response_by_slug(brand.slug), BrandResponse)
+    full = ProductService(db).get_by_id_with_relations(product.id)
+    assert isinstance(full, Product) and full.brand.id == brand.id
+    assert isinstance(ProductService(db).get_response_with_relations(product.id), ProductResponse)
@@ -0,0 +1,21 @@
+import sys
+import os
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.explain import find_seq_scans, main
+
+
+def test_find_seq_scans():
+    sqlite_plan = ["SCAN products", "SEARCH product_tags_1 USING INDEX ix_product_tags_tag_id (tag_id=?)", "SCAN tags"]
+    postgres_plan = ["Limit  (cost=0.29..1.02 rows=10 width=8)", "  ->  Seq Scan on product_variants  (cost=0.00..35.50 rows=2550 width=8)"]
+
+    assert find_seq_scans(sqlite_plan, "sqlite") == ["products"]
+    assert find_seq_scans(["SCAN products USING INDEX ix_products_active_created"], "sqlite") == []
+    assert find_seq_scans(postgres_plan, "postgresql") == ["product_variants"]
+
+
+def test_repository_queries_use_indexes():
+    print("🧪 EXPLAIN запросов репозиториев на сгенерированном каталоге...")
+    assert main(["--products", "2000"]) == 0
@@ -0,0 +1,52 @@
+import sys
+import os
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.servers.gunicorn import hooks
+from app.core.servers.gunicorn.app_options import get_access_log_config, get_app_options, get_workers_count
+from app.core.servers.gunicorn.application import Application
+from app.core.servers.gunicorn.worker import resolve_implementation
+from app.database.connection import database
+
+
+def test_workers_count():
+    assert get_workers_count(3) == 3
+    derived = get_workers_count(0, per_core=2)
+    assert derived >= 2 and derived % 2 == 0
+    assert get_workers_count(0, per_core=64, max_workers=4) == 4
+    print(f"✅ Воркеров по числу ядер: {derived}")
+
+
+def test_app_options():
+    options = get_app_options(
+        host="0.0.0.0", port=8000, timeout=30, workers=2, log_level="info",
+        preload_app=True, max_requests=1000, max_requests_jitter=100, access_log="buffered",
+    )
+    assert options["bind"] == "0.0.0.0:8000"
+    assert options["preload_app"] and options["max_requests"] == 1000
+    assert options["post_fork"] is hooks.post_fork and options["worker_exit"] is hooks.worker_exit
+    assert options["logconfig_dict"]["loggers"]["gunicorn.access"]["handlers"] == ["access_buffer"]
+    assert get_access_log_config("stdout", 256) is None
+
+
+def test_resolve_missing_implementation():
+    assert resolve_implementation("h11") == "h11"
+    assert resolve_implementation("uvloop") in ("uvloop", "auto")
+
+
+def test_factory_called_on_load():
+    calls = []
+    application = Application(application=lambda: calls.append(1) or "app", options={"workers": 1})
+    assert calls == []
+    assert application.load() == "app" and calls == [1]
+
+
+def test_post_fork_drops_pool():
+    database.engine
+    assert database.is_initialized
+    hooks.post_fork(None, None)
+    # Пул пересоздается при первом обращении уже в дочернем процессе
+    assert not database.is_initialized
+    assert database.engine is not None
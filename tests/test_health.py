@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+from app.core import health
+from app.core.health import readiness
+from app.core.resources import resources
+from app.database import database
+from app.main import app
+
+
+def test_health_follows_resources(monkeypatch):
+    monkeypatch.setattr(readiness, "ttl", 0)
+    # Без lifespan пул создается при первом обращении
+    database.engine
+    client = TestClient(app)
+
+    monkeypatch.setattr(resources, "state", "ready")
+    assert client.get("/health").status_code == 200
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200, ready.json()
+    assert ready.json()["checks"]["database"]["ok"]
+
+    # Ресурсы еще прогреваются - воркер не готов, но жив
+    monkeypatch.setattr(resources, "state", "warming")
+    response = client.get("/health")
+    assert response.status_code == 503 and response.json()["status"] == "warming"
+    assert client.get("/health/ready").json()["checks"]["resources"] == {"ok": False, "state": "warming"}
+    assert client.get("/health/live").status_code == 200
+
+
+def test_readiness_fails_when_database_fails(monkeypatch):
+    monkeypatch.setattr(readiness, "ttl", 0)
+    monkeypatch.setattr(resources, "state", "ready")
+    database.engine
+
+    def broken(timeout):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(health, "_select_one", broken)
+    response = TestClient(app).get("/health/ready")
+    print(f"✅ Проверки при недоступной БД: {response.json()['checks']['database']}")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+    assert response.json()["checks"]["database"] == {"ok": False, "detail": "connection refused"}
+
+
+def test_readiness_result_is_cached(monkeypatch):
+    monkeypatch.setattr(resources, "state", "ready")
+    monkeypatch.setattr(readiness, "ttl", 60)
+    monkeypatch.setattr(readiness, "_result", None)
+    database.engine
+    client = TestClient(app)
+    assert client.get("/health/ready").status_code == 200
+
+    # В пределах ttl повторная проба не ходит в БД
+    monkeypatch.setattr(health, "_select_one", lambda timeout: 1 / 0)
+    assert client.get("/health/ready").status_code == 200
@@ -0,0 +1,165 @@
+import sys
+import os
+import asyncio
+import hashlib
+import tempfile
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+from app.media import FileTooLarge, MultipartUpload, UnsupportedMediaType, media_path
+from app.services.image_service import ImageService
+
+BOUNDARY = "testboundary"
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(200_000)
+
+
+def multipart_body(files, fields=None):
+    body = b""
+    for name, value in (fields or {}).items():
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n").encode()
+    for filename, content in files:
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+                 f"Content-Type: application/octet-stream\r\n\r\n").encode() + content + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def chunks(body, size=1000):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def receive(body, max_file_size=None):
+    upload = MultipartUpload(f"multipart/form-data; boundary={BOUNDARY}", max_file_size)
+    return asyncio.run(upload.consume(chunks(body)))
+
+
+@pytest.fixture
+def upload_dir(monkeypatch):
+    with tempfile.TemporaryDirectory() as path:
+        monkeypatch.setattr(settings, "upload_dir", path)
+        yield path
+
+
+def test_streaming_upload(upload_dir):
+    upload = receive(multipart_body([("a.png", PNG)], {"alt_text": "Фото"}))
+    file, = upload.files
+    print(f"✅ Файл: {file.filename}, {file.size} байт, {file.content_type}")
+    assert file.content_hash == hashlib.sha256(PNG).hexdigest()
+    assert file.content_type == "image/png" and file.size == len(PNG)
+    assert upload.fields == {"alt_text": "Фото"}
+    with open(file.path, "rb") as f:
+        assert f.read() == PNG
+
+    # Ошибки: временные файлы удаляются
+    with pytest.raises(FileTooLarge):
+        receive(multipart_body([("big.png", PNG)]), max_file_size=1000)
+    with pytest.raises(UnsupportedMediaType):
+        receive(multipart_body([("a.exe", b"MZ" + b"\0" * 100)]))
+    assert os.listdir(os.path.join(upload_dir, "tmp")) == [file.path.rsplit(os.sep, 1)[1]]
+
+
+def test_upload_dedup_and_serving(upload_dir, db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    content = b"\x89PNG\r\n\x1a\n" + os.urandom(5000)
+    first, = ImageService(db).save_uploads(receive(multipart_body([("a.png", content)])).files)
+    second, = ImageService(db).save_uploads(receive(multipart_body([("b.png", content)])).files)
+    print(f"✅ Повторная загрузка вернула изображение {second.id}")
+    assert first.id == second.id
+    assert os.path.exists(media_path("original", first.content_hash, "png"))
+    url = first.url
+
+    client = TestClient(app)
+    response = client.get(url)
+    assert response.status_code == 200 and response.content == content
+    assert "immutable" in response.headers["cache-control"]
+
+    response = client.get(url, headers={"Range": "bytes=0-99"})
+    assert response.status_code == 206 and response.content == content[:100]
+
+    # Превью еще нет - отдается оригинал с коротким кэшем
+    response = client.get(url.replace("/original/", "/card/"))
+    assert response.status_code == 200 and "immutable" not in response.headers["cache-control"]
+    assert client.get(url.replace("/original/", "/huge/")).status_code == 404
+
+
+def test_resolve_urls_batched(db, count_queries):
+    from app.repositories.image import ImageRepository, _url_ids
+    from app.database.models import Image, url_hash
+
+    prefix = f"http://test/{os.urandom(4).hex()}"
+    urls = [f"{prefix}/{i}.png" for i in range(30)]
+    repository = ImageRepository(db)
+    values = {url: {"alt_text": f"Фото {i}"} for i, url in enumerate(urls)}
+    with count_queries() as queries:
+        ids = repository.resolve_urls(urls[:20] + [urls[0], ""], values)
+        db.commit()
+    print(f"✅ 20 URL: {len(queries)} запроса")
+    assert len(set(ids.values())) == 20 and "" not in ids
+    assert len(queries) == 2
+    assert db.get(Image, ids[urls[0]]).alt_text == "Фото 0"
+
+    # Известные URL берутся из LRU, в БД уходят только новые
+    with count_queries() as queries:
+        more = repository.resolve_urls(urls)
+        db.rollback()
+    assert all(more[url] == ids[url] for url in urls[:20])
+    assert len(queries) == 2
+    # Откат не оставляет в LRU id несуществующих строк
+    assert _url_ids.get(url_hash(urls[25])) is None
+
+
+def test_upload_endpoint_stores_original_and_variants(upload_dir, db):
+    PIL = pytest.importorskip("PIL.Image")
+    import io
+    import time
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.media import thumbnails
+    from PIL.PngImagePlugin import PngInfo
+
+    # Случайный текстовый блок - файл уникален, повторный запуск не попадет в дедупликацию
+    info = PngInfo()
+    info.add_text("nonce", os.urandom(8).hex())
+    buffer = io.BytesIO()
+    PIL.new("RGB", (1600, 900), (200, 30, 90)).save(buffer, "PNG", pnginfo=info)
+    content = buffer.getvalue()
+    digest = hashlib.sha256(content).hexdigest()
+
+    client = TestClient(app)
+    try:
+        response = client.post(
+            "/api/v1/images/upload",
+            content=multipart_body([("photo.png", content)], {"alt_text": "Фото"}),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        )
+        assert response.status_code == 201, response.text
+        image, = response.json()
+        assert image["content_hash"] == digest and image["alt_text"] == "Фото"
+        assert image["url"] == f"{settings.media_url}/original/{digest[:2]}/{digest}.png"
+        assert image["variants"] == {
+            name: f"{settings.media_url}/{name}/{digest[:2]}/{digest}.png" for name in settings.image_variants
+        }
+        with open(media_path("original", digest, "png"), "rb") as f:
+            assert f.read() == content
+        # Временный файл загрузки удален после переноса в хранилище
+        assert os.listdir(os.path.join(upload_dir, "tmp")) == []
+
+        # Превью создаются в пуле процессов, не в запросе
+        deadline = time.monotonic() + 60
+        while thumbnails.missing(digest, "png") and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert thumbnails.missing(digest, "png") == []
+        for name, size in settings.image_variants.items():
+            with PIL.open(media_path(name, digest, "png")) as variant:
+                assert max(variant.size) == min(size, 1600)
+            served = client.get(image["variants"][name])
+            assert served.status_code == 200 and "immutable" in served.headers["cache-control"]
+        print(f"✅ Загружено {image['url']}, превью: {list(image['variants'])}")
+    finally:
+        thumbnails.close()
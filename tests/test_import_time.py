@@ -0,0 +1,31 @@
+import sys
+import os
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.import_time import TARGETS, measure, parse_importtime
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      2500 |       4100 | app.config\n"
+    )
+    assert parse_importtime(stderr) == {"_io": (0.12, 0.12), "app.config": (2.5, 4.1)}
+
+
+def test_slim_import_paths():
+    # Только состав импортов: время зависит от машины и проверяется make import-time
+    for name in ("db", "main", "cli"):
+        report = measure(name, TARGETS[name], runs=1)
+        print(f"✅ {name}: {len(report.modules)} модулей, {report.elapsed_ms:.0f} мс")
+        assert report.forbidden == [], f"{name}: {report.forbidden}"
+
+
+def test_create_app_builds_all_routes():
+    from app.main import create_app
+
+    paths = {route.path for route in create_app().routes}
+    assert {"/health", "/api/v1/products/", "/api/v1/shops/{slug}/products", "/api/v1/storefront/home"} <= paths
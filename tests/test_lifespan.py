@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+from app.core.resources import Resource, resources
+from app.database import database
+from app.database.connection import Database
+from app.database.models import Base
+from app.main import create_app
+
+
+class RecordingResource(Resource):
+    name = "recording"
+
+    def __init__(self):
+        self.calls = []
+
+    def start(self):
+        self.calls.append("start")
+
+    def warm(self):
+        self.calls.append("warm")
+
+    def close(self):
+        self.calls.append("close")
+
+
+def wait_ready(client: TestClient, timeout: float = 10) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/health")
+        if response.status_code == 200 or time.monotonic() > deadline:
+            return response.json()
+        time.sleep(0.05)
+
+
+def test_lifespan_starts_and_closes_resources():
+    Base.metadata.create_all(database.engine)
+    recording = resources.register(RecordingResource())
+    try:
+        with TestClient(create_app()) as client:
+            assert recording.calls[0] == "start"
+            assert wait_ready(client)["status"] == "ready"
+            assert recording.calls == ["start", "warm"]
+            assert database.is_initialized
+        print(f"✅ Ресурсы: {[resource.name for resource in resources.resources]}")
+
+        # При остановке воркера ресурсы закрыты, пул соединений сброшен
+        assert recording.calls == ["start", "warm", "close"]
+        assert resources.state == "stopped"
+        assert not database.is_initialized
+    finally:
+        resources._resources.pop(recording.name, None)
+
+
+def test_engine_recreated_after_fork(monkeypatch):
+    db = Database("sqlite://")
+    engine = db.engine
+    assert db.engine is engine
+    # Другой PID - другой процесс: пул родителя не используется
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert not db.is_initialized
+    assert db.engine is not engine
+    db.dispose()
+    assert not db.is_initialized
@@ -0,0 +1,46 @@
+import sys
+import os
+from decimal import Decimal
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.money import discount_percent, discount_percentage, format_money, from_minor, line_total, to_minor, total
+from app.schemas import ProductCreate
+
+
+def test_minor_units_round_trip():
+    assert to_minor(0.1) == 10
+    assert to_minor("1099.995") == 110000
+    assert from_minor(109999) == Decimal("1099.99")
+    assert total([0.1, 0.2]) == Decimal("0.30")
+    assert line_total(Decimal("19.99"), 3) == Decimal("59.97")
+    print("✅ 0.1 + 0.2 =", total([0.1, 0.2]))
+
+
+def test_discount_and_format():
+    assert discount_percent(200, 102) == 49
+    assert discount_percent(0.3, 0.1) == 67
+    assert discount_percent(100, 100) == 0
+    assert discount_percent(None, 100) == 0
+    # В ProductResponse скидка - число с одним знаком, как и до перехода на центы
+    assert discount_percentage(0.3, 0.1) == 66.7
+    assert discount_percentage(100, 100) == 0.0
+    assert format_money(1099.9) == "1099.90"
+
+
+def test_schema_money_fields():
+    product = ProductCreate(title="iPhone", base_price=899.99, old_price=999.99)
+    assert product.base_price == Decimal("899.99")
+    assert product.model_dump(mode="json")["base_price"] == 899.99
+
+
+def test_response_discount_stays_float():
+    from datetime import datetime
+    from app.schemas import ProductResponse
+
+    product = ProductResponse.model_validate({
+        "id": 1, "title": "iPhone", "slug": "iphone", "sku": "IP", "base_price": "0.10", "old_price": "0.30",
+        "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+    })
+    assert product.model_dump(mode="json")["discount_percentage"] == 66.7
@@ -0,0 +1,141 @@
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+from app.core.outbox import OutboxConsumer, current_position, read_events, record_event
+from app.database import SessionLocal, connection
+from app.database.connection import Database
+from app.database.models import Base, OutboxEvent
+
+
+@pytest.fixture
+def outbox_db(monkeypatch):
+    """Отдельная БД: тесты создают дыры в id и чистят историю outbox"""
+    database = Database(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'outbox.db')}")
+    monkeypatch.setattr(connection, "database", database)
+    Base.metadata.create_all(database.engine)
+    yield database
+    database.dispose()
+
+
+def test_read_events_waits_for_gap(monkeypatch, outbox_db):
+    import app.core.outbox as outbox_module
+
+    # Как на Postgres: транзакция 42 держит пропущенный id, пока не завершится
+    running = {42}
+    monkeypatch.setattr(settings, "outbox_gap_timeout", 0)
+    monkeypatch.setattr(outbox_module, "running_transactions", lambda db: sorted(running))
+    monkeypatch.setattr(outbox_module, "in_progress", lambda db, xids: bool(running & set(xids)))
+    db = SessionLocal()
+    try:
+        start = current_position(db)
+        record_event(db, "product", 1, "updated", {"id": 1})
+        db.commit()
+
+        # Событие за "дырой": id предыдущего еще не закоммичен
+        db.add(OutboxEvent(id=start + 3, aggregate="product", aggregate_id=3, event_type="updated", payload={}))
+        db.commit()
+
+        messages, position = read_events(db, start, 100)
+        print(f"✅ До дыры прочитано событий: {len(messages)}, позиция: {position}")
+        assert [m.aggregate_id for m in messages] == [1]
+        assert position == start + 1
+
+        # Сколько бы ни прошло времени, дыра ждет, пока транзакция выполняется
+        assert read_events(db, position, 100) == ([], position)
+
+        # Транзакция закоммитилась: ее событие читается по порядку
+        db.add(OutboxEvent(id=start + 2, aggregate="product", aggregate_id=2, event_type="updated", payload={}))
+        db.commit()
+        running.clear()
+        messages, position = read_events(db, position, 100)
+        assert [m.aggregate_id for m in messages] == [2, 3]
+        assert position == start + 3
+    finally:
+        db.close()
+
+
+def test_rolled_back_gap_is_skipped(monkeypatch, outbox_db):
+    import app.core.outbox as outbox_module
+
+    running = {7}
+    monkeypatch.setattr(settings, "outbox_gap_timeout", 0)
+    monkeypatch.setattr(outbox_module, "running_transactions", lambda db: sorted(running))
+    monkeypatch.setattr(outbox_module, "in_progress", lambda db, xids: bool(running & set(xids)))
+    db = SessionLocal()
+    try:
+        start = current_position(db)
+        record_event(db, "product", 1, "updated", {"id": 1})
+        db.commit()
+        db.add(OutboxEvent(id=start + 3, aggregate="product", aggregate_id=3, event_type="updated", payload={}))
+        db.commit()
+        assert read_events(db, start, 100)[1] == start + 1
+
+        # Транзакция откатилась: дыра закрыта доказательно, а не по таймауту
+        running.clear()
+        messages, position = read_events(db, start + 1, 100)
+        assert [m.aggregate_id for m in messages] == [3]
+        assert position == start + 3
+    finally:
+        db.close()
+
+
+def test_consumer_retries_failed_batch(outbox_db):
+    db = SessionLocal()
+    try:
+        consumer = OutboxConsumer(lambda messages: None)
+        consumer.last_id = current_position(db)
+        record_event(db, "product", 3, "stock_changed", {"id": 3})
+        db.commit()
+    finally:
+        db.close()
+
+    def failing(messages):
+        raise RuntimeError("sink недоступен")
+
+    consumer.handler = failing
+    try:
+        consumer.drain(100)
+    except RuntimeError:
+        pass
+
+    received = []
+    consumer.handler = received.extend
+    consumer.drain(100)
+    print(f"✅ После ошибки доставлено повторно: {[m.event_type for m in received]}")
+    assert [m.aggregate_id for m in received] == [3]
+
+
+def test_changes_token_expires_after_prune(outbox_db):
+    from app.core.outbox import ChangeTokenExpired, outbox, pruned_position
+    from app.services.product_service import ProductService
+
+    db = SessionLocal()
+    try:
+        record_event(db, "product", 5, "updated", {"id": 5})
+        db.commit()
+        position = current_position(db)
+        db.query(OutboxEvent).filter(OutboxEvent.id <= position).update(
+            {"created_at": datetime.utcnow() - timedelta(days=30)}
+        )
+        db.commit()
+
+        outbox.prune()
+        print(f"✅ История удалена до позиции {pruned_position(db)}")
+        assert pruned_position(db) == position
+
+        try:
+            ProductService(db).get_changes(position - 1)
+            assert False, "ожидали ChangeTokenExpired"
+        except ChangeTokenExpired:
+            pass
+        assert ProductService(db).get_changes(position)["changes"] == []
+    finally:
+        db.close()
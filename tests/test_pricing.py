@@ -0,0 +1,112 @@
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.models import Category, Product
+from app.schemas import PriceScheduleCreate, ProductUpdate
+from app.services.pricing_service import PricingService
+from app.services.product_service import ProductService
+
+
+def test_schedule_applies_and_reverts(db, suffix):
+    category = Category(name=f"Sale {suffix}", slug=f"sale-{suffix}")
+    db.add(category)
+    db.flush()
+    products = [
+        Product(title=f"Item {i}", slug=f"item-{suffix}-{i}", sku=f"SALE-{suffix}-{i}",
+                base_price=price, old_price=old, category_id=category.id)
+        for i, (price, old) in enumerate([(Decimal("99.99"), None), (Decimal("10.00"), Decimal("15.00"))])
+    ]
+    db.add_all(products)
+    db.commit()
+
+    service = PricingService(db)
+    schedule = service.create(PriceScheduleCreate(
+        name="Black Friday", rule="percent_off", percent=15, category_id=category.id,
+        starts_at=datetime.utcnow() - timedelta(minutes=1), ends_at=datetime.utcnow() + timedelta(days=1),
+    ))
+    print(f"🧪 Расписание {schedule.id}: {schedule.status}, товаров: {schedule.affected_count}")
+    assert schedule.status == "active"
+    assert schedule.affected_count == 2
+
+    for product in products:
+        db.refresh(product)
+    # 99.99 * 0.85 = 84.9915 -> 84.99; зачеркнутая - исходная цена или прежняя зачеркнутая
+    assert products[0].base_price == Decimal("84.99")
+    assert products[0].old_price == Decimal("99.99")
+    assert products[1].base_price == Decimal("8.50")
+    assert products[1].old_price == Decimal("15.00")
+
+    # Цену второго товара поменяли вручную - откат ее не трогает
+    ProductService(db).update(products[1].id, ProductUpdate(base_price=Decimal("9.00")))
+    assert service.finish(schedule.id)
+
+    for product in products:
+        db.refresh(product)
+    assert products[0].base_price == Decimal("99.99")
+    assert products[0].old_price is None
+    assert products[1].base_price == Decimal("9.00")
+
+    kinds = [row.kind for row in service.get_history(products[1].id)]
+    print("✅ История цен:", kinds)
+    assert kinds == ["manual", "apply"]
+    assert [row.kind for row in service.get_history(products[0].id)] == ["revert", "apply"]
+
+
+def test_overlapping_schedules_recompute_on_revert(db, suffix):
+    category = Category(name=f"Overlap {suffix}", slug=f"overlap-{suffix}")
+    db.add(category)
+    db.flush()
+    product = Product(title="Item", slug=f"overlap-{suffix}", sku=f"OVER-{suffix}",
+                      base_price=Decimal("100.00"), category_id=category.id)
+    cheap = Product(title="Cheap", slug=f"cheap-{suffix}", sku=f"CHEAP-{suffix}",
+                    base_price=Decimal("0.01"), category_id=category.id)
+    db.add_all([product, cheap])
+    db.commit()
+
+    service = PricingService(db)
+    window = {"starts_at": datetime.now(timezone.utc) - timedelta(minutes=1),
+              "ends_at": datetime.now(timezone.utc) + timedelta(days=1)}
+    first = service.create(PriceScheduleCreate(
+        name="Первое", rule="percent_off", percent=10, category_id=category.id, **window))
+    second = service.create(PriceScheduleCreate(
+        name="Второе", rule="percent_off", percent=99, product_ids=[product.id, cheap.id], **window))
+    assert first.starts_at.tzinfo is not None
+    db.refresh(product)
+    db.refresh(cheap)
+    # 100 -> 90 -> 0.90; 0.01 * 0.01 округляется до нуля - цена не ниже 0.01
+    assert product.base_price == Decimal("0.90")
+    assert cheap.base_price == Decimal("0.01")
+    assert {s.id for s in service.get_all(limit=100, active_only=True)} >= {first.id, second.id}
+
+    # Снимаем первое: второе пересчитывается от исходной цены, а не возвращает 90
+    assert service.finish(first.id)
+    db.refresh(product)
+    assert product.base_price == Decimal("1.00")
+    assert product.old_price == Decimal("100.00")
+
+    assert service.finish(second.id)
+    db.refresh(product)
+    assert product.base_price == Decimal("100.00")
+    assert product.old_price is None
+    assert first.id not in {s.id for s in service.get_all(limit=100, active_only=True)}
+    print("✅ История цен:", [(row.kind, row.base_price) for row in service.get_history(product.id)])
+
+
+def test_schedule_validation():
+    for data in (
+        {"rule": "percent_off"},
+        {"rule": "amount_off", "percent": 10},
+        {"rule": "fixed_price", "amount": 5, "product_ids": None},
+        {"rule": "percent_off", "percent": 100},
+        {"rule": "percent_off", "percent": 0},
+    ):
+        try:
+            PriceScheduleCreate(**{"name": "x", "product_ids": [1], "starts_at": datetime.utcnow(), **data})
+        except ValueError:
+            continue
+        raise AssertionError(f"Ожидалась ошибка валидации: {data}")
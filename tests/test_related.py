@@ -0,0 +1,78 @@
+import sys
+import os
+from decimal import Decimal
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+np = pytest.importorskip("numpy")
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.related import FeatureMatrix, rebuild
+from app.database.models import Brand, Product, Tag
+from app.main import app
+from app.repositories import ProductRepository
+
+
+def test_feature_matrix_neighbors():
+    # 0 и 1 делят редкий тег 0, 2 делит с 0 только частый тег 1; 3 без общих тегов
+    features = FeatureMatrix(
+        product_ids=[10, 11, 12, 13],
+        categories=[1, 1, 2, -1],
+        brands=[-1, -1, -1, -1],
+        tag_rows=[0, 1, 0, 1, 2, 3],
+        tag_cols=[0, 0, 1, 1, 1, 2],
+        category_weight=1.0,
+        brand_weight=0.5,
+    )
+    rows, ranks, candidates, scores = features.neighbors(np.arange(4), k=5, max_tag_df=10)
+    neighbors = {}
+    for row, rank, candidate in zip(rows, ranks, candidates):
+        neighbors.setdefault(int(row), []).append(int(features.product_ids[candidate]))
+    print("✅ Соседи:", neighbors)
+    assert neighbors[0] == [11, 12]
+    assert neighbors[2] == [10, 11]
+    assert 3 not in neighbors
+    assert np.all(np.diff(scores[rows == 0]) <= 0)
+
+    # Частые теги не порождают кандидатов
+    rows, _, _, _ = features.neighbors(np.arange(4), k=5, max_tag_df=2)
+    assert set(rows.tolist()) == {0, 1}
+
+
+def test_rebuild_and_read(db, suffix):
+    brand = Brand(name=f"Related {suffix}", slug=f"related-{suffix}")
+    tags = [Tag(name=f"rel-{suffix}-{i}", slug=f"rel-{suffix}-{i}") for i in range(2)]
+    db.add(brand)
+    db.add_all(tags)
+    db.flush()
+    products = [
+        Product(title=f"Rel {i}", slug=f"rel-{suffix}-{i}", sku=f"REL-{suffix}-{i}",
+                base_price=Decimal("1.00"), brand_id=brand.id, tags=tags[:1] if i < 2 else tags)
+        for i in range(3)
+    ]
+    db.add_all(products)
+    db.commit()
+
+    assert rebuild(db, k=5) > 0
+    related = ProductRepository(db).get_related_ids(products[0].id)
+    assert set(related) >= {products[1].id, products[2].id}
+    # Соседа с теми же тегами ставим выше
+    assert related.index(products[1].id) < related.index(products[2].id)
+
+    # Пересчет пачками по одному товару; соседи неактивного товара удаляются
+    products[2].is_active = False
+    db.commit()
+    rebuild(db, k=5, batch_size=1)
+    repository = ProductRepository(db)
+    assert repository.get_related_ids(products[2].id) == []
+    assert repository.get_related_ids(products[0].id)[0] == products[1].id
+    print("✅ Пересчет похожих товаров пачками")
+
+    client = TestClient(app)
+    assert client.get(f"/api/v1/products/{products[0].id}/related?limit={settings.related_products_k + 1}").status_code == 422
+    assert client.get(f"/api/v1/products/{products[0].id}/related").status_code == 200
@@ -0,0 +1,94 @@
+import sys
+import os
+import tempfile
+import time
+import uuid
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, allow_replica_reads, connection
+from app.database.connection import ReplicaSet, replica_reads_allowed
+from app.database.models import Base, Brand
+from app.repositories import BrandRepository
+
+
+def test_reads_routed_to_replica(db, suffix):
+    replica_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'replica.db')}"
+    replica_engine = create_engine(replica_url)
+    Base.metadata.create_all(replica_engine)
+
+    # В "реплике" бренд с тем же slug, но другим именем - видно, откуда пришло чтение
+    slug = f"replica-{suffix}"
+    with Session(replica_engine) as replica_db:
+        replica_db.add(Brand(name=f"from replica {slug}", slug=slug))
+        replica_db.commit()
+    replica_engine.dispose()
+
+    original = connection.replicas
+    connection.replicas = ReplicaSet([replica_url])
+    try:
+        repository = BrandRepository(db)
+        # До первой проверки реплика не используется
+        with allow_replica_reads():
+            assert repository.get_by_slug(slug) is None
+        connection.replicas.check()
+
+        # Вне GET-запроса чтения идут в основную БД
+        assert repository.get_by_slug(slug) is None
+
+        with allow_replica_reads():
+            assert repository.get_by_slug(slug).name == f"from replica {slug}"
+            print("✅ Чтение с реплики")
+
+            # После записи сессия читает только из основной БД
+            db.add(Brand(name=f"from primary {slug}", slug=slug))
+            db.commit()
+            assert repository.get_by_slug(slug).name == f"from primary {slug}"
+            print("✅ После записи - основная БД")
+
+        # Недоступная реплика пропускается
+        connection.replicas = ReplicaSet(["sqlite:////nonexistent/dir/replica.db"])
+        connection.replicas.check()
+        with allow_replica_reads():
+            assert BrandRepository(SessionLocal()).get_by_slug(slug).name == f"from primary {slug}"
+    finally:
+        connection.replicas.dispose()
+        connection.replicas = original
+
+
+def test_choose_never_probes(monkeypatch):
+    replica_set = ReplicaSet(["sqlite://"])
+    replica_set.check()
+    assert replica_set.status() == [{"usable": True, "lag": 0.0}]
+
+    # Запрос только читает результат фоновой проверки
+    monkeypatch.setattr(replica_set, "_measure_lag", lambda index: 1 / 0)
+    assert replica_set.choose() is not None
+
+    monkeypatch.setattr(connection.settings, "replica_check_interval", 0.01)
+    replica_set.start()
+    try:
+        deadline = time.monotonic() + 5
+        while replica_set.choose() is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert replica_set.choose() is None
+        print("✅ Фоновая проверка отключила недоступную реплику")
+    finally:
+        replica_set.stop()
+        replica_set.dispose()
+
+
+def test_cache_loaders_read_primary(monkeypatch):
+    from app.cache import cache
+
+    seen = []
+    monkeypatch.setattr(cache, "enabled", True)
+    with allow_replica_reads():
+        cache.get_or_set(f"replica-test:{uuid.uuid4().hex}", lambda: seen.append(replica_reads_allowed.get()) or 1)
+        assert replica_reads_allowed.get()
+    # Промах кэша после сброса тега не должен закэшировать отстающие данные реплики
+    assert seen == [False]
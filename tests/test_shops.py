@@ -0,0 +1,94 @@
+import sys
+import os
+from decimal import Decimal
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.models import Product, Shop
+from app.repositories import ProductRepository, ShopRepository
+from app.schemas import ProductUpdate, ShopUpdate
+from app.services import ProductService, ShopService
+
+
+@pytest.fixture
+def shops(db, suffix):
+    first, second = [Shop(name=f"Shop {name} {suffix}", slug=f"shop-{name}-{suffix}") for name in ("a", "b")]
+    db.add_all([first, second])
+    db.flush()
+    db.add_all([
+        Product(title=f"Item {shop.slug} {i}", slug=f"{shop.slug}-{i}", sku=f"{shop.slug}-{i}",
+                base_price=Decimal(10 + i), shop_id=shop.id)
+        for shop in (first, second) for i in range(3)
+    ])
+    db.commit()
+    return db, first, second
+
+
+def test_shop_listing_and_cache_isolation(shops, count_queries):
+    db, first, second = shops
+    service = ShopService(db)
+    listing = {"sort_by": "id", "sort_order": "asc"}
+
+    products = service.get_products_for_frontend(first.slug, listing, 0, 10)
+    assert [p["sku"] for p in products] == [f"{first.slug}-{i}" for i in range(3)]
+    assert {p["shop_name"] for p in products} == {first.name}
+    assert service.get_products_for_frontend("missing-shop", listing) is None
+    service.get_products_for_frontend(second.slug, listing, 0, 10)
+
+    # Изменение товара магазина A сбрасывает только витрину A
+    ProductService(db).update(products[0]["id"], ProductUpdate(title=f"Renamed {first.slug}"))
+    # Поиск магазина по slug без кэша не считается - только запросы к товарам
+    with count_queries() as queries:
+        service.get_products_for_frontend(second.slug, listing, 0, 10)
+    print(f"✅ Витрина другого магазина после изменения: {queries.count('FROM products')} запросов к товарам")
+    assert queries.count("FROM products") == 0
+    renamed = service.get_products_for_frontend(first.slug, listing, 0, 10)
+    assert renamed[0]["title"] == f"Renamed {first.slug}"
+
+
+def test_product_tags_include_old_and_new_shop(shops):
+    db, first, second = shops
+    product = db.query(Product).filter(Product.shop_id == first.id).first()
+    repository = ProductRepository(db)
+    assert f"shop:{first.id}" in repository.cache_tags(product)
+
+    product.shop_id = second.id
+    assert {f"shop:{first.id}", f"shop:{second.id}"} <= set(repository.cache_tags(product))
+    db.rollback()
+
+
+def test_shop_endpoints(shops):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    db, first, second = shops
+    client = TestClient(app)
+    response = client.get(f"/api/v1/shops/{second.slug}/products", params={"sort_by": "base_price", "sort_order": "desc"})
+    assert response.status_code == 200
+    assert [p["sku"] for p in response.json()] == [f"{second.slug}-{i}" for i in (2, 1, 0)]
+    assert client.get(f"/api/v1/shops/{second.slug}").json()["name"] == second.name
+    assert client.get("/api/v1/shops/missing-shop/products").status_code == 404
+    # Нулевые значения - настоящие фильтры, а не их отсутствие
+    assert client.get(f"/api/v1/shops/{second.slug}/products", params={"max_price": 0}).json() == []
+    assert client.get(f"/api/v1/shops/{second.slug}/products", params={"category_id": 0}).json() == []
+    # Каталог строит фильтры тем же dependency
+    assert client.get("/api/v1/products/", params={"category_id": 0}).json() == []
+    assert client.get("/api/v1/products/", params={"brand_id": 0, "min_price": 0}).json() == []
+
+
+def test_shop_update_invalidates_catalog_listings(shops):
+    db, first, second = shops
+    listing = {"sort_by": "id", "sort_order": "desc"}
+    name = first.name
+    products = ProductService(db).filter_products_for_frontend(listing, 0, 6)
+    assert {p["shop_name"] for p in products if p["sku"].startswith(first.slug)} == {name}
+
+    # Общий список товаров показывает название магазина - изменение магазина его сбрасывает
+    assert "catalog" in ShopRepository(db).cache_tags(first)
+    ShopService(db).update(first.id, ShopUpdate(name=f"Renamed {name}"))
+    products = ProductService(db).filter_products_for_frontend(listing, 0, 6)
+    print(f"✅ Список после переименования магазина: {sorted({p['shop_name'] for p in products})}")
+    assert {p["shop_name"] for p in products if p["sku"].startswith(first.slug)} == {f"Renamed {name}"}
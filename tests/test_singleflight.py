@@ -0,0 +1,51 @@
+import sys
+import os
+import threading
+import time
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.singleflight import SingleFlight, StaleWhileRevalidate, make_key
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return ["featured"]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("featured", load)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"✅ Вызовов загрузчика: {len(calls)}, ответов: {len(results)}")
+    assert len(calls) == 1
+    assert results == [["featured"]] * 10
+
+
+def test_stale_while_revalidate_serves_stale_value():
+    cache = StaleWhileRevalidate(fresh_ttl=0.01, stale_ttl=10)
+    version = {"value": 1}
+
+    assert cache.get("key", lambda db: version["value"], db=None) == 1
+    version["value"] = 2
+    time.sleep(0.02)
+    # Запись устарела: отдаем старое значение, обновление идет в фоне
+    assert cache.get("key", lambda db: version["value"], db=None) == 1
+
+    cache.invalidate()
+    assert cache.get("key", lambda db: version["value"], db=None) == 2
+
+
+def test_make_key_is_order_independent():
+    assert make_key("filter", brand_id=1, category_id=2) == make_key("filter", category_id=2, brand_id=1)
@@ -0,0 +1,85 @@
+import sys
+import os
+import gzip
+import tempfile
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+from app.core.sitemaps import FEED, INDEX, generate, shard_name
+from app.database.models import Brand, Category, Image, Product
+from app.schemas import BrandUpdate, ImageUpdate, ProductUpdate
+from app.services import BrandService, ImageService, ProductService
+
+G = "{http://base.google.com/ns/1.0}"
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def test_sharded_sitemap_and_feed(db, suffix, monkeypatch):
+    monkeypatch.setattr(settings, "sitemap_shard_size", 3)
+    # test_outbox очищает outbox целиком, и SQLite выдает новым событиям id ниже позиции очистки
+    monkeypatch.setattr("app.core.sitemaps.pruned_position", lambda db: 0)
+    category = Category(name=f"Sitemap {suffix}", slug=f"sitemap-{suffix}")
+    image = Image(url=f"http://cdn/{suffix}.png", is_primary=True)
+    brand = Brand(name=f"Sitemap {suffix}", slug=f"sitemap-{suffix}")
+    db.add_all([category, image, brand])
+    db.flush()
+    products = [
+        Product(title=f"Map & {i}", slug=f"map-{suffix}-{i}", sku=f"MAP-{suffix}-{i}", category_id=category.id,
+                brand_id=brand.id if i == 2 else None,
+                base_price=Decimal("10.50"), old_price=Decimal("12.00") if i == 0 else None, total_stock=i,
+                images=[image] if i == 0 else [])
+        for i in range(7)
+    ]
+    db.add_all(products)
+    db.commit()
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = generate(db, directory)
+        total = sum(shard["urls"] for shard in result["shards"].values())
+        print(f"✅ Карта сайта: {total} URL в {len(result['shards'])} шардах")
+        assert all(shard["urls"] <= 3 for shard in result["shards"].values())
+
+        shard = (products[0].id - 1) // 3
+        with gzip.open(os.path.join(directory, shard_name(shard))) as f:
+            locs = [loc.text for loc in ET.parse(f).iter(f"{SITEMAP}loc")]
+        assert settings.site_url + f"/product/map-{suffix}-0" in locs
+        index = ET.parse(os.path.join(directory, INDEX))
+        assert len(list(index.iter(f"{SITEMAP}sitemap"))) == len(result["shards"])
+
+        # Фид - склейка gzip-частей шардов, читается как один документ
+        with gzip.open(os.path.join(directory, FEED)) as f:
+            items = {item.findtext(f"{G}id"): item for item in ET.parse(f).iter("item")}
+        assert len(items) == total
+        first = items[products[0].sku]
+        assert first.findtext(f"{G}title") == "Map & 0"
+        assert (first.findtext(f"{G}price"), first.findtext(f"{G}sale_price")) == ("12.00 USD", "10.50 USD")
+        assert first.findtext(f"{G}image_link") == image.url
+        assert items[products[1].sku].findtext(f"{G}availability") == "in_stock"
+
+        # Повторный запуск без изменений ничего не перестраивает
+        assert generate(db, directory)["regenerated"] == []
+
+        # Изменение и снятие с продажи - только шарды этих товаров
+        ProductService(db).update(products[6].id, ProductUpdate(title=f"Renamed {suffix}"))
+        ProductService(db).delete(products[5].id)
+        result = generate(db, directory)
+        assert result["regenerated"] == sorted({(products[6].id - 1) // 3, (products[5].id - 1) // 3})
+        with gzip.open(os.path.join(directory, FEED)) as f:
+            items = {item.findtext(f"{G}id"): item for item in ET.parse(f).iter("item")}
+        assert items[products[6].sku].findtext(f"{G}title") == f"Renamed {suffix}"
+        assert products[5].sku not in items
+
+        # Бренд и изображение есть в фиде - их изменения перестраивают шарды их товаров
+        BrandService(db).update(brand.id, BrandUpdate(name=f"Renamed brand {suffix}"))
+        ImageService(db).update(image.id, ImageUpdate(url=f"http://cdn/{suffix}-v2.png"))
+        result = generate(db, directory)
+        assert result["regenerated"] == sorted({(products[0].id - 1) // 3, (products[2].id - 1) // 3})
+        with gzip.open(os.path.join(directory, FEED)) as f:
+            items = {item.findtext(f"{G}id"): item for item in ET.parse(f).iter("item")}
+        assert items[products[2].sku].findtext(f"{G}brand") == f"Renamed brand {suffix}"
+        assert items[products[0].sku].findtext(f"{G}image_link") == f"http://cdn/{suffix}-v2.png"
+        print(f"✅ После изменения бренда и изображения: шарды {result['regenerated']}")
@@ -0,0 +1,102 @@
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("numpy")
+
+from app.config import settings
+from app.core.outbox import OutboxMessage
+from app.core.snapshot import CatalogSnapshot
+from app.database.models import Brand, Product, Shop
+from app.repositories import ProductRepository
+
+
+def test_snapshot_matches_sql(db, suffix, monkeypatch):
+    monkeypatch.setattr(settings, "catalog_snapshot_enabled", True)
+    rnd = random.Random(7)
+    brand = Brand(name=f"Snapshot {suffix}", slug=f"snapshot-{suffix}")
+    db.add(brand)
+    db.flush()
+    now = datetime.utcnow()
+    products = [
+        Product(title=f"Snap {i}", slug=f"snap-{suffix}-{i}", sku=f"SNAP-{suffix}-{i}",
+                base_price=Decimal(rnd.choice([10, 20, 30])), total_stock=rnd.choice([0, 5]),
+                brand_id=brand.id, created_at=now - timedelta(minutes=rnd.randint(0, 5)))
+        for i in range(40)
+    ]
+    db.add_all(products)
+    db.commit()
+
+    snapshot = CatalogSnapshot()
+    snapshot.load(db)
+    repository = ProductRepository(db)
+
+    def same(filters):
+        for skip in (0, 7, 35):
+            sql = [p.id for p in repository.filter_products(dict(filters), skip, 7)]
+            assert snapshot.query(filters, skip, 7) == sql, (filters, skip)
+
+    # Для одинаковых ключей порядок в SQL не задан - добавляем id вторым ключом, как в снимке
+    for sort_by in ("base_price", "total_stock"):
+        for sort_order in ("asc", "desc"):
+            filters = {"brand_id": brand.id, "sort_by": sort_by, "sort_order": sort_order}
+            ids = snapshot.query(filters, 0, 40)
+            rows = {p.id: p for p in products}
+            keys = [(getattr(rows[i], sort_by), i) for i in ids]
+            assert keys == sorted(keys, reverse=sort_order == "desc")
+    print("✅ Сортировки снимка")
+
+    same({"brand_id": brand.id, "min_price": 15, "max_price": 25, "sort_by": "id", "sort_order": "asc"})
+
+    # Изменения применяются по событиям: снятый с продажи товар пропадает из выборки
+    products[0].is_active = False
+    products[1].base_price = Decimal("99.00")
+    db.commit()
+    snapshot.refresh(db, [products[0].id, products[1].id])
+    assert products[0].id not in snapshot.query({"brand_id": brand.id}, 0, 100)
+    assert snapshot.query({"brand_id": brand.id, "min_price": 50}, 0, 10) == [products[1].id]
+    same({"brand_id": brand.id, "in_stock": True, "sort_by": "id", "sort_order": "desc"})
+    print(f"✅ Снимок: {len(snapshot)} товаров")
+
+    # Неподдерживаемая сортировка - в SQL
+    assert snapshot.query({"sort_by": "title"}, 0, 10) is None
+
+
+def test_snapshot_notifies_after_applying_events(db, suffix, monkeypatch):
+    monkeypatch.setattr(settings, "catalog_snapshot_enabled", True)
+    old_shop = Shop(name=f"Old {suffix}", slug=f"old-{suffix}")
+    new_shop = Shop(name=f"New {suffix}", slug=f"new-{suffix}")
+    db.add_all([old_shop, new_shop])
+    db.flush()
+    product = Product(title=f"Move {suffix}", slug=f"move-{suffix}", sku=f"MOVE-{suffix}",
+                      base_price=Decimal("10.00"), shop_id=old_shop.id)
+    db.add(product)
+    db.commit()
+
+    snapshot = CatalogSnapshot()
+    snapshot.load(db)
+    seen = []
+
+    @snapshot.subscribe
+    def handler(shop_ids):
+        # Подписчик видит уже обновленный снимок
+        seen.append((shop_ids, snapshot.query({"shop_id": new_shop.id}, 0, 10)))
+
+    product.shop_id = new_shop.id
+    db.commit()
+    message = OutboxMessage(id=1, aggregate="product", aggregate_id=product.id,
+                            event_type="updated", payload={}, created_at=None)
+    snapshot.apply_events([message])
+    assert seen == [({old_shop.id, new_shop.id}, [product.id])]
+    print(f"✅ Подписчики снимка получили магазины: {sorted(seen[0][0])}")
+
+    # Без outbox снимок не обновляется - списки строятся в SQL
+    monkeypatch.setattr(settings, "outbox_enabled", False)
+    assert snapshot.query({"shop_id": new_shop.id}, 0, 10) is None
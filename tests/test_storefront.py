@@ -0,0 +1,77 @@
+import sys
+import os
+import gzip
+import json
+from decimal import Decimal
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+from app.cache import bus
+from app.config import settings
+from app.core.storefront import storefront_home
+from app.database.models import Brand, Category, Product
+from app.main import app
+
+
+def add_category(db, suffix: str) -> Category:
+    category = Category(name=f"Home {suffix}", slug=f"home-{suffix}")
+    brand = Brand(name=f"Home {suffix}", slug=f"home-{suffix}")
+    db.add_all([category, brand])
+    db.flush()
+    db.add(Product(title=f"Home {suffix}", slug=f"home-{suffix}", sku=f"HOME-{suffix}", category_id=category.id,
+                   brand_id=brand.id, base_price=Decimal("19.99"), is_featured=True))
+    db.commit()
+    return category
+
+
+def test_home_served_from_memory(db, suffix, monkeypatch):
+    monkeypatch.setattr(settings, "storefront_featured_limit", 1000)
+    add_category(db, suffix)
+    storefront_home.refresh()
+    client = TestClient(app)
+
+    response = client.get("/api/v1/storefront/home", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    data = response.json()
+    assert set(data) == {"featured_products", "popular_brands", "category_tree", "root_categories"}
+    product = next(p for p in data["featured_products"] if p["sku"] == f"HOME-{suffix}")
+    # Decimal кодируется числом, как в обычных ответах
+    assert product["price"] == 19.99
+    assert f"home-{suffix}" in {c["slug"] for c in data["root_categories"]}
+
+    # Сжатый и несжатый варианты - одни и те же данные с разными ETag
+    plain = client.get("/api/v1/storefront/home", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert json.loads(plain.content) == data
+    assert plain.headers["etag"] != response.headers["etag"]
+    assert gzip.decompress(storefront_home.cached().gzip_body) == plain.content
+
+    cached = client.get("/api/v1/storefront/home", headers={"If-None-Match": response.headers["etag"],
+                                                           "Accept-Encoding": "gzip"})
+    print(f"✅ Главная: {len(plain.content)} байт, gzip {len(storefront_home.cached().gzip_body)}, повтор - {cached.status_code}")
+    assert cached.status_code == 304 and cached.content == b""
+
+
+def test_home_rebuilt_on_change_events(db, suffix):
+    storefront_home.refresh()
+    etag = storefront_home.cached().etag
+
+    # Без изменений сборка дает те же байты и тот же ETag
+    assert storefront_home.refresh().etag == etag
+
+    add_category(db, suffix)
+    assert storefront_home.cached().etag == etag
+    # Событие шины из любого воркера помечает ответ устаревшим
+    bus.dispatch(["category"])
+    assert storefront_home.cached() is None
+    payload = storefront_home.current()
+    assert payload.etag != etag
+    assert f"home-{suffix}" in {c["slug"] for c in json.loads(payload.body)["root_categories"]}
+    # Изменения, не влияющие на главную, ее не пересобирают
+    bus.dispatch(["price_schedule:1"])
+    assert storefront_home.cached() is payload
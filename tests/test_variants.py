@@ -0,0 +1,126 @@
+import sys
+import os
+from decimal import Decimal
+
+import pytest
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.cache import cache
+from app.core.variants import attribute_set_hash
+from app.database.models import Attribute, AttributeType, Product
+from app.repositories import VariantRepository
+from app.schemas import VariantCombinationCreate, VariantCombinationUpdate, VariantMatrixCreate
+from app.services import ProductService, VariantService
+from app.services.serializers import transform_product_for_frontend
+
+
+def test_attribute_set_hash_ignores_order():
+    assert attribute_set_hash([3, 1, 2]) == attribute_set_hash((1, 2, 3))
+    assert attribute_set_hash([1, 2]) != attribute_set_hash([1, 3])
+
+
+@pytest.fixture
+def catalog(db, suffix):
+    color = db.query(AttributeType).filter(AttributeType.name == "Color").first()
+    if not color:
+        color = AttributeType(name="Color", slug="color", input_type="select")
+    storage = AttributeType(name=f"Storage {suffix}", slug=f"storage-{suffix}", input_type="select")
+    db.add_all([color, storage])
+    db.flush()
+    colors = [Attribute(attribute_type_id=color.id, value=f"{name} {suffix}", slug=f"{name.lower()}-{suffix}")
+              for name in ("Midnight", "Silver")]
+    storages = [Attribute(attribute_type_id=storage.id, value=value, slug=value.lower(), sort_order=i)
+                for i, value in enumerate(("128GB", "256GB"))]
+    products = [Product(title=f"Phone {i}", slug=f"phone-{suffix}-{i}", sku=f"PH-{suffix}-{i}",
+                        base_price=Decimal("999.00")) for i in range(2)]
+    db.add_all(colors + storages + products)
+    db.commit()
+    return db, products, colors, storages
+
+
+def test_matrix_and_summary(catalog):
+    db, products, colors, storages = catalog
+    service = VariantService(db)
+    product = products[0]
+
+    variants = service.create_matrix(product.id, VariantMatrixCreate(
+        attribute_ids=[[c.id for c in colors], [s.id for s in storages]], stock_quantity=5,
+    ))
+    print(f"✅ Матрица: {len(variants)} вариантов")
+    assert len(variants) == 4
+    assert all(len(v.attributes) == 2 for v in variants)
+    assert variants[0].sku.startswith(product.sku)
+
+    # Повтор матрицы не создает дубликатов, одиночный дубликат - ошибка
+    assert len(service.create_matrix(product.id, VariantMatrixCreate(attribute_ids=[[colors[0].id], [storages[0].id]]))) == 4
+    with pytest.raises(ValueError):
+        service.create(product.id, VariantCombinationCreate(attribute_ids=[storages[0].id, colors[0].id]))
+    with pytest.raises(ValueError):
+        service.create(product.id, VariantCombinationCreate(attribute_ids=[storages[0].id, storages[1].id]))
+
+    expensive = next(v for v in variants if v.attributes[1].attribute_id == storages[1].id)
+    service.update(product.id, expensive.id, VariantCombinationUpdate(price_modifier=Decimal("100.00")))
+
+    db.expire_all()
+    summary = db.get(Product, product.id).variant_summary
+    assert summary.colors == [c.value for c in colors]
+    assert summary.options[storages[0].attribute_type.slug] == ["128GB", "256GB"]
+    assert (summary.variants_count, summary.total_stock) == (4, 20)
+    assert (summary.min_price_modifier, summary.max_price_modifier) == (0, Decimal("100.00"))
+
+    data = transform_product_for_frontend(db.get(Product, product.id), include_colors=False)
+    assert data["colors"] == [c.value for c in colors]
+    assert data["variants"]["max_price"] == Decimal("1099.00")
+
+    assert service.delete(product.id, expensive.id)
+    db.expire_all()
+    assert db.get(Product, product.id).variant_summary.variants_count == 3
+    assert service.get_for_product(products[1].id) == []
+    assert service.create(10 ** 9, VariantCombinationCreate(attribute_ids=[colors[0].id])) is None
+
+
+def test_load_for_products_single_query(catalog, count_queries):
+    db, products, colors, storages = catalog
+    service = VariantService(db)
+    for product in products:
+        service.create_matrix(product.id, VariantMatrixCreate(attribute_ids=[[c.id for c in colors], [storages[0].id]]))
+    ids = [p.id for p in products]
+    db.expire_all()
+
+    with count_queries() as queries:
+        grouped = VariantRepository(db).load_for_products(ids)
+        values = {i: [[a.attribute.value for a in v.attributes] for v in grouped[i]] for i in ids}
+    print(f"✅ Варианты {len(ids)} товаров: {len(queries)} запрос")
+    assert len(queries) == 1
+    assert all(len(v) == 2 for v in values.values())
+
+
+def test_listing_loads_cache_misses_in_one_batch(catalog, suffix, count_queries, monkeypatch):
+    db, products, colors, storages = catalog
+    monkeypatch.setattr(cache, "enabled", True)
+    products = products + [Product(title=f"Case {i}", slug=f"case-{suffix}-{i}", sku=f"CS-{suffix}-{i}",
+                                   base_price=Decimal("19.00")) for i in range(8)]
+    db.add_all(products[2:])
+    db.commit()
+    for product in products:
+        VariantService(db).create_matrix(product.id, VariantMatrixCreate(attribute_ids=[[c.id for c in colors]]))
+        cache.delete(f"product:{product.id}:full")
+    ids = [p.id for p in reversed(products)]
+    service = ProductService(db)
+    db.expire_all()
+
+    # Число запросов не зависит от размера страницы: промахи грузятся одной пачкой
+    with count_queries() as queries:
+        first = service._ids_to_frontend(ids)
+    print(f"✅ Страница из {len(ids)} товаров: {len(queries)} запросов")
+    assert [item["id"] for item in first] == ids
+    assert all(item["colors"] == [c.value for c in colors] for item in first)
+    assert len(queries) <= 8
+
+    # Повторная страница и карточка товара читают те же записи кэша
+    with count_queries() as queries:
+        second = service._ids_to_frontend(ids)
+        service.get_response_with_relations(ids[0])
+    assert len(queries) == 0 and second == first
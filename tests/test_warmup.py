@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Добавляем путь к проекту в PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+from app.core.resources import Resource, ResourceContainer
+from app.core.warmup import WarmupResource, warmup
+from app.database import SessionLocal, database
+from app.database.models import Base
+
+
+class FailingResource(Resource):
+    name = "failing"
+
+    def warm(self):
+        raise RuntimeError("cache unavailable")
+
+
+def test_warmup_runs_tasks_with_own_sessions(monkeypatch):
+    monkeypatch.setattr(settings, "warmup_enabled", True)
+    sessions = []
+
+    def failing(db):
+        sessions.append(db)
+        raise RuntimeError("boom")
+
+    resource = WarmupResource()
+    resource.add_task("failing", failing)
+    resource.add_task("ok", sessions.append)
+    resource.warm()
+
+    # Ошибка одной задачи не мешает остальным, у каждой своя сессия
+    assert len(sessions) == 2 and sessions[0] is not sessions[1]
+
+    monkeypatch.setattr(settings, "warmup_enabled", False)
+    resource.warm()
+    assert len(sessions) == 2
+
+
+def test_builtin_warmup_tasks():
+    Base.metadata.create_all(database.engine)
+    # Встроенные задачи работают и на пустом, и на заполненном каталоге
+    for name, task in warmup.tasks.items():
+        db = SessionLocal()
+        try:
+            task(db)
+        finally:
+            db.close()
+    print(f"✅ Задачи прогрева: {list(warmup.tasks)}")
+
+
+def test_container_ready_after_warm():
+    container = ResourceContainer()
+    container.register(FailingResource())
+    container.start()
+    assert container.state == "warming" and not container.is_ready
+    # Неудачный прогрев не роняет воркер: ресурс догреется на запросах
+    container.warm()
+    assert container.is_ready
+    container.shutdown()
+    assert container.state == "stopped"